@@ -2,39 +2,55 @@ import logging
 import re
 import threading
 import unicodedata
+from collections import OrderedDict
+from collections.abc import Callable
 from datetime import datetime
+from functools import partial
 from html import escape
 
+import pytz
 import telebot
 from telebot.apihelper import ApiTelegramException
 from telebot.types import (BotCommand, CallbackQuery, MenuButtonCommands,
                            Message, ForceReply, InlineKeyboardMarkup)
 
-from bot.keyboards import (back_to_main, confirm_delete, edit_timetable_menu,
-                           main_menu, manual_menu)
+from bot.keyboards import (SNOOZE_MINUTES, back_to_main, confirm_delete,
+                           edit_timetable_menu, main_menu, manual_menu,
+                           reminder_menu)
+from bot.day_view import DayRenderCache, DayViewStore
+from bot.dispatcher import NotificationSender
 from bot.scheduler import run_scheduler
 from bot.states import StateStore, UserState
-from bot.validators import (validate_date_display, validate_stool_quality,
-                            validate_text, validate_time_hhmm)
+from bot.validators import (validate_date_display, validate_date_storage,
+                            validate_stool_quality, validate_text,
+                            validate_time_hhmm, validate_timezone)
 from config import (APP_TZ, DATE_FORMAT_DISPLAY, DATE_FORMAT_STORAGE,
-                    TELEGRAM_TOKEN)
-from db.repositories import (add_feeling, add_medicine, add_stool,
-                             delete_feeling, delete_meal, delete_medicine,
-                             delete_stool, ensure_sleep_for_day,
-                             get_feeling_by_id, get_meal_by_id,
-                             get_medicine_by_id, get_sleep_for_day,
-                             get_stool_by_id, get_user_times,
+                    DAY_RENDER_CACHE_MAX_BYTES, DAY_VIEW_CACHE_DAYS,
+                    TELEGRAM_TOKEN, USER_TZ_CACHE_SIZE)
+from db.connection import commit_session, with_db_session
+from db.repositories import (NOTIFICATION_TIME_COLUMNS,
+                             add_day_change_listener, add_feeling,
+                             add_medicine, add_stool,
+                             cancel_pending_notifications, delete_feeling,
+                             delete_meal, delete_medicine, delete_stool,
+                             ensure_sleep_for_day, get_feeling_by_id,
+                             get_meal_by_id, get_medicine_by_id,
+                             get_stool_by_id, get_user_times, get_user_tz,
                              get_water_for_day, increment_water,
-                             list_feelings_for_day, list_meals_for_day,
-                             list_medicines_for_day, list_stools_for_day,
-                             register_user, set_water_for_day, update_feeling,
+                             register_user, set_water_for_day,
+                             snooze_notification, update_feeling,
                              update_meal, update_medicine, update_stool,
-                             update_user_time, upsert_meal,
+                             update_user_time, update_user_tz, upsert_meal,
                              upsert_sleep_quality, upsert_sleep_times)
 from db.schema import init_db
 from services.report_service import BRISTOL, generate_user_report_xlsx
 
 log = logging.getLogger(__name__)
+_user_zones: OrderedDict[int, pytz.BaseTzInfo] = OrderedDict()
+_user_zones_lock = threading.Lock()
+_day_views = DayViewStore(DAY_VIEW_CACHE_DAYS)
+_day_renders = DayRenderCache(DAY_RENDER_CACHE_MAX_BYTES)
+add_day_change_listener(_day_views.apply_change)
 
 OPTIONAL_DATE_COMMAND_PATTERN = r'(?:_(\d{8}))?$'
 EDIT_MEAL_PATTERN = rf'^/edit_meal_(\d+){OPTIONAL_DATE_COMMAND_PATTERN}'
@@ -118,6 +134,35 @@ def _delete_messages_in_background(
     delete_thread.start()
 
 
+def _answer_callback(
+    bot: telebot.TeleBot,
+    callback_query_id: str,
+    text: str | None = None,
+) -> None:
+    """Отвечает на нажатие inline-кнопки и игнорирует устаревшие запросы.
+
+    Перед обращением к Telegram фиксирует изменения обработчика, поэтому
+    ошибка ответа не откатывает уже сохранённые данные.
+
+    Args:
+        bot: Экземпляр Telegram-бота.
+        callback_query_id: Идентификатор callback-запроса.
+        text: Текст всплывающего уведомления.
+    """
+    commit_session()
+    try:
+        bot.answer_callback_query(callback_query_id, text=text)
+    except ApiTelegramException as error:
+        error_text = str(error).lower()
+        ignored_errors = (
+            'query is too old',
+            'query id is invalid',
+        )
+        if any(pattern in error_text for pattern in ignored_errors):
+            return
+        raise
+
+
 def _is_inline_keyboard(reply_markup: object | None) -> bool:
     """Проверяет, что разметка является inline-клавиатурой."""
     return isinstance(reply_markup, InlineKeyboardMarkup)
@@ -131,6 +176,7 @@ def _try_edit_message(
     reply_markup=None,
 ) -> bool:
     """Пробует обновить существующее сообщение и возвращает результат."""
+    commit_session()
     try:
         bot.edit_message_text(
             text=text,
@@ -154,30 +200,70 @@ def _try_edit_message(
         raise
 
 
-def _today_iso() -> str:
+def _user_tz(user_id: int | None) -> pytz.BaseTzInfo:
+    """Возвращает часовой пояс пользователя с кэшированием в памяти.
+
+    Кэш ограничен `USER_TZ_CACHE_SIZE` записями, давно не использованные
+    пояса вытесняются.
+
+    Args:
+        user_id: Идентификатор пользователя Telegram или `None`.
+
+    Returns:
+        pytz.BaseTzInfo: Часовой пояс пользователя или `APP_TZ`, если
+        пользователь не указан.
     """
-    Выполняет операцию `_today_iso` в бизнес-логике модуля.
+    if user_id is None:
+        return APP_TZ
+    with _user_zones_lock:
+        user_tz = _user_zones.get(user_id)
+        if user_tz is not None:
+            _user_zones.move_to_end(user_id)
+            return user_tz
+    user_tz = pytz.timezone(get_user_tz(user_id))
+    with _user_zones_lock:
+        _user_zones[user_id] = user_tz
+        while len(_user_zones) > USER_TZ_CACHE_SIZE:
+            _user_zones.popitem(last=False)
+    return user_tz
+
+
+def _forget_user_tz(user_id: int) -> None:
+    """Убирает часовой пояс пользователя из кэша после его изменения.
 
-    Функция используется внутри приложения и поддерживает контракт между
-    компонентами.
+    Args:
+        user_id: Идентификатор пользователя Telegram.
+    """
+    with _user_zones_lock:
+        _user_zones.pop(user_id, None)
+
+
+def _today_iso(user_id: int | None = None) -> str:
+    """
+    Возвращает текущую дату пользователя в формате хранения.
+
+    Args:
+        user_id: Идентификатор пользователя Telegram; без него дата
+            считается в часовом поясе приложения.
 
     Returns:
-        str: Результат выполнения функции.
+        str: Дата в формате `YYYY-MM-DD`.
     """
-    return datetime.now(APP_TZ).strftime(DATE_FORMAT_STORAGE)
+    return datetime.now(_user_tz(user_id)).strftime(DATE_FORMAT_STORAGE)
 
 
-def _today_display() -> str:
+def _today_display(user_id: int | None = None) -> str:
     """
-    Выполняет операцию `_today_display` в бизнес-логике модуля.
+    Возвращает текущую дату пользователя в формате отображения.
 
-    Функция используется внутри приложения и поддерживает контракт между
-    компонентами.
+    Args:
+        user_id: Идентификатор пользователя Telegram; без него дата
+            считается в часовом поясе приложения.
 
     Returns:
-        str: Результат выполнения функции.
+        str: Дата в формате `ДД.ММ.ГГГГ`.
     """
-    return datetime.now(APP_TZ).strftime(DATE_FORMAT_DISPLAY)
+    return datetime.now(_user_tz(user_id)).strftime(DATE_FORMAT_DISPLAY)
 
 
 def _display_date(date_iso: str) -> str:
@@ -411,6 +497,182 @@ def _format_timetable_table(
     return '<pre>' + '\n'.join(lines) + '</pre>'
 
 
+def _reminder_senders(
+    states: StateStore,
+    send_message: Callable[..., int],
+) -> dict[str, NotificationSender]:
+    """Создаёт функции отправки вопросов напоминаний по их типам.
+
+    Отправленный вопрос запоминается как состояние `pending_question`,
+    которое хранится в БД, поэтому на него можно ответить, даже если его
+    отправил другой процесс.
+
+    Args:
+        states: Хранилище состояний пользователей.
+        send_message: Отправка сообщения с аргументами `user_id`, `text`
+            и `reply_markup`, возвращающая `message_id`.
+
+    Returns:
+        dict[str, NotificationSender]: Функции отправки по типу напоминания.
+    """
+
+    def _ask_meal_question(
+        user_id: int,
+        meal_type: str,
+        question: str,
+        date_iso: str,
+    ) -> None:
+        """Отправляет вопрос о приёме пищи и включает ожидание ввода.
+
+        Args:
+            user_id: Идентификатор пользователя Telegram.
+            meal_type: Тип приёма пищи (`breakfast`, `lunch`, `dinner`).
+            question: Текст вопроса для пользователя.
+            date_iso: Дата, к которой относится ответ.
+        """
+        send_message(
+            user_id,
+            question,
+            reply_markup=reminder_menu(meal_type, date_iso),
+        )
+        states.set(
+            user_id,
+            UserState(
+                'pending_question',
+                'meal',
+                {'meal_type': meal_type, 'date': date_iso},
+            ),
+        )
+
+    def send_breakfast(user_id: int, date_iso: str) -> None:
+        """
+        Отправляет сообщение для следующего шага сценария.
+
+        Функция используется внутри приложения и поддерживает контракт между
+        компонентами.
+
+        Args:
+            user_id: Идентификатор пользователя в Telegram.
+            date_iso: Дата напоминания в формате хранения.
+
+        Returns:
+            None: Возвращаемое значение отсутствует.
+        """
+        _ask_meal_question(
+            user_id,
+            'breakfast',
+            '🍳 Что вы ели на завтрак?',
+            date_iso,
+        )
+
+    def send_lunch(user_id: int, date_iso: str) -> None:
+        """
+        Отправляет сообщение для следующего шага сценария.
+
+        Функция используется внутри приложения и поддерживает контракт между
+        компонентами.
+
+        Args:
+            user_id: Идентификатор пользователя в Telegram.
+            date_iso: Дата напоминания в формате хранения.
+
+        Returns:
+            None: Возвращаемое значение отсутствует.
+        """
+        _ask_meal_question(
+            user_id,
+            'lunch',
+            '🍲 Что вы ели на обед?',
+            date_iso,
+        )
+
+    def send_dinner(user_id: int, date_iso: str) -> None:
+        """
+        Отправляет сообщение для следующего шага сценария.
+
+        Функция используется внутри приложения и поддерживает контракт между
+        компонентами.
+
+        Args:
+            user_id: Идентификатор пользователя в Telegram.
+            date_iso: Дата напоминания в формате хранения.
+
+        Returns:
+            None: Возвращаемое значение отсутствует.
+        """
+        _ask_meal_question(
+            user_id,
+            'dinner',
+            '🍽️ Что вы ели на ужин?',
+            date_iso,
+        )
+
+    def send_toilet(user_id: int, date_iso: str) -> None:
+        """
+        Отправляет сообщение для следующего шага сценария.
+
+        Функция используется внутри приложения и поддерживает контракт между
+        компонентами.
+
+        Args:
+            user_id: Идентификатор пользователя в Telegram.
+            date_iso: Дата напоминания в формате хранения.
+
+        Returns:
+            None: Возвращаемое значение отсутствует.
+        """
+        send_message(
+            user_id,
+            _bristol_scale_prompt(),
+            reply_markup=reminder_menu('toilet', date_iso),
+        )
+        states.set(
+            user_id,
+            UserState(
+                'pending_question',
+                'stool',
+                {'date': date_iso},
+            ),
+        )
+
+    def send_sleep_quality(user_id: int, date_iso: str) -> None:
+        """
+        Отправляет сообщение для следующего шага сценария.
+
+        Функция используется внутри приложения и поддерживает контракт между
+        компонентами.
+
+        Args:
+            user_id: Идентификатор пользователя в Telegram.
+            date_iso: Дата напоминания в формате хранения.
+
+        Returns:
+            None: Возвращаемое значение отсутствует.
+        """
+        ensure_sleep_for_day(user_id, date_iso)
+        send_message(
+            user_id,
+            '🛌 Как вы оцениваете качество сна этой ночью?',
+            reply_markup=reminder_menu('sleep_quality', date_iso),
+        )
+        states.set(
+            user_id,
+            UserState(
+                'pending_question',
+                'sleep_quality',
+                {'date': date_iso},
+            ),
+        )
+
+    return {
+        'breakfast': send_breakfast,
+        'lunch': send_lunch,
+        'dinner': send_dinner,
+        'toilet': send_toilet,
+        'sleep_quality': send_sleep_quality,
+    }
+
+
 def build_app(bot: telebot.TeleBot) -> None:
     """
     Выполняет операцию `build_app` в бизнес-логике модуля.
@@ -481,6 +743,7 @@ def build_app(bot: telebot.TeleBot) -> None:
         Returns:
             int: Идентификатор нового сообщения.
         """
+        commit_session()
         has_inline_keyboard = _is_inline_keyboard(reply_markup)
         tracked_message_id = _get_ui_message(user_id)
 
@@ -624,7 +887,7 @@ def build_app(bot: telebot.TeleBot) -> None:
         date_iso: str | None = None,
         status_text: str | None = None,
     ) -> None:
-        normalized_date = date_iso or _today_iso()
+        normalized_date = date_iso or _today_iso(user_id)
         cleanup_message_ids = _consume_pending_cleanup_messages(user_id)
         new_message_id = _show_today(
             bot,
@@ -725,9 +988,9 @@ def build_app(bot: telebot.TeleBot) -> None:
     ) -> str:
         context = _get_stats_context(user_id)
         if not context:
-            return _today_iso()
+            return _today_iso(user_id)
         if message_id is not None and context['message_id'] != message_id:
-            return _today_iso()
+            return _today_iso(user_id)
         return str(context['date'])
 
     def _resolve_command_date(
@@ -835,127 +1098,8 @@ def build_app(bot: telebot.TeleBot) -> None:
         event_name = _event_name_for_state(state)
         return f'✅ {action} запись о {event_name} за {date_display}.'
 
-    def _ask_meal_question(
-        user_id: int,
-        meal_type: str,
-        question: str,
-    ) -> None:
-        """Отправляет вопрос о приёме пищи и включает ожидание ввода.
-
-        Args:
-            user_id: Идентификатор пользователя Telegram.
-            meal_type: Тип приёма пищи (`breakfast`, `lunch`, `dinner`).
-            question: Текст вопроса для пользователя.
-        """
-        _send_fresh_message(
-            user_id,
-            question,
-            reply_markup=back_to_main(),
-        )
-        _set_state(
-            user_id,
-            'pending_question',
-            'meal',
-            {'meal_type': meal_type, 'date': _today_iso()},
-        )
-
-    def send_breakfast(user_id: int) -> None:
-        """
-        Отправляет сообщение для следующего шага сценария.
-
-        Функция используется внутри приложения и поддерживает контракт между
-        компонентами.
-
-        Args:
-            user_id: Идентификатор пользователя в Telegram.
-
-        Returns:
-            None: Возвращаемое значение отсутствует.
-        """
-        _ask_meal_question(user_id, 'breakfast', '🍳 Что вы ели на завтрак?')
-
-    def send_lunch(user_id: int) -> None:
-        """
-        Отправляет сообщение для следующего шага сценария.
-
-        Функция используется внутри приложения и поддерживает контракт между
-        компонентами.
-
-        Args:
-            user_id: Идентификатор пользователя в Telegram.
-
-        Returns:
-            None: Возвращаемое значение отсутствует.
-        """
-        _ask_meal_question(user_id, 'lunch', '🍲 Что вы ели на обед?')
-
-    def send_dinner(user_id: int) -> None:
-        """
-        Отправляет сообщение для следующего шага сценария.
-
-        Функция используется внутри приложения и поддерживает контракт между
-        компонентами.
-
-        Args:
-            user_id: Идентификатор пользователя в Telegram.
-
-        Returns:
-            None: Возвращаемое значение отсутствует.
-        """
-        _ask_meal_question(user_id, 'dinner', '🍽️ Что вы ели на ужин?')
-
-    def send_toilet(user_id: int) -> None:
-        """
-        Отправляет сообщение для следующего шага сценария.
-
-        Функция используется внутри приложения и поддерживает контракт между
-        компонентами.
-
-        Args:
-            user_id: Идентификатор пользователя в Telegram.
-
-        Returns:
-            None: Возвращаемое значение отсутствует.
-        """
-        _send_fresh_message(
-            user_id,
-            _bristol_scale_prompt(),
-            reply_markup=back_to_main(),
-        )
-        _set_state(
-            user_id,
-            'pending_question',
-            'stool',
-            {'date': _today_iso()},
-        )
-
-    def send_sleep_quality(user_id: int) -> None:
-        """
-        Отправляет сообщение для следующего шага сценария.
-
-        Функция используется внутри приложения и поддерживает контракт между
-        компонентами.
-
-        Args:
-            user_id: Идентификатор пользователя в Telegram.
-
-        Returns:
-            None: Возвращаемое значение отсутствует.
-        """
-        ensure_sleep_for_day(user_id, _today_iso())
-        _send_fresh_message(
-            user_id,
-            '🛌 Как вы оцениваете качество сна этой ночью?',
-            reply_markup=back_to_main(),
-        )
-        _set_state(
-            user_id,
-            'pending_question',
-            'sleep_quality',
-            {'date': _today_iso()},
-        )
-
     @bot.message_handler(commands=['start'])
+    @with_db_session
     def cmd_start(message: Message):
         """
         Обрабатывает команду Telegram, полученную от пользователя.
@@ -972,14 +1116,16 @@ def build_app(bot: telebot.TeleBot) -> None:
         user_id = message.from_user.id
         _clear_stats_context(user_id)
         register_user(user_id)
-        ensure_sleep_for_day(user_id, _today_iso())
+        ensure_sleep_for_day(user_id, _today_iso(user_id))
         _send_fresh_message(
             user_id,
             (
                 '👋 Привет! Бот помогает вести дневник питания, '
                 'самочувствия и сна.\n'
                 'Используйте меню ниже для настройки расписания '
-                'и добавления событий.'
+                'и добавления событий.\n'
+                f'Часовой пояс: <b>{escape(_user_tz(user_id).zone)}</b> — '
+                'изменить его можно в разделе «Расписание».'
             ),
             reply_markup=main_menu(),
             force_new=True,
@@ -1049,6 +1195,7 @@ def build_app(bot: telebot.TeleBot) -> None:
         )
 
     @bot.message_handler(regexp=EDIT_MEAL_PATTERN)
+    @with_db_session
     def edit_meal_cmd(message: Message):
         """
         Выполняет операцию `edit_meal_cmd` в бизнес-логике модуля.
@@ -1100,6 +1247,7 @@ def build_app(bot: telebot.TeleBot) -> None:
         )
 
     @bot.message_handler(regexp=EDIT_MED_PATTERN)
+    @with_db_session
     def edit_med_cmd(message: Message):
         """
         Выполняет операцию `edit_med_cmd` в бизнес-логике модуля.
@@ -1144,6 +1292,7 @@ def build_app(bot: telebot.TeleBot) -> None:
         )
 
     @bot.message_handler(regexp=EDIT_STOOL_PATTERN)
+    @with_db_session
     def edit_stool_cmd(message: Message):
         """
         Выполняет операцию `edit_stool_cmd` в бизнес-логике модуля.
@@ -1187,6 +1336,7 @@ def build_app(bot: telebot.TeleBot) -> None:
         )
 
     @bot.message_handler(regexp=EDIT_FEELING_PATTERN)
+    @with_db_session
     def edit_feeling_cmd(message: Message):
         """
         Выполняет операцию `edit_feeling_cmd` в бизнес-логике модуля.
@@ -1230,6 +1380,7 @@ def build_app(bot: telebot.TeleBot) -> None:
         )
 
     @bot.message_handler(regexp=EDIT_WATER_PATTERN)
+    @with_db_session
     def edit_water_cmd(message: Message):
         """
         Выполняет операцию `edit_water_cmd` в бизнес-логике модуля.
@@ -1247,7 +1398,7 @@ def build_app(bot: telebot.TeleBot) -> None:
         date_iso = _resolve_command_date(
             message,
             match.group(1),
-            _today_iso(),
+            _today_iso(message.from_user.id),
         )
         if date_iso is None:
             return
@@ -1271,6 +1422,7 @@ def build_app(bot: telebot.TeleBot) -> None:
         )
 
     @bot.message_handler(regexp=EDIT_SLEEP_WAKEUP_PATTERN)
+    @with_db_session
     def edit_sleep_wakeup_cmd(message: Message):
         """
         Выполняет операцию `edit_sleep_wakeup_cmd` в бизнес-логике модуля.
@@ -1288,7 +1440,7 @@ def build_app(bot: telebot.TeleBot) -> None:
         date_iso = _resolve_command_date(
             message,
             match.group(1),
-            _today_iso(),
+            _today_iso(message.from_user.id),
         )
         if date_iso is None:
             return
@@ -1313,6 +1465,7 @@ def build_app(bot: telebot.TeleBot) -> None:
         )
 
     @bot.message_handler(regexp=EDIT_SLEEP_BED_PATTERN)
+    @with_db_session
     def edit_sleep_bed_cmd(message: Message):
         """
         Выполняет операцию `edit_sleep_bed_cmd` в бизнес-логике модуля.
@@ -1330,7 +1483,7 @@ def build_app(bot: telebot.TeleBot) -> None:
         date_iso = _resolve_command_date(
             message,
             match.group(1),
-            _today_iso(),
+            _today_iso(message.from_user.id),
         )
         if date_iso is None:
             return
@@ -1355,6 +1508,7 @@ def build_app(bot: telebot.TeleBot) -> None:
         )
 
     @bot.message_handler(regexp=EDIT_SLEEP_QUALITY_PATTERN)
+    @with_db_session
     def edit_sleep_quality_cmd(message: Message):
         """
         Выполняет операцию `edit_sleep_quality_cmd` в бизнес-логике модуля.
@@ -1372,7 +1526,7 @@ def build_app(bot: telebot.TeleBot) -> None:
         date_iso = _resolve_command_date(
             message,
             match.group(1),
-            _today_iso(),
+            _today_iso(message.from_user.id),
         )
         if date_iso is None:
             return
@@ -1424,6 +1578,7 @@ def build_app(bot: telebot.TeleBot) -> None:
         )
 
     @bot.callback_query_handler(func=lambda _: True)
+    @with_db_session
     def on_callback(call: CallbackQuery):
         """
         Обрабатывает нажатия inline-кнопок интерфейса.
@@ -1472,7 +1627,8 @@ def build_app(bot: telebot.TeleBot) -> None:
                     wakeup,
                     bed,
                 )}\n\n'
-                'Нажмите кнопку, чтобы изменить время.'
+                f'Часовой пояс: <b>{escape(_user_tz(user_id).zone)}</b>\n\n'
+                'Нажмите кнопку, чтобы изменить время или часовой пояс.'
             )
             _replace_message_fresh(
                 user_id,
@@ -1514,6 +1670,19 @@ def build_app(bot: telebot.TeleBot) -> None:
             _set_state(user_id, 'awaiting_time', 'time', {'slot': slot})
             return
 
+        if data == 'set_tz':
+            _replace_message_fresh(
+                user_id,
+                call.message.message_id,
+                (
+                    'Введите часовой пояс в формате IANA '
+                    '(например, Europe/Moscow или Asia/Yekaterinburg).\n'
+                    f'Сейчас: <b>{escape(_user_tz(user_id).zone)}</b>'
+                ),
+            )
+            _set_state(user_id, 'awaiting_tz', 'tz')
+            return
+
         if data == 'manual_menu':
             if not _stats_context_matches(user_id, call.message.message_id):
                 _clear_stats_context(user_id)
@@ -1696,7 +1865,7 @@ def build_app(bot: telebot.TeleBot) -> None:
                 user_id, call.message.message_id)
             total_glasses = increment_water(user_id, target_date)
             states.clear(user_id)
-            bot.answer_callback_query(call.id, text='✅ Добавлен стакан воды.')
+            _answer_callback(bot, call.id, text='✅ Добавлен стакан воды.')
             if _stats_context_matches(user_id, call.message.message_id):
                 _show_stats(call.message.message_id, user_id, target_date)
             else:
@@ -1760,22 +1929,54 @@ def build_app(bot: telebot.TeleBot) -> None:
             )
             return
 
+        if data.startswith('snooze:'):
+            parts = data.split(':')
+            try:
+                if len(parts) != 4:
+                    raise ValueError('Неверные данные кнопки.')
+                _, notification_type, minutes_s, date_iso = parts
+                minutes = int(minutes_s)
+                date_iso = validate_date_storage(date_iso)
+            except ValueError:
+                _answer_callback(bot, call.id)
+                return
+            if (
+                minutes not in SNOOZE_MINUTES
+                or notification_type not in NOTIFICATION_TIME_COLUMNS
+            ):
+                _answer_callback(bot, call.id)
+                return
+            snooze_notification(user_id, notification_type, date_iso, minutes)
+            state = states.get(user_id)
+            if state and state.kind == 'pending_question':
+                states.clear(user_id)
+            _answer_callback(bot, call.id, text='Напомню позже')
+            _replace_message_fresh(
+                user_id,
+                call.message.message_id,
+                f'⏰ Напомню через {minutes} мин.',
+                reply_markup=back_to_main(),
+            )
+            return
+
         if data.startswith('confirm_delete:'):
             parts = data.split(':', 3)
             _, item_type, item_id_s = parts[:3]
             date_iso = parts[3] if len(parts) > 3 else None
             item_id = int(item_id_s)
-            is_successful = False
+            deleted_row = None
             if item_type == 'meal':
-                is_successful = delete_meal(user_id, item_id)
+                deleted_row = delete_meal(user_id, item_id)
             elif item_type == 'med':
-                is_successful = delete_medicine(user_id, item_id)
+                deleted_row = delete_medicine(user_id, item_id)
             elif item_type == 'stool':
-                is_successful = delete_stool(user_id, item_id)
+                deleted_row = delete_stool(user_id, item_id)
             elif item_type == 'feeling':
-                is_successful = delete_feeling(user_id, item_id)
+                deleted_row = delete_feeling(user_id, item_id)
+            is_successful = deleted_row is not None
 
-            bot.answer_callback_query(
+            _answer_callback(
+                bot,
                 call.id,
                 text=(
                     'Удалено'
@@ -1804,7 +2005,7 @@ def build_app(bot: telebot.TeleBot) -> None:
             return
 
         if data == 'export_all_stats':
-            bot.answer_callback_query(call.id, text='Формирую отчёт…')
+            _answer_callback(bot, call.id, text='Формирую отчёт…')
             _send_fresh_message(
                 user_id,
                 '🔄 Формирую отчёт. Это может занять некоторое время.',
@@ -1816,6 +2017,7 @@ def build_app(bot: telebot.TeleBot) -> None:
             return
 
     @bot.message_handler(func=lambda _: True)
+    @with_db_session
     def on_text(message: Message):
         """
         Обрабатывает текстовый ввод с учетом текущего состояния.
@@ -1845,11 +2047,11 @@ def build_app(bot: telebot.TeleBot) -> None:
             try:
                 if state.step == 'meal_desc':
                     desc = validate_text(text)
-                    is_successful = update_meal(
+                    updated_row = update_meal(
                         user_id, state.data['id'], desc)
                     status_text = (
                         _record_save_message('Изменена', state)
-                        if is_successful
+                        if updated_row
                         else '❌ Не найдено / нет прав.'
                     )
                     _reply_after_change(
@@ -1876,11 +2078,11 @@ def build_app(bot: telebot.TeleBot) -> None:
 
                 if state.step == 'med_dosage':
                     dosage = None if text == '-' else validate_text(text)
-                    is_successful = update_medicine(
+                    updated_row = update_medicine(
                         user_id, state.data['id'], state.data['name'], dosage)
                     status_text = (
                         _record_save_message('Изменена', state)
-                        if is_successful
+                        if updated_row
                         else '❌ Не найдено / нет прав.'
                     )
                     _reply_after_change(
@@ -1893,11 +2095,11 @@ def build_app(bot: telebot.TeleBot) -> None:
 
                 if state.step == 'stool_quality':
                     quality = validate_stool_quality(text)
-                    is_successful = update_stool(
+                    updated_row = update_stool(
                         user_id, state.data['id'], quality)
                     status_text = (
                         _record_save_message('Изменена', state)
-                        if is_successful
+                        if updated_row
                         else '❌ Не найдено / нет прав.'
                     )
                     _reply_after_change(
@@ -1910,11 +2112,11 @@ def build_app(bot: telebot.TeleBot) -> None:
 
                 if state.step == 'feeling_desc':
                     desc = validate_text(text)
-                    is_successful = update_feeling(
+                    updated_row = update_feeling(
                         user_id, state.data['id'], desc)
                     status_text = (
                         _record_save_message('Изменена', state)
-                        if is_successful
+                        if updated_row
                         else '❌ Не найдено / нет прав.'
                     )
                     _reply_after_change(
@@ -1968,6 +2170,11 @@ def build_app(bot: telebot.TeleBot) -> None:
                 if state.step == 'sleep_quality_today':
                     desc = validate_text(text)
                     upsert_sleep_quality(user_id, state.data['date'], desc)
+                    cancel_pending_notifications(
+                        user_id,
+                        'sleep_quality',
+                        state.data['date'],
+                    )
                     _reply_after_change(
                         message,
                         _record_save_message('Изменена', state),
@@ -1992,9 +2199,17 @@ def build_app(bot: telebot.TeleBot) -> None:
             slot = state.data['slot']
             is_successful = update_user_time(user_id, slot, text)
             if is_successful and slot == 'wakeup':
-                upsert_sleep_times(user_id, _today_iso(), wakeup_time=text)
+                upsert_sleep_times(
+                    user_id,
+                    _today_iso(user_id),
+                    wakeup_time=text,
+                )
             if is_successful and slot == 'bed':
-                upsert_sleep_times(user_id, _today_iso(), bed_time=text)
+                upsert_sleep_times(
+                    user_id,
+                    _today_iso(user_id),
+                    bed_time=text,
+                )
 
             _reply_fresh(
                 message,
@@ -2008,6 +2223,29 @@ def build_app(bot: telebot.TeleBot) -> None:
             states.clear(user_id)
             return
 
+        if state.kind == 'awaiting_tz':
+            try:
+                tz_name = validate_timezone(text)
+            except ValueError as error:
+                _reply_fresh(message, f'❌ {error}')
+                return
+
+            is_successful = update_user_tz(user_id, tz_name)
+            _forget_user_tz(user_id)
+            if is_successful:
+                ensure_sleep_for_day(user_id, _today_iso(user_id))
+            _reply_fresh(
+                message,
+                (
+                    f'✅ Часовой пояс сохранён: {escape(tz_name)}.'
+                    if is_successful
+                    else '❌ Ошибка сохранения.'
+                ),
+                reply_markup=main_menu(),
+            )
+            states.clear(user_id)
+            return
+
         try:
             if state.kind == 'manual':
                 if state.step == 'meal_desc':
@@ -2018,6 +2256,11 @@ def build_app(bot: telebot.TeleBot) -> None:
                         state.data['meal_type'],
                         desc,
                     )
+                    cancel_pending_notifications(
+                        user_id,
+                        state.data['meal_type'],
+                        state.data['date'],
+                    )
                     _reply_after_change(
                         message,
                         _record_save_message('Добавлена', state),
@@ -2058,6 +2301,11 @@ def build_app(bot: telebot.TeleBot) -> None:
                 if state.step == 'stool_quality':
                     quality = validate_stool_quality(text)
                     add_stool(user_id, state.data['date'], quality)
+                    cancel_pending_notifications(
+                        user_id,
+                        'toilet',
+                        state.data['date'],
+                    )
                     _reply_after_change(
                         message,
                         _record_save_message('Добавлена', state),
@@ -2108,6 +2356,11 @@ def build_app(bot: telebot.TeleBot) -> None:
                 if state.step == 'sleep_quality_desc':
                     desc = validate_text(text)
                     upsert_sleep_quality(user_id, state.data['date'], desc)
+                    cancel_pending_notifications(
+                        user_id,
+                        'sleep_quality',
+                        state.data['date'],
+                    )
                     _reply_after_change(
                         message,
                         _record_save_message('Добавлена', state),
@@ -2135,6 +2388,11 @@ def build_app(bot: telebot.TeleBot) -> None:
                         state.data['meal_type'],
                         desc,
                     )
+                    cancel_pending_notifications(
+                        user_id,
+                        state.data['meal_type'],
+                        state.data['date'],
+                    )
                     _reply_fresh(
                         message,
                         _record_save_message('Добавлена', state),
@@ -2146,6 +2404,11 @@ def build_app(bot: telebot.TeleBot) -> None:
                 if state.step == 'stool':
                     quality = validate_stool_quality(text)
                     add_stool(user_id, state.data['date'], quality)
+                    cancel_pending_notifications(
+                        user_id,
+                        'toilet',
+                        state.data['date'],
+                    )
                     _reply_fresh(
                         message,
                         _record_save_message('Добавлена', state),
@@ -2157,6 +2420,11 @@ def build_app(bot: telebot.TeleBot) -> None:
                 if state.step == 'sleep_quality':
                     desc = validate_text(text)
                     upsert_sleep_quality(user_id, state.data['date'], desc)
+                    cancel_pending_notifications(
+                        user_id,
+                        'sleep_quality',
+                        state.data['date'],
+                    )
                     _reply_fresh(
                         message,
                         _record_save_message('Добавлена', state),
@@ -2170,57 +2438,82 @@ def build_app(bot: telebot.TeleBot) -> None:
 
     thread = threading.Thread(
         target=run_scheduler,
-        args=(send_breakfast, send_lunch, send_dinner,
-              send_toilet, send_sleep_quality),
+        args=(_reminder_senders(states, _send_fresh_message),),
     )
     thread.daemon = True
     thread.start()
 
 
-def _show_today(
+def _send_reminder_message(
     bot: telebot.TeleBot,
     user_id: int,
-    message_id: int,
-    date_iso: str | None = None,
-    status_text: str | None = None,
-    cleanup_message_ids: list[int] | None = None,
+    text: str,
+    reply_markup=None,
 ) -> int:
+    """Отправляет вопрос напоминания из процесса без polling.
+
+    Args:
+        bot: Экземпляр Telegram-бота.
+        user_id: Идентификатор пользователя Telegram.
+        text: Текст вопроса.
+        reply_markup: Inline-клавиатура вопроса.
+
+    Returns:
+        int: Идентификатор отправленного сообщения.
     """
-    Выполняет операцию `_show_today` в бизнес-логике модуля.
+    commit_session()
+    return bot.send_message(
+        user_id,
+        text,
+        reply_markup=reply_markup,
+    ).message_id
 
-    Функция используется внутри приложения и поддерживает контракт между
-    компонентами.
+
+def run_reminders(bot: telebot.TeleBot) -> None:
+    """Запускает планировщик и рассылку напоминаний без polling.
+
+    Процесс делит шарды пользователей и очередь outbox с планировщиками
+    других процессов, а заданные вопросы сохраняет в БД, поэтому ответы
+    на них принимает процесс, который опрашивает Telegram. Функция не
+    возвращает управление.
 
     Args:
-        bot: Экземпляр Telegram-бота для отправки и редактирования сообщений.
-        user_id: Идентификатор пользователя в Telegram.
-        message_id: Идентификатор сообщения в Telegram.
-        date_iso: Дата статистики в формате хранения. По умолчанию сегодня.
-        status_text: Дополнительный статус перед содержимым статистики.
+        bot: Экземпляр Telegram-бота для отправки сообщений.
+    """
+    init_db()
+    run_scheduler(
+        _reminder_senders(
+            StateStore(),
+            partial(_send_reminder_message, bot),
+        ),
+    )
 
-    Returns:
-        int: Идентификатор нового сообщения со статистикой.
+
+def _render_day(
+    snapshot: dict,
+    date_display: str,
+    dated_command_suffix: str,
+) -> str:
     """
-    date_iso = date_iso or _today_iso()
-    date_display = _display_date(date_iso)
-    is_today = date_iso == _today_iso()
-    if is_today:
-        dated_command_suffix = ''
-    else:
-        dated_command_suffix = f'_{_date_to_command_token(date_iso)}'
+    Формирует текст экрана статистики за день без строки статуса.
 
-    ensure_sleep_for_day(user_id, date_iso)
-    sleep = get_sleep_for_day(user_id, date_iso)
-    meals = list_meals_for_day(user_id, date_iso)
-    medicines = list_medicines_for_day(user_id, date_iso)
-    stools = list_stools_for_day(user_id, date_iso)
-    feelings = list_feelings_for_day(user_id, date_iso)
-    water_glasses = get_water_for_day(user_id, date_iso)
+    Args:
+        snapshot: Данные дня в формате `fetch_day_snapshot`.
+        date_display: Дата в формате отображения.
+        dated_command_suffix: Суффикс даты для команд редактирования;
+            пустой для сегодняшнего дня.
 
-    lines: list[str] = []
-    if status_text:
-        lines.append(status_text)
-    lines.append(f'<b>Записи за {date_display}</b>\n')
+    Returns:
+        str: HTML-текст статистики за день.
+    """
+    sleep = snapshot['sleep']
+    meals = snapshot['meals']
+    medicines = snapshot['medicines']
+    stools = snapshot['stools']
+    feelings = snapshot['feelings']
+    water_glasses = snapshot['water']
+
+    lines: list[str] = [f'<b>Записи за {date_display}</b>\n']
 
     if meals:
         lines.append('<b>Еда:</b>')
@@ -2324,7 +2617,53 @@ def _show_today(
 
     lines.append('Добавить новое событие:')
 
-    message_text = '\n'.join(lines)
+    return '\n'.join(lines)
+
+
+def _show_today(
+    bot: telebot.TeleBot,
+    user_id: int,
+    message_id: int,
+    date_iso: str | None = None,
+    status_text: str | None = None,
+    cleanup_message_ids: list[int] | None = None,
+) -> int:
+    """
+    Выполняет операцию `_show_today` в бизнес-логике модуля.
+
+    Функция используется внутри приложения и поддерживает контракт между
+    компонентами.
+
+    Args:
+        bot: Экземпляр Telegram-бота для отправки и редактирования сообщений.
+        user_id: Идентификатор пользователя в Telegram.
+        message_id: Идентификатор сообщения в Telegram.
+        date_iso: Дата статистики в формате хранения. По умолчанию сегодня.
+        status_text: Дополнительный статус перед содержимым статистики.
+
+    Returns:
+        int: Идентификатор нового сообщения со статистикой.
+    """
+    date_iso = date_iso or _today_iso(user_id)
+    date_display = _display_date(date_iso)
+    is_today = date_iso == _today_iso(user_id)
+    if is_today:
+        dated_command_suffix = ''
+    else:
+        dated_command_suffix = f'_{_date_to_command_token(date_iso)}'
+
+    commit_session()
+    snapshot, version = _day_views.get(user_id, date_iso)
+    render_key = (user_id, date_iso)
+    day_text = _day_renders.get(render_key, version, is_today)
+    if day_text is None:
+        day_text = _render_day(snapshot, date_display, dated_command_suffix)
+        _day_renders.put(render_key, version, is_today, day_text)
+    if status_text:
+        message_text = f'{status_text}\n{day_text}'
+    else:
+        message_text = day_text
+
     message_ids_to_remove = list(cleanup_message_ids or [])
 
     if _try_edit_message(
@@ -2368,7 +2707,7 @@ def _export_and_send(bot: telebot.TeleBot, user_id: int) -> None:
     """
     try:
         xlsx = generate_user_report_xlsx(user_id)
-        stamp = datetime.now(APP_TZ).strftime('%Y%m%d_%H%M%S')
+        stamp = datetime.now(_user_tz(user_id)).strftime('%Y%m%d_%H%M%S')
         filename = f'Статистика_{stamp}.xlsx'
         bot.send_document(
             user_id,
@@ -0,0 +1,360 @@
+"""In-memory вид дня пользователя и кэш его отрисовки."""
+
+import itertools
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from db.repositories import RowData, fetch_day_snapshot
+
+log = logging.getLogger(__name__)
+
+DayKey = tuple[int, str]
+STATS_LOG_SECONDS = 300
+
+
+class DayViewStore:
+    """Ограниченный LRU-кэш данных дней для экрана статистики.
+
+    Снимок дня загружается одним запросом `fetch_day_snapshot` только при
+    промахе. Хранилище подписывается на изменения дня через
+    `add_day_change_listener`: каждая изменяющая функция репозитория
+    передаёт затронутую запись из `RETURNING` после фиксации транзакции, и
+    запись применяется к снимку в памяти, поэтому сохранение стоит одного
+    запроса без перечитывания дня, а запись из любого места кода, не
+    только из обработчиков, меняет версию дня. Разделы снимка заменяются
+    новыми списками, а не изменяются на месте, поэтому уже выданный снимок
+    можно читать без блокировки.
+
+    Каждая загрузка и каждое изменение дня присваивают ему новую версию из
+    общего счётчика, поэтому версия однозначно определяет содержимое дня и
+    служит ключом кэша отрисовки `DayRenderCache`.
+    """
+
+    def __init__(self, max_days: int) -> None:
+        """Создаёт пустой кэш.
+
+        Args:
+            max_days: Наибольшее число хранимых дней; `0` отключает кэш.
+        """
+        self._max_days = max_days
+        self._days: OrderedDict[DayKey, RowData] = OrderedDict()
+        self._versions: dict[DayKey, int] = {}
+        self._version_counter = itertools.count(1)
+        self._uncached_writes = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, date_iso: str) -> tuple[RowData, int | None]:
+        """Возвращает данные дня и их версию, загружая день при промахе.
+
+        Если во время загрузки изменился любой незакэшированный день,
+        загруженный снимок мог не увидеть это изменение, поэтому он
+        возвращается без сохранения в кэш.
+
+        Args:
+            user_id: Идентификатор пользователя Telegram.
+            date_iso: Дата в формате хранения.
+
+        Returns:
+            tuple[RowData, int | None]: Снимок дня в формате
+            `fetch_day_snapshot` и его версия; `None`, если снимок не
+            закэширован.
+        """
+        key = (user_id, date_iso)
+        with self._lock:
+            snapshot = self._days.get(key)
+            if snapshot is not None:
+                self._days.move_to_end(key)
+                return snapshot, self._versions[key]
+            writes_before = self._uncached_writes
+        snapshot = fetch_day_snapshot(user_id, date_iso)
+        if self._max_days <= 0:
+            return snapshot, None
+        with self._lock:
+            if self._uncached_writes != writes_before:
+                return snapshot, None
+            if key in self._days:
+                self._days.move_to_end(key)
+                return self._days[key], self._versions[key]
+            self._days[key] = snapshot
+            version = self._bump(key)
+            while len(self._days) > self._max_days:
+                evicted_key, _ = self._days.popitem(last=False)
+                del self._versions[evicted_key]
+        return snapshot, version
+
+    def _bump(self, key: DayKey) -> int:
+        """Присваивает закэшированному дню новую версию.
+
+        Вызывается под блокировкой.
+
+        Args:
+            key: Пользователь и дата.
+
+        Returns:
+            int: Новая версия дня.
+        """
+        version = next(self._version_counter)
+        self._versions[key] = version
+        return version
+
+    def _cached(self, key: DayKey) -> RowData | None:
+        """Возвращает закэшированный снимок для изменения.
+
+        Вызывается под блокировкой. Изменение незакэшированного дня
+        отмечается, чтобы параллельная загрузка не сохранила устаревший
+        снимок.
+
+        Args:
+            key: Пользователь и дата.
+
+        Returns:
+            RowData | None: Снимок дня или `None`.
+        """
+        snapshot = self._days.get(key)
+        if snapshot is None:
+            self._uncached_writes += 1
+        else:
+            self._bump(key)
+        return snapshot
+
+    def apply_change(
+        self,
+        user_id: int,
+        section: str,
+        row: RowData,
+        deleted: bool,
+    ) -> None:
+        """Применяет к виду дня зафиксированное изменение.
+
+        Подписчик `add_day_change_listener`. Запись с уже известным `id`
+        заменяется на месте, новая добавляется в конец раздела: разделы
+        упорядочены по времени создания.
+
+        Args:
+            user_id: Идентификатор пользователя Telegram.
+            section: Раздел снимка: `meals`, `medicines`, `stools`,
+                `feelings`, `water` или `sleep`.
+            row: Запись из `RETURNING` с ключом `date`; для воды — `date`
+                и `glasses_count`.
+            deleted: Удалена ли запись.
+        """
+        if section == 'water':
+            self._apply_water(user_id, row['date'], row['glasses_count'])
+        elif section == 'sleep':
+            self._apply_sleep(user_id, row)
+        elif deleted:
+            self._apply_forget(user_id, section, row)
+        else:
+            self._apply_record(user_id, section, row)
+
+    def _apply_record(self, user_id: int, section: str, row: RowData) -> None:
+        """Заменяет или добавляет запись в закэшированном дне.
+
+        Args:
+            user_id: Идентификатор пользователя Telegram.
+            section: Раздел снимка.
+            row: Запись из `RETURNING` с ключом `date`.
+        """
+        item = {key: value for key, value in row.items() if key != 'date'}
+        with self._lock:
+            snapshot = self._cached((user_id, row['date']))
+            if snapshot is None:
+                return
+            items = list(snapshot[section])
+            for index, existing in enumerate(items):
+                if existing['id'] == item['id']:
+                    items[index] = item
+                    break
+            else:
+                items.append(item)
+            snapshot[section] = items
+
+    def _apply_forget(self, user_id: int, section: str, row: RowData) -> None:
+        """Убирает запись из закэшированного дня.
+
+        Args:
+            user_id: Идентификатор пользователя Telegram.
+            section: Раздел снимка.
+            row: `id` и `date` удалённой записи.
+        """
+        with self._lock:
+            snapshot = self._cached((user_id, row['date']))
+            if snapshot is None:
+                return
+            snapshot[section] = [
+                item for item in snapshot[section] if item['id'] != row['id']
+            ]
+
+    def _apply_water(self, user_id: int, date_iso: str, glasses: int) -> None:
+        """Записывает количество стаканов в закэшированный день.
+
+        Args:
+            user_id: Идентификатор пользователя Telegram.
+            date_iso: Дата в формате хранения.
+            glasses: Сохранённое количество стаканов.
+        """
+        with self._lock:
+            snapshot = self._cached((user_id, date_iso))
+            if snapshot is not None:
+                snapshot['water'] = glasses
+
+    def _apply_sleep(self, user_id: int, row: RowData) -> None:
+        """Записывает запись сна в закэшированный день.
+
+        Args:
+            user_id: Идентификатор пользователя Telegram.
+            row: Запись сна из `RETURNING` с ключом `date`.
+        """
+        with self._lock:
+            snapshot = self._cached((user_id, row['date']))
+            if snapshot is not None:
+                snapshot['sleep'] = {
+                    key: value for key, value in row.items() if key != 'date'
+                }
+
+
+@dataclass(frozen=True)
+class RenderCacheStats:
+    """Счётчики кэша отрисовки.
+
+    Attributes:
+        hits: Отрисовки, взятые из кэша.
+        misses: Отрисовки, построенные заново.
+        evictions: Записи, вытесненные из-за лимита памяти.
+        entries: Текущее число записей.
+        size_bytes: Текущий объём хранимого текста.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size_bytes: int
+
+
+class DayRenderCache:
+    """LRU-кэш готового текста экрана дня с лимитом памяти.
+
+    Запись привязана к версии дня из `DayViewStore` и к признаку «сегодня»,
+    от которого зависят команды редактирования в тексте. Любое изменение
+    дня меняет его версию, поэтому устаревший текст никогда не отдаётся и
+    просто вытесняется со временем. Объём считается по `sys.getsizeof`
+    хранимых строк; при превышении `max_bytes` вытесняются давно не
+    использованные записи.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        """Создаёт пустой кэш.
+
+        Args:
+            max_bytes: Наибольший объём хранимого текста; `0` отключает кэш.
+        """
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[DayKey, tuple[int, bool, str]] = (
+            OrderedDict()
+        )
+        self._size_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._stats_logged_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        key: DayKey,
+        version: int | None,
+        is_today: bool,
+    ) -> str | None:
+        """Возвращает текст дня, если он отрисован для этой версии.
+
+        Args:
+            key: Пользователь и дата.
+            version: Версия дня из `DayViewStore.get`.
+            is_today: Отрисовывается ли день как сегодняшний.
+
+        Returns:
+            str | None: Готовый текст или `None` при промахе.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if (
+                version is not None
+                and entry is not None
+                and entry[:2] == (version, is_today)
+            ):
+                self._entries.move_to_end(key)
+                self._hits += 1
+                text = entry[2]
+            else:
+                self._misses += 1
+                text = None
+        self._log_stats()
+        return text
+
+    def put(
+        self,
+        key: DayKey,
+        version: int | None,
+        is_today: bool,
+        text: str,
+    ) -> None:
+        """Сохраняет отрисованный текст дня.
+
+        Args:
+            key: Пользователь и дата.
+            version: Версия дня, по которой построен текст; без версии
+                текст не кэшируется.
+            is_today: Отрисован ли день как сегодняшний.
+            text: Готовый текст.
+        """
+        size = sys.getsizeof(text)
+        if version is None or size > self._max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size_bytes -= sys.getsizeof(previous[2])
+            self._entries[key] = (version, is_today, text)
+            self._size_bytes += size
+            while self._size_bytes > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size_bytes -= sys.getsizeof(evicted[2])
+                self._evictions += 1
+
+    def stats(self) -> RenderCacheStats:
+        """Возвращает текущие счётчики кэша.
+
+        Returns:
+            RenderCacheStats: Попадания, промахи, вытеснения и объём.
+        """
+        with self._lock:
+            return RenderCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                size_bytes=self._size_bytes,
+            )
+
+    def _log_stats(self) -> None:
+        """Раз в `STATS_LOG_SECONDS` пишет в лог счётчики кэша."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._stats_logged_at < STATS_LOG_SECONDS:
+                return
+            self._stats_logged_at = now
+        stats = self.stats()
+        log.info(
+            'Day render cache: %s hits, %s misses, %s evictions, '
+            '%s entries, %s bytes',
+            stats.hits,
+            stats.misses,
+            stats.evictions,
+            stats.entries,
+            stats.size_bytes,
+        )
@@ -0,0 +1,408 @@
+"""Пул потоков доставки напоминаний из outbox с лимитами Telegram API."""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+
+from telebot.apihelper import ApiTelegramException
+
+from db.repositories import (RowData, RowsData, dead_letter_outbox_row,
+                             deactivate_user, get_next_outbox_delay,
+                             get_outbox_stats, lease_outbox_batch,
+                             mark_outbox_sent, retry_outbox_row)
+
+log = logging.getLogger(__name__)
+NotificationSender = Callable[[int, str], None]
+
+TOO_MANY_REQUESTS = 429
+BAD_REQUEST = 400
+FORBIDDEN = 403
+CHAT_NOT_FOUND = 'chat not found'
+DEFAULT_RETRY_AFTER_SECONDS = 1.0
+CHAT_LIMITER_PRUNE_THRESHOLD = 10_000
+STATS_LOG_SECONDS = 60
+MIN_IDLE_WAIT_SECONDS = 0.1
+
+
+class TokenBucket:
+    """Потокобезопасный token bucket для глобального лимита сообщений.
+
+    Токены пополняются со скоростью `rate` в секунду до `capacity`; при
+    ответе Telegram 429 выдача токенов приостанавливается целиком.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        """Создаёт заполненный bucket.
+
+        Args:
+            rate: Скорость пополнения, токенов в секунду.
+            capacity: Максимальный запас токенов; по умолчанию равен `rate`.
+        """
+        self._rate = rate
+        self._capacity = capacity if capacity is not None else rate
+        self._tokens = self._capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        """Начисляет токены за время с последнего обращения.
+
+        Args:
+            now: Текущее значение монотонных часов.
+        """
+        elapsed = now - self._updated_at
+        self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+        self._updated_at = now
+
+    def acquire(self) -> None:
+        """Блокирует поток, пока не удастся забрать один токен."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait_seconds = self._paused_until - now
+                if wait_seconds <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait_seconds = (1 - self._tokens) / self._rate
+            time.sleep(wait_seconds)
+
+    def pause(self, seconds: float) -> None:
+        """Приостанавливает выдачу токенов на заданное время.
+
+        Args:
+            seconds: Длительность паузы, например `retry_after` из ответа 429.
+        """
+        with self._lock:
+            self._paused_until = max(
+                self._paused_until,
+                time.monotonic() + seconds,
+            )
+            self._tokens = 0
+
+
+class ChatRateLimiter:
+    """Ограничивает частоту сообщений в один чат."""
+
+    def __init__(self, rate: float) -> None:
+        """Создаёт ограничитель без истории отправок.
+
+        Args:
+            rate: Допустимое число сообщений в секунду на один чат.
+        """
+        self._interval = 1 / rate
+        self._next_allowed_at: dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, chat_id: int) -> None:
+        """Блокирует поток до момента, когда в чат можно писать.
+
+        Args:
+            chat_id: Идентификатор чата Telegram.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if len(self._next_allowed_at) > CHAT_LIMITER_PRUNE_THRESHOLD:
+                self._next_allowed_at = {
+                    known_chat_id: allowed_at
+                    for known_chat_id, allowed_at
+                    in self._next_allowed_at.items()
+                    if allowed_at > now
+                }
+            allowed_at = max(now, self._next_allowed_at.get(chat_id, 0.0))
+            self._next_allowed_at[chat_id] = allowed_at + self._interval
+        if allowed_at > now:
+            time.sleep(allowed_at - now)
+
+
+def _retry_after_seconds(error: ApiTelegramException) -> float:
+    """Возвращает паузу из параметра `retry_after` ответа Telegram.
+
+    Args:
+        error: Исключение Telegram API с кодом 429.
+
+    Returns:
+        float: Длительность паузы в секундах.
+    """
+    result_json = error.result_json
+    if not isinstance(result_json, dict):
+        return DEFAULT_RETRY_AFTER_SECONDS
+    parameters = result_json.get('parameters') or {}
+    return float(
+        parameters.get('retry_after', DEFAULT_RETRY_AFTER_SECONDS),
+    )
+
+
+def _is_chat_unreachable(error: ApiTelegramException) -> bool:
+    """Проверяет, что бот больше не может писать пользователю.
+
+    Args:
+        error: Исключение Telegram API.
+
+    Returns:
+        bool: `True` для ответа 403 (бот заблокирован, пользователь удалён)
+        и ответа 400 `chat not found`.
+    """
+    if error.error_code == FORBIDDEN:
+        return True
+    return (
+        error.error_code == BAD_REQUEST
+        and CHAT_NOT_FOUND in str(error.description).lower()
+    )
+
+
+class ReminderDispatcher:
+    """Пул потоков, доставляющий напоминания из таблицы `notification_outbox`.
+
+    Планировщик только записывает напоминания в outbox, а рабочие потоки
+    забирают их пачками через `FOR UPDATE SKIP LOCKED`, соблюдают
+    глобальный и поканальный лимиты Telegram, откладывают строку при
+    ответе 429 на `retry_after`, при прочих ошибках повторяют отправку с
+    экспоненциальной паузой и после `max_retries` повторов переводят строку
+    в dead letter. Если пользователь заблокировал бота или чат не найден,
+    пользователь отключается, а все его ожидающие строки тем же запросом
+    уходят в dead letter. Потоки
+    разных процессов делят одну очередь.
+
+    Outbox одновременно служит очередью отложенных сообщений: отложенные
+    пользователем напоминания и повторные вопросы — строки со сроком
+    `available_at` в будущем. Частичный индекс по `available_at` отдаёт
+    ближайшую строку за O(log n), поэтому ожидание не сканирует очередь.
+    """
+
+    def __init__(
+        self,
+        senders: dict[str, NotificationSender],
+        workers: int,
+        global_rate: float,
+        chat_rate: float,
+        max_retries: int,
+        batch_size: int,
+        lease_seconds: int,
+        poll_seconds: int,
+        retry_base_seconds: int,
+        reask_minutes: int = 0,
+    ) -> None:
+        """Создаёт диспетчер без запущенных потоков.
+
+        Args:
+            senders: Функция отправки для каждого типа напоминания.
+            workers: Количество рабочих потоков отправки.
+            global_rate: Глобальный лимит сообщений в секунду.
+            chat_rate: Лимит сообщений в секунду на один чат.
+            max_retries: Количество повторов после ошибки отправки.
+            batch_size: Размер пачки строк outbox на поток.
+            lease_seconds: Время аренды пачки до её повторной выдачи.
+            poll_seconds: Пауза опроса пустого outbox.
+            retry_base_seconds: Пауза перед первым повтором, дальше она
+                удваивается.
+            reask_minutes: Через сколько минут повторить вопрос, если
+                пользователь не ответил; `0` — не повторять.
+        """
+        self._senders = senders
+        self._workers = workers
+        self._max_retries = max_retries
+        self._batch_size = batch_size
+        self._lease_seconds = lease_seconds
+        self._poll_seconds = poll_seconds
+        self._retry_base_seconds = retry_base_seconds
+        self._reask_minutes = reask_minutes
+        self._global_bucket = TokenBucket(global_rate)
+        self._chat_limiter = ChatRateLimiter(chat_rate)
+        self._wake_event = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._stats_logged_at = time.monotonic()
+
+    def start(self) -> None:
+        """Запускает рабочие потоки отправки."""
+        for worker_index in range(self._workers):
+            worker = threading.Thread(
+                target=self._work,
+                name=f'reminder-dispatcher-{worker_index}',
+            )
+            worker.daemon = True
+            worker.start()
+
+    def wake(self) -> None:
+        """Будит ожидающие потоки после записи новых строк в outbox."""
+        self._wake_event.set()
+
+    def deliver_available(self) -> int:
+        """Синхронно доставляет все уже доступные строки outbox.
+
+        Используется без рабочих потоков, например в симуляции
+        планировщика.
+
+        Returns:
+            int: Количество доставленных напоминаний.
+        """
+        delivered = 0
+        while True:
+            rows = lease_outbox_batch(self._batch_size, self._lease_seconds)
+            if not rows:
+                return delivered
+            delivered += self._deliver_batch(rows)
+
+    def _work(self) -> None:
+        """Бесконечно забирает пачки из outbox и доставляет их."""
+        while True:
+            try:
+                rows = lease_outbox_batch(
+                    self._batch_size,
+                    self._lease_seconds,
+                )
+                if rows:
+                    self._deliver_batch(rows)
+                self._log_stats()
+            except Exception:
+                log.exception('Reminder dispatcher error')
+                rows = []
+            if not rows:
+                self._wait_for_rows()
+
+    def _wait_for_rows(self) -> None:
+        """Ждёт, пока в outbox станет доступна следующая строка.
+
+        Вызывается, когда аренда вернула пустую пачку. Пауза не превышает
+        `poll_seconds`, но сокращается до момента, когда станет доступна
+        ближайшая отложенная строка, поэтому рассеянные по минуте
+        напоминания уходят точно в свою секунду. Нулевая пауза означает,
+        что доступные строки заняты другими потоками, поэтому она
+        увеличивается до `MIN_IDLE_WAIT_SECONDS`, чтобы потоки не крутились
+        вхолостую.
+        """
+        wait_seconds = self._poll_seconds
+        try:
+            next_delay = get_next_outbox_delay()
+        except Exception:
+            log.exception('Reminder dispatcher error')
+            next_delay = None
+        if next_delay is not None:
+            wait_seconds = min(wait_seconds, next_delay)
+        wait_seconds = max(wait_seconds, MIN_IDLE_WAIT_SECONDS)
+        if self._wake_event.wait(wait_seconds):
+            self._wake_event.clear()
+
+    def _deliver_batch(self, rows: RowsData) -> int:
+        """Отправляет пачку строк, отмечая каждую доставленную сразу.
+
+        Отметка о доставке и повторный вопрос записываются в момент
+        отправки, поэтому ответ пользователя, пришедший до конца пачки,
+        уже учитывается при постановке повтора. Оставшиеся строки
+        пользователя, отключённого при отправке, пропускаются: они уже
+        переведены в dead letter вместе с его отключением.
+
+        Args:
+            rows: Арендованные строки outbox.
+
+        Returns:
+            int: Количество доставленных строк.
+        """
+        delivered = 0
+        unreachable: set[int] = set()
+        for row in rows:
+            if row['user_id'] in unreachable:
+                continue
+            if self._deliver(row, unreachable):
+                mark_outbox_sent(row['id'], self._reask_minutes)
+                delivered += 1
+        return delivered
+
+    def _deliver(self, row: RowData, unreachable: set[int]) -> bool:
+        """Отправляет одно напоминание с учётом лимитов.
+
+        Args:
+            row: Строка outbox.
+            unreachable: Пользователи пачки, отключённые из-за ошибки
+                доставки; пополняется при такой ошибке.
+
+        Returns:
+            bool: `True`, если сообщение отправлено.
+        """
+        self._chat_limiter.acquire(row['user_id'])
+        self._global_bucket.acquire()
+        try:
+            self._senders[row['type']](
+                row['user_id'],
+                row['date'].isoformat(),
+            )
+        except ApiTelegramException as error:
+            if error.error_code == TOO_MANY_REQUESTS:
+                retry_after = _retry_after_seconds(error)
+                log.warning(
+                    'Telegram rate limit hit, retrying chat %s in %.1fs',
+                    row['user_id'],
+                    retry_after,
+                )
+                self._global_bucket.pause(retry_after)
+                retry_outbox_row(
+                    row['id'],
+                    retry_after,
+                    str(error),
+                    count_attempt=False,
+                )
+                return False
+            if _is_chat_unreachable(error):
+                log.info(
+                    'Deactivating user %s after delivery error: %s',
+                    row['user_id'],
+                    error.description,
+                )
+                deactivate_user(row['user_id'], error.description)
+                unreachable.add(row['user_id'])
+                return False
+            self._fail(row, error)
+            return False
+        except Exception as error:
+            self._fail(row, error)
+            return False
+        return True
+
+    def _fail(self, row: RowData, error: Exception) -> None:
+        """Откладывает строку для повтора или переводит её в dead letter.
+
+        Args:
+            row: Строка outbox, которую не удалось отправить.
+            error: Ошибка отправки.
+        """
+        if row['attempts'] >= self._max_retries:
+            log.error(
+                'Reminder %s for %s moved to dead letter: %s',
+                row['type'],
+                row['user_id'],
+                error,
+            )
+            dead_letter_outbox_row(row['id'], str(error))
+            return
+        delay_seconds = self._retry_base_seconds * 2 ** row['attempts']
+        log.warning(
+            'Failed to send reminder %s to %s, retrying in %ss: %s',
+            row['type'],
+            row['user_id'],
+            delay_seconds,
+            error,
+        )
+        retry_outbox_row(row['id'], delay_seconds, str(error))
+
+    def _log_stats(self) -> None:
+        """Раз в `STATS_LOG_SECONDS` логирует очередь и скорость отправки.
+        """
+        with self._stats_lock:
+            now = time.monotonic()
+            if now - self._stats_logged_at < STATS_LOG_SECONDS:
+                return
+            self._stats_logged_at = now
+        stats = get_outbox_stats()
+        if stats['pending'] or stats['sent_last_minute'] or stats['dead']:
+            log.info(
+                'Reminder outbox: %s pending, %s due (oldest %.0fs), '
+                '%s sent in the last minute, %s dead',
+                stats['pending'],
+                stats['due'],
+                stats['oldest_due_seconds'],
+                stats['sent_last_minute'],
+                stats['dead'],
+            )
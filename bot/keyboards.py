@@ -2,6 +2,8 @@
 
 from telebot.types import InlineKeyboardButton, InlineKeyboardMarkup
 
+SNOOZE_MINUTES: tuple[int, ...] = (15, 30, 60)
+
 
 def _build_markup(
     buttons: list[tuple[str, str]],
@@ -46,6 +48,33 @@ def back_to_main() -> InlineKeyboardMarkup:
     return _build_markup([('◀ Назад', 'back_to_main')], row_width=1)
 
 
+def reminder_menu(
+    notification_type: str,
+    date_iso: str,
+) -> InlineKeyboardMarkup:
+    """Возвращает клавиатуру напоминания с кнопками «напомнить позже».
+
+    Args:
+        notification_type: Тип напоминания (`breakfast`, `toilet`, ...).
+        date_iso: Дата напоминания в формате хранения `YYYY-MM-DD`.
+
+    Returns:
+        InlineKeyboardMarkup: Клавиатура с вариантами отсрочки и возвратом
+        в главное меню.
+    """
+    return _build_markup(
+        [
+            (
+                f'⏰ {minutes} мин',
+                f'snooze:{notification_type}:{minutes}:{date_iso}',
+            )
+            for minutes in SNOOZE_MINUTES
+        ]
+        + [('◀ Назад', 'back_to_main')],
+        row_width=3,
+    )
+
+
 def edit_timetable_menu() -> InlineKeyboardMarkup:
     """Возвращает клавиатуру редактирования времени напоминаний."""
     return _build_markup(
@@ -56,6 +85,7 @@ def edit_timetable_menu() -> InlineKeyboardMarkup:
             ('🚽 Туалет', 'set_time_toilet'),
             ('🌅 Подъём', 'set_time_wakeup'),
             ('🌙 Отход ко сну', 'set_time_bed'),
+            ('🌍 Часовой пояс', 'set_tz'),
             ('◀ Назад', 'back_to_main'),
         ]
     )
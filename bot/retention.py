@@ -0,0 +1,158 @@
+"""Фоновая очистка журнала напоминаний и завершённых строк outbox."""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from config import APP_TZ
+from db.repositories import (delete_finished_outbox_batch,
+                             delete_notification_log_batch)
+from db.schema import drop_partitions_before
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RetentionReport:
+    """Итог одного прохода очистки.
+
+    Attributes:
+        before_date: Первая сохранённая дата журнала или `None`, если
+            очистка журнала отключена.
+        partitions_dropped: Имена удалённых помесячных секций.
+        rows_deleted: Количество строк журнала, удалённых пачками.
+        batches: Количество выполненных пачек журнала.
+        outbox_rows_deleted: Количество удалённых строк outbox.
+        elapsed_seconds: Длительность прохода.
+    """
+
+    before_date: date | None
+    partitions_dropped: list[str]
+    rows_deleted: int
+    batches: int
+    outbox_rows_deleted: int
+    elapsed_seconds: float
+
+
+class NotificationRetention:
+    """Периодически удаляет устаревшие записи о напоминаниях.
+
+    Журнал `notifications_log` нужен только для дедупликации отправок в
+    пределах даты, поэтому старые записи лишь раздувают его уникальный
+    индекс. Если таблица секционирована, просроченные месяцы удаляются
+    целиком. Доставленные и мёртвые строки `notification_outbox` больше
+    не нужны очереди и удаляются через `outbox_retention_days` дней.
+    Оставшиеся старые строки удаляются пачками по `batch_size` с паузой
+    между ними, чтобы не держать долгие блокировки и не порождать всплеск
+    работы autovacuum.
+    """
+
+    def __init__(
+        self,
+        retention_days: int,
+        outbox_retention_days: int,
+        interval_seconds: int,
+        batch_size: int,
+        batch_pause_ms: int,
+    ) -> None:
+        """Создаёт задачу очистки без запущенного потока.
+
+        Args:
+            retention_days: Сколько последних дат хранить в журнале;
+                `0` — не очищать журнал.
+            outbox_retention_days: Сколько дней хранить завершённые строки
+                outbox; `0` — не очищать outbox.
+            interval_seconds: Пауза между проходами очистки.
+            batch_size: Наибольшее число строк в одном `DELETE`.
+            batch_pause_ms: Пауза между пачками в миллисекундах.
+        """
+        self._retention_days = retention_days
+        self._outbox_retention_days = outbox_retention_days
+        self._interval_seconds = interval_seconds
+        self._batch_size = batch_size
+        self._batch_pause_seconds = batch_pause_ms / 1000
+
+    def start(self) -> None:
+        """Запускает поток очистки, если хранение хоть чего-то ограничено."""
+        if self._retention_days <= 0 and self._outbox_retention_days <= 0:
+            return
+        worker = threading.Thread(
+            target=self._work,
+            name='notification-retention',
+        )
+        worker.daemon = True
+        worker.start()
+
+    def run_once(self, today: date | None = None) -> RetentionReport:
+        """Выполняет один проход очистки.
+
+        Args:
+            today: Текущая дата; по умолчанию — дата в `APP_TZ`.
+
+        Returns:
+            RetentionReport: Итог прохода.
+        """
+        started_at = time.monotonic()
+        before_date = None
+        partitions_dropped: list[str] = []
+        rows_deleted = 0
+        batches = 0
+        if self._retention_days > 0:
+            if today is None:
+                today = datetime.now(APP_TZ).date()
+            before_date = today - timedelta(days=self._retention_days)
+            partitions_dropped = drop_partitions_before(
+                'notifications_log',
+                before_date,
+            )
+            while True:
+                deleted = delete_notification_log_batch(
+                    before_date,
+                    self._batch_size,
+                )
+                rows_deleted += deleted
+                batches += 1
+                if deleted < self._batch_size:
+                    break
+                time.sleep(self._batch_pause_seconds)
+        outbox_rows_deleted = 0
+        if self._outbox_retention_days > 0:
+            while True:
+                deleted = delete_finished_outbox_batch(
+                    self._outbox_retention_days,
+                    self._batch_size,
+                )
+                outbox_rows_deleted += deleted
+                if deleted < self._batch_size:
+                    break
+                time.sleep(self._batch_pause_seconds)
+        return RetentionReport(
+            before_date=before_date,
+            partitions_dropped=partitions_dropped,
+            rows_deleted=rows_deleted,
+            batches=batches,
+            outbox_rows_deleted=outbox_rows_deleted,
+            elapsed_seconds=time.monotonic() - started_at,
+        )
+
+    def _work(self) -> None:
+        """Бесконечно выполняет проходы очистки с паузой между ними."""
+        while True:
+            try:
+                report = self.run_once()
+                log.info(
+                    'Notification retention before %s: '
+                    '%s log rows in %s batches, partitions dropped: %s, '
+                    '%s outbox rows, %.1fs',
+                    report.before_date or 'disabled',
+                    report.rows_deleted,
+                    report.batches,
+                    ', '.join(report.partitions_dropped) or 'none',
+                    report.outbox_rows_deleted,
+                    report.elapsed_seconds,
+                )
+            except Exception:
+                log.exception('Notification retention error')
+            time.sleep(self._interval_seconds)
@@ -1,134 +1,708 @@
 """Планировщик напоминаний бота по пользовательскому расписанию."""
 
 import logging
+import threading
 import time
-from collections.abc import Callable
-from datetime import datetime, timedelta
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
 
-from config import APP_TZ, DATE_FORMAT_STORAGE, SCHEDULER_TICK_SECONDS
-from db.repositories import (ensure_sleep_for_day, get_all_users,
-                             is_notification_sent, mark_notification_sent)
+import psycopg
+import pytz
+
+from bot.dispatcher import NotificationSender, ReminderDispatcher
+from bot.retention import NotificationRetention
+from bot.timing_wheel import MINUTES_PER_DAY, TimingWheel
+from config import (DATE_FORMAT_STORAGE, NOTIFICATION_LOG_RETENTION_DAYS,
+                    OUTBOX_BATCH_SIZE, OUTBOX_LEASE_SECONDS,
+                    OUTBOX_POLL_SECONDS, OUTBOX_RETENTION_DAYS,
+                    OUTBOX_RETRY_BASE_SECONDS,
+                    REMINDER_JITTER_SECONDS, REMINDER_MAX_RETRIES,
+                    REMINDER_REASK_MINUTES, REMINDER_WORKERS,
+                    RETENTION_BATCH_PAUSE_MS, RETENTION_BATCH_SIZE,
+                    RETENTION_INTERVAL_SECONDS, SCHEDULER_CATCHUP_MINUTES,
+                    SCHEDULER_FULL_RELOAD_SECONDS,
+                    SCHEDULER_REBALANCE_SECONDS, SCHEDULER_SHARDS,
+                    SCHEDULER_TICK_SECONDS, SCHEDULER_WORKERS,
+                    SLEEP_ROLLOVER_CATCHUP_DAYS, TELEGRAM_CHAT_RATE,
+                    TELEGRAM_GLOBAL_RATE)
+from db.connection import get_connection, open_listener
+from db.repositories import (TIMETABLE_CHANNEL, UserMinutes,
+                             enqueue_due_notifications,
+                             ensure_sleep_rows_for_dates, get_all_users,
+                             get_user_schedule, list_scheduler_members,
+                             register_scheduler_member,
+                             try_lock_shard, unlock_shard)
+from db.schema import ensure_event_partitions
 
 log = logging.getLogger(__name__)
-NotificationSender = Callable[[int], None]
+
+SLEEP_QUALITY_DELAY_MINUTES = 30
+MAX_IDLE_WAIT_SECONDS = 600
+WAKE_UP_MARGIN_SECONDS = 0.05
+LAG_WARNING_SECONDS = 5.0
+
+
+@dataclass(frozen=True)
+class DueWindow:
+    """Непрерывный отрезок минут одной даты для резервирования напоминаний.
+
+    Минуты считаются от местной полуночи, как они хранятся в расписании.
+
+    Attributes:
+        date_iso: Локальная дата отрезка в формате хранения.
+        first_minute: Первая минута отрезка.
+        last_minute: Последняя минута отрезка.
+        first_wakeup_minute: Время подъёма, соответствующее первой минуте
+            вопроса о качестве сна.
+        last_wakeup_minute: Время подъёма для последней минуты.
+        end_utc: Последняя минута отрезка в UTC.
+    """
+
+    date_iso: str
+    first_minute: int
+    last_minute: int
+    first_wakeup_minute: int
+    last_wakeup_minute: int
+    end_utc: datetime
 
 
-def _plus_minutes_hhmm(time_str: str, minutes: int) -> str:
-    """Сдвигает время `ЧЧ:ММ` на заданное число минут.
+def _reminder_minutes(times: UserMinutes) -> dict[str, int]:
+    """Возвращает минуты суток всех напоминаний пользователя.
 
     Args:
-        time_str: Базовое время в формате `ЧЧ:ММ`.
-        minutes: Количество минут для смещения.
+        times: Времена расписания пользователя из `users` в минутах от
+            полуночи.
 
     Returns:
-        str: Новое время в формате `ЧЧ:ММ`.
+        dict[str, int]: Минута отправки для каждого типа напоминания.
     """
-    base = datetime.strptime(time_str, '%H:%M')
-    shifted = base + timedelta(minutes=minutes)
-    return shifted.strftime('%H:%M')
+    breakfast, lunch, dinner, toilet, wakeup, _ = times
+    return {
+        'breakfast': breakfast,
+        'lunch': lunch,
+        'dinner': dinner,
+        'toilet': toilet,
+        'sleep_quality': (
+            wakeup + SLEEP_QUALITY_DELAY_MINUTES
+        ) % MINUTES_PER_DAY,
+    }
+
 
+def _due_windows(
+    last_processed_utc: datetime | None,
+    now_utc: datetime,
+    tz: pytz.BaseTzInfo,
+) -> list[DueWindow]:
+    """Разбивает необработанные минуты `(last_processed, now]` на отрезки.
 
-def _notify_once_per_day(
-    sender: NotificationSender,
-    user_id: int,
-    notification_type: str,
-    current_time: str,
-    scheduled_time: str,
-    date_iso: str,
-) -> None:
-    """Отправляет напоминание, если оно запланировано на текущую минуту.
+    Отрезок ограничен `SCHEDULER_CATCHUP_MINUTES` минутами назад от текущей
+    минуты и режется на границе локальной даты и там, где время подъёма для
+    вопроса о качестве сна переходит через полночь, чтобы каждый отрезок
+    был сплошным диапазоном минут.
 
     Args:
-        sender: Функция отправки уведомления конкретного типа.
-        user_id: Идентификатор пользователя Telegram.
-        notification_type: Тип события для журнала уведомлений.
-        current_time: Текущее время в формате `ЧЧ:ММ`.
-        scheduled_time: Плановое время уведомления в формате `ЧЧ:ММ`.
-        date_iso: Текущая дата в формате хранения `YYYY-MM-DD`.
+        last_processed_utc: Последняя обработанная минута в UTC или `None`
+            при первом запуске.
+        now_utc: Текущая минута в UTC.
+        tz: Часовой пояс, в котором считается местное время отрезков.
+
+    Returns:
+        list[DueWindow]: Отрезки в хронологическом порядке.
     """
-    if scheduled_time != current_time:
-        return
-    if is_notification_sent(user_id, notification_type, date_iso):
-        return
-    sender(user_id)
-    mark_notification_sent(user_id, notification_type, date_iso)
-
-
-def run_scheduler(
-    send_breakfast: NotificationSender,
-    send_lunch: NotificationSender,
-    send_dinner: NotificationSender,
-    send_toilet: NotificationSender,
-    send_sleep_quality: NotificationSender,
-) -> None:
-    """Запускает бесконечный цикл проверки и отправки напоминаний.
+    horizon_start = now_utc - timedelta(minutes=SCHEDULER_CATCHUP_MINUTES)
+    if last_processed_utc is None or last_processed_utc < horizon_start:
+        last_processed_utc = horizon_start
+
+    windows: list[DueWindow] = []
+    minute_utc = last_processed_utc + timedelta(minutes=1)
+    while minute_utc <= now_utc:
+        local_minute = minute_utc.astimezone(tz)
+        date_iso = local_minute.strftime(DATE_FORMAT_STORAGE)
+        current_minute = local_minute.hour * 60 + local_minute.minute
+        wakeup_minute = (
+            current_minute - SLEEP_QUALITY_DELAY_MINUTES
+        ) % MINUTES_PER_DAY
+        previous = windows[-1] if windows else None
+        if (
+            previous is not None
+            and previous.date_iso == date_iso
+            and previous.last_minute < current_minute
+            and previous.last_wakeup_minute < wakeup_minute
+        ):
+            windows[-1] = DueWindow(
+                date_iso=date_iso,
+                first_minute=previous.first_minute,
+                last_minute=current_minute,
+                first_wakeup_minute=previous.first_wakeup_minute,
+                last_wakeup_minute=wakeup_minute,
+                end_utc=minute_utc,
+            )
+        else:
+            windows.append(
+                DueWindow(
+                    date_iso=date_iso,
+                    first_minute=current_minute,
+                    last_minute=current_minute,
+                    first_wakeup_minute=wakeup_minute,
+                    last_wakeup_minute=wakeup_minute,
+                    end_utc=minute_utc,
+                )
+            )
+        minute_utc += timedelta(minutes=1)
+    return windows
+
+
+def _rollover_sleep_rows(
+    last_rollover_date: date | None,
+    today: date,
+    shard_count: int,
+    shards: set[int],
+    zones: list[str],
+) -> date | None:
+    """Создаёт записи сна пользователей за ещё не обработанные даты.
+
+    При первом запуске досоздаются записи за последние
+    `SLEEP_ROLLOVER_CATCHUP_DAYS` дней, дальше — за даты после последней
+    обработанной, поэтому пропуски из-за простоя закрываются автоматически.
+    Перед этим при секционированных таблицах событий заранее создаются
+    секции на ближайшие месяцы; ошибка этого шага только пишется в лог и
+    не мешает постановке напоминаний.
 
     Args:
-        send_breakfast: Отправка вопроса о завтраке.
-        send_lunch: Отправка вопроса об обеде.
-        send_dinner: Отправка вопроса об ужине.
-        send_toilet: Отправка вопроса о качестве стула.
-        send_sleep_quality: Отправка вопроса о качестве сна.
+        last_rollover_date: Последняя обработанная дата или `None`.
+        today: Текущая местная дата в часовых поясах `zones`.
+        shard_count: Общее число шардов пользователей.
+        shards: Шарды, пользователей которых нужно обработать.
+        zones: Часовые пояса с одинаковым текущим смещением UTC.
+
+    Returns:
+        date | None: Новая последняя обработанная дата.
     """
-    log.info('Scheduler started')
-    while True:
-        try:
-            now = datetime.now(APP_TZ)
-            current_time = now.strftime('%H:%M')
-            today_iso = now.strftime(DATE_FORMAT_STORAGE)
-
-            for (
-                user_id,
-                breakfast_time,
-                lunch_time,
-                dinner_time,
-                toilet_time,
-                wakeup_time,
-                _,
-            ) in get_all_users():
-                ensure_sleep_for_day(user_id, today_iso)
-                _notify_once_per_day(
-                    send_breakfast,
-                    user_id,
-                    'breakfast',
-                    current_time,
-                    breakfast_time,
-                    today_iso,
-                )
-                _notify_once_per_day(
-                    send_lunch,
-                    user_id,
-                    'lunch',
-                    current_time,
-                    lunch_time,
-                    today_iso,
-                )
-                _notify_once_per_day(
-                    send_dinner,
-                    user_id,
-                    'dinner',
-                    current_time,
-                    dinner_time,
-                    today_iso,
-                )
-                _notify_once_per_day(
-                    send_toilet,
-                    user_id,
-                    'toilet',
-                    current_time,
-                    toilet_time,
-                    today_iso,
-                )
-                sleep_quality_time = _plus_minutes_hhmm(wakeup_time, 30)
-                _notify_once_per_day(
-                    send_sleep_quality,
-                    user_id,
-                    'sleep_quality',
-                    current_time,
-                    sleep_quality_time,
-                    today_iso,
-                )
-        except Exception:
-            log.exception('Scheduler loop error')
+    if last_rollover_date is None:
+        first_date = today - timedelta(days=SLEEP_ROLLOVER_CATCHUP_DAYS)
+    else:
+        first_date = last_rollover_date + timedelta(days=1)
+    if first_date > today:
+        return last_rollover_date
+
+    try:
+        created_partitions = ensure_event_partitions(today)
+    except Exception:
+        log.exception('Event table partition maintenance error')
+    else:
+        if created_partitions:
+            log.info(
+                'Event table partitions created: %s',
+                created_partitions,
+            )
+    created_rows = ensure_sleep_rows_for_dates(
+        first_date.strftime(DATE_FORMAT_STORAGE),
+        today.strftime(DATE_FORMAT_STORAGE),
+        shard_count,
+        shards,
+        zones,
+    )
+    log.info(
+        'Sleep rows rolled over for %s..%s in %s: %s created',
+        first_date,
+        today,
+        ', '.join(zones),
+        created_rows,
+    )
+    return today
+
+
+def _fair_share(shard_count: int, members: list[int], member: int) -> int:
+    """Возвращает число шардов, которое должно принадлежать участнику.
+
+    Args:
+        shard_count: Общее число шардов.
+        members: Отсортированные идентификаторы живых участников.
+        member: Идентификатор участника.
+
+    Returns:
+        int: Доля участника; в сумме доли всех участников равны
+        `shard_count`.
+    """
+    if member not in members:
+        return shard_count
+    base_share, remainder = divmod(shard_count, len(members))
+    return base_share + (1 if members.index(member) < remainder else 0)
+
+
+class ReminderScheduler:
+    """Планировщик напоминаний на основе суточного колеса времени.
+
+    Расписания всех пользователей один раз загружаются в `TimingWheel`, а
+    дальше колесо обновляется точечно по уведомлениям `LISTEN/NOTIFY`,
+    которые репозиторий отправляет при регистрации и смене расписания.
+    Цикл спит до ближайшего события, и минуты без напоминаний не стоят ни
+    одного запроса к БД.
+
+    Для каждого часового пояса пользователей ведётся своё колесо в
+    местных минутах. На шаге пояса группируются по текущему смещению UTC:
+    у пояса с одинаковым смещением совпадают местные время и дата, поэтому
+    отрезок минут резервируется одним запросом на группу, а не на
+    пользователя или пояс.
+
+    Пользователи делятся на шарды по `user_id % shard_count`. Владение
+    шардом — сессионная advisory-блокировка на подключении подписки:
+    каждый участник периодически берёт свободные шарды до своей доли и
+    отдаёт лишние, а шарды упавшего участника освобождаются вместе с его
+    подключением и переходят к живым. Записи сна при смене местной даты
+    каждый участник создаёт для пользователей своих шардов.
+
+    Attributes:
+        last_lag_seconds: Задержка последнего шага относительно срока
+            пробуждения, выбранного при ожидании.
+        max_lag_seconds: Наибольшая задержка шага с момента запуска.
+    """
+
+    def __init__(
+        self,
+        dispatcher: ReminderDispatcher,
+        shard_count: int = 1,
+    ) -> None:
+        """Создаёт планировщик без загруженного расписания.
+
+        Args:
+            dispatcher: Пул отправки напоминаний.
+            shard_count: Общее число шардов пользователей.
+        """
+        self._dispatcher = dispatcher
+        self._shard_count = shard_count
+        self._shards: set[int] = set()
+        self._rebalance_at = 0.0
+        self._reload_at = 0.0
+        self._wheels: dict[str, TimingWheel] = {}
+        self._user_zones: dict[int, str] = {}
+        self._listener: psycopg.Connection | None = None
+        self._member: psycopg.Connection | None = None
+        self._rollover_dates: dict[str, date] = {}
+        self._last_processed_utc: datetime | None = None
+        self._wake_at_utc: datetime | None = None
+        self.last_lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+
+    def run(self) -> None:
+        """Бесконечно обрабатывает наступившие минуты и ждёт следующих."""
+        log.info('Scheduler started')
+        while True:
+            try:
+                if self._listener is None:
+                    self._open_listener()
+                if time.monotonic() >= self._rebalance_at:
+                    self._rebalance()
+                if self._shards and time.monotonic() >= self._reload_at:
+                    self._load_timetables()
+                self._tick(datetime.now(timezone.utc))
+                self._wait_for_next_event()
+            except Exception:
+                log.exception('Scheduler loop error')
+                self._close_listener()
+                time.sleep(SCHEDULER_TICK_SECONDS)
+
+    def _open_listener(self) -> None:
+        """Подписывается на изменения расписаний и регистрирует участника.
+
+        Подписка оформляется до чтения расписаний, чтобы не потерять
+        изменения, сделанные во время загрузки. Участник и его шарды
+        держатся на отдельном подключении: запросы перебалансировки на
+        подключении `LISTEN` могли бы забрать уведомление мимо
+        `notifies()`.
+        """
+        self._listener = open_listener(TIMETABLE_CHANNEL)
+        self._member = get_connection()
+        self._member.autocommit = True
+        self._shards.clear()
+        self._clear_wheels()
+        self._rebalance_at = 0.0
+        with self._member.cursor() as cursor:
+            register_scheduler_member(cursor)
+
+    def _close_listener(self) -> None:
+        """Закрывает подписку, освобождая шарды для других участников.
+        """
+        self._shards.clear()
+        connections = (self._listener, self._member)
+        self._listener = None
+        self._member = None
+        for connection in connections:
+            if connection is None:
+                continue
+            try:
+                connection.close()
+            except Exception:
+                log.exception('Scheduler connection close error')
 
-        time.sleep(SCHEDULER_TICK_SECONDS)
+    def _owns(self, user_id: int) -> bool:
+        """Проверяет, относится ли пользователь к шардам этого участника.
+
+        Args:
+            user_id: Идентификатор пользователя Telegram.
+
+        Returns:
+            bool: `True`, если шард пользователя принадлежит участнику.
+        """
+        return user_id % self._shard_count in self._shards
+
+    def _rebalance(self) -> None:
+        """Доводит число своих шардов до справедливой доли.
+
+        Шарды делятся между участниками поровну, а остаток достаётся
+        участникам с меньшим `pid`: лишние шарды освобождаются, недостающие
+        берутся из свободных без ожидания. При изменении набора шардов
+        колёса загружаются заново, а обработка минут откатывается на
+        глубину догоняющего окна, чтобы подхватить напоминания, которые не
+        успел отправить прежний владелец.
+        """
+        self._rebalance_at = time.monotonic() + SCHEDULER_REBALANCE_SECONDS
+        with self._member.cursor() as cursor:
+            members = list_scheduler_members(cursor)
+            fair_share = _fair_share(
+                self._shard_count,
+                members,
+                self._member.info.backend_pid,
+            )
+            released = sorted(self._shards, reverse=True)[
+                :max(0, len(self._shards) - fair_share)
+            ]
+            for shard in released:
+                unlock_shard(cursor, shard)
+                self._shards.discard(shard)
+            acquired: list[int] = []
+            for shard in range(self._shard_count):
+                if len(self._shards) >= fair_share:
+                    break
+                if shard not in self._shards and try_lock_shard(
+                    cursor,
+                    shard,
+                ):
+                    self._shards.add(shard)
+                    acquired.append(shard)
+        if not released and not acquired:
+            return
+        log.info(
+            'Scheduler shards rebalanced: owns %s, acquired %s, released %s',
+            sorted(self._shards),
+            acquired,
+            released,
+        )
+        if acquired:
+            self._last_processed_utc = None
+            self._rollover_dates.clear()
+        self._load_timetables()
+
+    def _clear_wheels(self) -> None:
+        """Удаляет все загруженные расписания."""
+        self._wheels.clear()
+        self._user_zones.clear()
+
+    def _set_user(self, user_id: int, times: UserMinutes, zone: str) -> None:
+        """Помещает расписание пользователя в колесо его часового пояса.
+
+        Args:
+            user_id: Идентификатор пользователя Telegram.
+            times: Времена расписания пользователя.
+            zone: Часовой пояс пользователя.
+        """
+        self._remove_user(user_id)
+        self._wheels.setdefault(zone, TimingWheel()).set_user(
+            user_id,
+            _reminder_minutes(times),
+        )
+        self._user_zones[user_id] = zone
+
+    def _remove_user(self, user_id: int) -> None:
+        """Удаляет пользователя из колеса, убирая опустевшие колёса.
+
+        Args:
+            user_id: Идентификатор пользователя Telegram.
+        """
+        zone = self._user_zones.pop(user_id, None)
+        if zone is None:
+            return
+        wheel = self._wheels[zone]
+        wheel.remove_user(user_id)
+        if not len(wheel):
+            del self._wheels[zone]
+
+    def _load_timetables(self) -> None:
+        """Загружает в колёса расписания пользователей своих шардов.
+
+        Кроме смены шардов загрузка повторяется раз в
+        `SCHEDULER_FULL_RELOAD_SECONDS` и исправляет колёса, если
+        уведомление об изменении расписания было пропущено.
+        """
+        self._reload_at = time.monotonic() + SCHEDULER_FULL_RELOAD_SECONDS
+        self._clear_wheels()
+        for user_id, *times, zone in get_all_users():
+            if self._owns(user_id):
+                self._set_user(user_id, tuple(times), zone)
+        log.info(
+            'Scheduler loaded %s reminder events in %s time zones',
+            sum(len(wheel) for wheel in self._wheels.values()),
+            len(self._wheels),
+        )
+
+    def _reload_user(self, user_id: int) -> None:
+        """Перечитывает расписание одного пользователя в колесо.
+
+        Args:
+            user_id: Идентификатор пользователя Telegram.
+        """
+        if not self._owns(user_id):
+            return
+        schedule = get_user_schedule(user_id)
+        if schedule is None:
+            self._remove_user(user_id)
+            return
+        _, *times, zone = schedule
+        self._set_user(user_id, tuple(times), zone)
+
+    def _zone_buckets(self, now_utc: datetime) -> list[list[str]]:
+        """Группирует часовые пояса пользователей по текущему смещению UTC.
+
+        Args:
+            now_utc: Текущее время в UTC.
+
+        Returns:
+            list[list[str]]: Группы поясов с одинаковым смещением.
+        """
+        buckets: dict[timedelta, list[str]] = {}
+        for zone in sorted(self._wheels):
+            offset = now_utc.astimezone(pytz.timezone(zone)).utcoffset()
+            buckets.setdefault(offset, []).append(zone)
+        return list(buckets.values())
+
+    def _tick(self, now: datetime) -> None:
+        """Создаёт записи сна и резервирует напоминания наступивших минут.
+
+        Args:
+            now: Текущее время в UTC.
+        """
+        now_utc = now.replace(second=0, microsecond=0)
+        if self._wake_at_utc is not None:
+            self._record_lag(now - self._wake_at_utc)
+            self._wake_at_utc = None
+        for zones in self._zone_buckets(now_utc):
+            tz = pytz.timezone(zones[0])
+            self._rollover_bucket(zones, now_utc.astimezone(tz).date())
+            for window in _due_windows(self._last_processed_utc, now_utc, tz):
+                if any(
+                    self._wheels[zone].has_events_between(
+                        window.first_minute,
+                        window.last_minute,
+                    )
+                    for zone in zones
+                ):
+                    self._enqueue_window(window, zones)
+        if self._last_processed_utc is None or (
+            now_utc > self._last_processed_utc
+        ):
+            self._last_processed_utc = now_utc
+
+    def _rollover_bucket(self, zones: list[str], today: date) -> None:
+        """Создаёт записи сна группы поясов, если в ней сменилась дата.
+
+        Args:
+            zones: Часовые пояса с одинаковым текущим смещением UTC.
+            today: Текущая местная дата группы.
+        """
+        if all(self._rollover_dates.get(zone) == today for zone in zones):
+            return
+        known_dates = [self._rollover_dates.get(zone) for zone in zones]
+        last_rollover_date = (
+            None if None in known_dates else min(known_dates)
+        )
+        rollover_date = _rollover_sleep_rows(
+            last_rollover_date,
+            today,
+            self._shard_count,
+            self._shards,
+            zones,
+        )
+        for zone in zones:
+            self._rollover_dates[zone] = rollover_date
+
+    def _enqueue_window(self, window: DueWindow, zones: list[str]) -> None:
+        """Ставит напоминания отрезка в outbox и будит пул отправки.
+
+        Args:
+            window: Отрезок минут одной местной даты.
+            zones: Часовые пояса, в которых задан отрезок.
+        """
+        if enqueue_due_notifications(
+            window.date_iso,
+            window.first_minute,
+            window.last_minute,
+            window.first_wakeup_minute,
+            window.last_wakeup_minute,
+            self._shard_count,
+            self._shards,
+            REMINDER_JITTER_SECONDS,
+            zones,
+        ):
+            self._dispatcher.wake()
+
+    def _record_lag(self, lag: timedelta) -> None:
+        """Запоминает задержку шага и предупреждает о больших задержках.
+
+        Args:
+            lag: Время от выбранного срока пробуждения до шага.
+        """
+        self.last_lag_seconds = max(0.0, lag.total_seconds())
+        self.max_lag_seconds = max(
+            self.max_lag_seconds,
+            self.last_lag_seconds,
+        )
+        if self.last_lag_seconds > LAG_WARNING_SECONDS:
+            log.warning(
+                'Scheduler is %.1fs behind schedule',
+                self.last_lag_seconds,
+            )
+
+    def _next_event_utc(self, now_utc: datetime) -> datetime:
+        """Возвращает начало минуты ближайшего события или смены даты.
+
+        Ближайшее событие ищется в колёсах всех часовых поясов по их
+        местному времени.
+
+        Args:
+            now_utc: Текущее время в UTC.
+
+        Returns:
+            datetime: Начало минуты пробуждения в UTC, не позже чем через
+            сутки.
+        """
+        minutes_ahead = MINUTES_PER_DAY
+        for zone, wheel in self._wheels.items():
+            local_now = now_utc.astimezone(pytz.timezone(zone))
+            minute = local_now.hour * 60 + local_now.minute
+            minutes_ahead = min(minutes_ahead, MINUTES_PER_DAY - minute)
+            next_event = wheel.minutes_until_next(minute)
+            if next_event is not None:
+                minutes_ahead = min(minutes_ahead, next_event)
+        return now_utc.replace(second=0, microsecond=0) + timedelta(
+            minutes=minutes_ahead,
+        )
+
+    def _seconds_until_next_event(self) -> float:
+        """Возвращает паузу до ближайшего события или смены даты.
+
+        Пауза отсчитывается до начала нужной минуты с небольшим запасом,
+        поэтому шаги привязаны к границам минут и не накапливают сдвиг.
+
+        Returns:
+            float: Длительность ожидания в секундах, не больше
+            `MAX_IDLE_WAIT_SECONDS` и не дальше следующей перебалансировки
+            шардов или полной перезагрузки расписаний.
+        """
+        now_utc = datetime.now(timezone.utc)
+        wake_at = self._next_event_utc(now_utc)
+        seconds = (wake_at - now_utc).total_seconds() + WAKE_UP_MARGIN_SECONDS
+        seconds = min(seconds, self._rebalance_at - time.monotonic())
+        if self._shards:
+            seconds = min(seconds, self._reload_at - time.monotonic())
+        return max(0.0, min(seconds, MAX_IDLE_WAIT_SECONDS))
+
+    def _wait_for_next_event(self) -> None:
+        """Ждёт ближайшего события, обновляя колесо по уведомлениям.
+
+        Срок пробуждения хранится по монотонным часам, поэтому обработка
+        уведомлений не сдвигает его. Если обновлённое расписание добавило
+        более раннее событие, срок переносится на него.
+        """
+        deadline = self._set_wake_deadline(self._seconds_until_next_event())
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            for notify in self._listener.notifies(
+                timeout=remaining,
+                stop_after=1,
+            ):
+                self._reload_user(int(notify.payload))
+                seconds = self._seconds_until_next_event()
+                if time.monotonic() + seconds < deadline:
+                    deadline = self._set_wake_deadline(seconds)
+
+    def _set_wake_deadline(self, seconds: float) -> float:
+        """Запоминает срок пробуждения, от которого считается задержка.
+
+        Задержка шага отсчитывается от этого срока, а не от последней
+        обработанной минуты, поэтому сон между событиями не считается
+        отставанием.
+
+        Args:
+            seconds: Пауза до пробуждения в секундах.
+
+        Returns:
+            float: Срок пробуждения по монотонным часам.
+        """
+        self._wake_at_utc = datetime.now(timezone.utc) + timedelta(
+            seconds=seconds,
+        )
+        return time.monotonic() + seconds
+
+
+def run_scheduler(senders: dict[str, NotificationSender]) -> None:
+    """Запускает бесконечный цикл проверки и отправки напоминаний.
+
+    Планировщик просыпается к ближайшему событию суточного колеса и
+    обрабатывает все минуты после последней обработанной (не дальше
+    `SCHEDULER_CATCHUP_MINUTES` назад): одним запросом на отрезок
+    резервируются пары `(пользователь, тип)`, ещё не отправленные за дату.
+    Поэтому задержка шага или перезапуск процесса не теряют напоминания.
+    Зарезервированные напоминания тем же запросом ставятся в outbox, откуда
+    их доставляет пул отправки, и шаг не ждёт ответов Telegram. Вопрос о
+    качестве сна задаётся через `SLEEP_QUALITY_DELAY_MINUTES` минут после
+    времени подъёма. Время напоминаний и даты считаются в часовом поясе
+    каждого пользователя. Записи сна на новую дату создаются один раз при
+    смене местной даты.
+    Вопрос без ответа повторяется через `REMINDER_REASK_MINUTES` минут,
+    если повтор включён. Отдельный поток удаляет из журнала напоминаний
+    записи старше `NOTIFICATION_LOG_RETENTION_DAYS` дней, а из outbox —
+    завершённые строки старше `OUTBOX_RETENTION_DAYS` дней.
+
+    Запускается `SCHEDULER_WORKERS` участников, которые делят между собой
+    `SCHEDULER_SHARDS` шардов пользователей вместе с участниками других
+    процессов, подключённых к той же БД. Процессы без polling запускаются
+    через `run_reminders` в `bot/app.py`.
+
+    Args:
+        senders: Функции отправки вопросов по типу напоминания
+            (`breakfast`, `lunch`, `dinner`, `toilet`, `sleep_quality`).
+    """
+    dispatcher = ReminderDispatcher(
+        senders=senders,
+        workers=REMINDER_WORKERS,
+        global_rate=TELEGRAM_GLOBAL_RATE,
+        chat_rate=TELEGRAM_CHAT_RATE,
+        max_retries=REMINDER_MAX_RETRIES,
+        batch_size=OUTBOX_BATCH_SIZE,
+        lease_seconds=OUTBOX_LEASE_SECONDS,
+        poll_seconds=OUTBOX_POLL_SECONDS,
+        retry_base_seconds=OUTBOX_RETRY_BASE_SECONDS,
+        reask_minutes=REMINDER_REASK_MINUTES,
+    )
+    dispatcher.start()
+    NotificationRetention(
+        retention_days=NOTIFICATION_LOG_RETENTION_DAYS,
+        outbox_retention_days=OUTBOX_RETENTION_DAYS,
+        interval_seconds=RETENTION_INTERVAL_SECONDS,
+        batch_size=RETENTION_BATCH_SIZE,
+        batch_pause_ms=RETENTION_BATCH_PAUSE_MS,
+    ).start()
+    schedulers = [
+        ReminderScheduler(dispatcher, SCHEDULER_SHARDS)
+        for _ in range(SCHEDULER_WORKERS)
+    ]
+    for worker_index, scheduler in enumerate(schedulers[1:], start=1):
+        worker = threading.Thread(
+            target=scheduler.run,
+            name=f'reminder-scheduler-{worker_index}',
+        )
+        worker.daemon = True
+        worker.start()
+    schedulers[0].run()
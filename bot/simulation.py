@@ -0,0 +1,628 @@
+"""Симуляция суток работы планировщика на синтетических пользователях.
+
+Модуль наполняет локальную PostgreSQL синтетическими пользователями,
+прогоняет `ReminderScheduler` по виртуальным часам через целые сутки и
+доставляет напоминания заглушкой вместо Telegram. Отчёт показывает
+задержку шагов, число запросов к БД на шаг, отправки по минутам и
+пропущенные напоминания.
+
+Запуск на отдельной базе (в `.env` или окружении): ::
+
+    python -m bot.simulation --users 10000 --zones Europe/Moscow Asia/Omsk
+"""
+
+import argparse
+import logging
+import math
+import random
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+
+import psycopg
+import pytz
+
+from bot.dispatcher import NotificationSender, ReminderDispatcher
+from bot.scheduler import (MAX_IDLE_WAIT_SECONDS, SLEEP_QUALITY_DELAY_MINUTES,
+                           ReminderScheduler)
+from bot.timing_wheel import MINUTES_PER_DAY
+from bot.validators import validate_timezone
+from config import (APP_TZ, DATE_FORMAT_STORAGE, OUTBOX_BATCH_SIZE,
+                    OUTBOX_LEASE_SECONDS, SCHEDULER_REBALANCE_SECONDS,
+                    SCHEDULER_SHARDS, TZ_NAME)
+from db.connection import close_pool, with_db
+from db.repositories import UserScheduleRow, get_next_outbox_delay
+from db.schema import init_db
+
+SYNTHETIC_USER_ID_BASE = 10 ** 18
+SIMULATION_SEND_RATE = 1_000_000.0
+
+TIMETABLE_PROFILE: tuple[tuple[int, int], ...] = (
+    (8 * 60, 40),
+    (13 * 60, 45),
+    (19 * 60, 60),
+    (9 * 60, 90),
+    (7 * 60, 60),
+    (23 * 60, 60),
+)
+DEFAULT_TIMETABLE_SHARE = 0.3
+ROUNDED_TIME_SHARE = 0.5
+ROUNDED_TIME_STEP_MINUTES = 15
+
+ReminderKey = tuple[int, str, str]
+
+
+def _synthetic_time(rng: random.Random, mean: int, sigma: int) -> int:
+    """Выбирает время слота расписания по нормальному распределению.
+
+    Часть времён округляется до `ROUNDED_TIME_STEP_MINUTES`, как это
+    обычно делают люди, поэтому на круглые минуты приходятся всплески.
+
+    Args:
+        rng: Генератор случайных чисел симуляции.
+        mean: Среднее время слота в минутах суток.
+        sigma: Стандартное отклонение в минутах.
+
+    Returns:
+        int: Минута суток.
+    """
+    minute = round(rng.gauss(mean, sigma))
+    if rng.random() < ROUNDED_TIME_SHARE:
+        minute = (
+            round(minute / ROUNDED_TIME_STEP_MINUTES)
+            * ROUNDED_TIME_STEP_MINUTES
+        )
+    return minute % MINUTES_PER_DAY
+
+
+def generate_users(
+    count: int,
+    zones: list[str],
+    seed: int,
+) -> list[UserScheduleRow]:
+    """Создаёт расписания синтетических пользователей.
+
+    `DEFAULT_TIMETABLE_SHARE` пользователей оставляют расписание по
+    умолчанию, остальные разбросаны вокруг него. Часовые поясы
+    распределяются по пользователям поровну.
+
+    Args:
+        count: Количество пользователей.
+        zones: Часовые пояса пользователей.
+        seed: Зерно генератора, чтобы прогоны были воспроизводимы.
+
+    Returns:
+        list[UserScheduleRow]: Расписания с идентификаторами от
+        `SYNTHETIC_USER_ID_BASE`.
+    """
+    rng = random.Random(seed)
+    users: list[UserScheduleRow] = []
+    for index in range(count):
+        if rng.random() < DEFAULT_TIMETABLE_SHARE:
+            times = [mean for mean, _ in TIMETABLE_PROFILE]
+        else:
+            times = [
+                _synthetic_time(rng, mean, sigma)
+                for mean, sigma in TIMETABLE_PROFILE
+            ]
+        users.append(
+            (
+                SYNTHETIC_USER_ID_BASE + index,
+                *times,
+                zones[index % len(zones)],
+            )
+        )
+    return users
+
+
+def expected_reminders(
+    users: list[UserScheduleRow],
+    start_utc: datetime,
+    end_utc: datetime,
+) -> set[ReminderKey]:
+    """Считает напоминания, которые должны уйти за минуты `[start, end]`.
+
+    Расчёт не использует код планировщика, чтобы сверка ловила его ошибки.
+
+    Args:
+        users: Расписания пользователей.
+        start_utc: Первая минута симуляции в UTC.
+        end_utc: Последняя минута симуляции в UTC.
+
+    Returns:
+        set[ReminderKey]: Тройки `(user_id, тип, местная дата)`.
+    """
+    dates_by_minute: dict[str, dict[int, set[str]]] = {}
+    for zone in {user[-1] for user in users}:
+        tz = pytz.timezone(zone)
+        zone_minutes: dict[int, set[str]] = {}
+        minute_utc = start_utc
+        while minute_utc <= end_utc:
+            local_minute = minute_utc.astimezone(tz)
+            zone_minutes.setdefault(
+                local_minute.hour * 60 + local_minute.minute,
+                set(),
+            ).add(local_minute.strftime(DATE_FORMAT_STORAGE))
+            minute_utc += timedelta(minutes=1)
+        dates_by_minute[zone] = zone_minutes
+
+    expected: set[ReminderKey] = set()
+    for user_id, breakfast, lunch, dinner, toilet, wakeup, _, zone in users:
+        reminder_minutes = {
+            'breakfast': breakfast,
+            'lunch': lunch,
+            'dinner': dinner,
+            'toilet': toilet,
+            'sleep_quality': (
+                wakeup + SLEEP_QUALITY_DELAY_MINUTES
+            ) % MINUTES_PER_DAY,
+        }
+        for notification_type, minute in reminder_minutes.items():
+            for date_iso in dates_by_minute[zone].get(minute, ()):
+                expected.add((user_id, notification_type, date_iso))
+    return expected
+
+
+class QueryCounter:
+    """Считает SQL-команды, выполненные через `psycopg.Cursor.execute`."""
+
+    def __init__(self) -> None:
+        """Создаёт счётчик с нулевым значением."""
+        self.count = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def installed(self) -> Iterator[None]:
+        """Подменяет на время блока `psycopg.Cursor.execute` обёрткой.
+
+        Yields:
+            None: Управление передаётся в тело блока.
+        """
+        original_execute = psycopg.Cursor.execute
+
+        def execute(cursor: psycopg.Cursor, *args, **kwargs):
+            """Увеличивает счётчик и выполняет исходную команду.
+
+            Args:
+                cursor: Курсор PostgreSQL.
+                *args: Позиционные аргументы `execute`.
+                **kwargs: Именованные аргументы `execute`.
+
+            Returns:
+                psycopg.Cursor: Результат исходного `execute`.
+            """
+            with self._lock:
+                self.count += 1
+            return original_execute(cursor, *args, **kwargs)
+
+        psycopg.Cursor.execute = execute
+        try:
+            yield
+        finally:
+            psycopg.Cursor.execute = original_execute
+
+
+class StubSender:
+    """Заглушка отправки, запоминающая напоминания вместо Telegram.
+
+    Attributes:
+        now_utc: Текущая минута виртуальных часов.
+        sent: Доставленные напоминания в порядке отправки.
+        sent_per_minute: Количество отправок по минутам виртуальных часов.
+    """
+
+    def __init__(self) -> None:
+        """Создаёт заглушку без отправок."""
+        self.now_utc: datetime | None = None
+        self.sent: list[ReminderKey] = []
+        self.sent_per_minute: Counter[datetime] = Counter()
+
+    def sender(self, notification_type: str) -> NotificationSender:
+        """Возвращает функцию отправки напоминания указанного типа.
+
+        Args:
+            notification_type: Тип напоминания.
+
+        Returns:
+            NotificationSender: Функция, записывающая отправку.
+        """
+
+        def send(user_id: int, date_iso: str) -> None:
+            """Записывает отправку напоминания.
+
+            Args:
+                user_id: Идентификатор пользователя.
+                date_iso: Дата напоминания в формате хранения.
+            """
+            self.sent.append((user_id, notification_type, date_iso))
+            self.sent_per_minute[self.now_utc] += 1
+
+        return send
+
+
+class SimulatedScheduler(ReminderScheduler):
+    """Планировщик, шаги которого задают виртуальные часы симуляции."""
+
+    def start(self, start_utc: datetime) -> None:
+        """Берёт шарды, загружает расписания и начинает отсчёт с минуты.
+
+        Args:
+            start_utc: Первая минута симуляции в UTC.
+        """
+        self._open_listener()
+        self._rebalance()
+        self._last_processed_utc = start_utc - timedelta(minutes=1)
+
+    def stop(self) -> None:
+        """Освобождает шарды и закрывает подписку."""
+        self._close_listener()
+
+    def tick(self, now_utc: datetime) -> None:
+        """Выполняет один шаг планировщика на виртуальную минуту.
+
+        Args:
+            now_utc: Виртуальное время шага в UTC.
+        """
+        self._tick(now_utc)
+
+    def next_event_utc(self, now_utc: datetime) -> datetime:
+        """Возвращает минуту, к которой планировщик проснулся бы.
+
+        Args:
+            now_utc: Виртуальное время в UTC.
+
+        Returns:
+            datetime: Следующая минута шага в UTC.
+        """
+        return self._next_event_utc(now_utc)
+
+
+@dataclass
+class SimulationReport:
+    """Результаты симуляции суток работы планировщика.
+
+    Attributes:
+        users: Количество синтетических пользователей.
+        zones: Часовые пояса пользователей.
+        day: Симулированная дата в часовом поясе приложения.
+        seed_seconds: Время загрузки пользователей в БД.
+        tick_seconds: Длительность каждого шага планировщика.
+        tick_queries: Число SQL-команд каждого шага.
+        sent_per_minute: Количество отправок по минутам виртуальных часов.
+        expected: Количество напоминаний, которые должны были уйти.
+        delivered: Количество доставленных напоминаний.
+        missed: Количество недоставленных напоминаний.
+        unexpected: Количество лишних и повторных отправок.
+    """
+
+    users: int
+    zones: list[str]
+    day: date
+    seed_seconds: float = 0.0
+    tick_seconds: list[float] = field(default_factory=list)
+    tick_queries: list[int] = field(default_factory=list)
+    sent_per_minute: Counter[datetime] = field(default_factory=Counter)
+    expected: int = 0
+    delivered: int = 0
+    missed: int = 0
+    unexpected: int = 0
+
+    def format(self) -> str:
+        """Возвращает отчёт в виде текста для консоли.
+
+        Returns:
+            str: Многострочный отчёт.
+        """
+        ticks = len(self.tick_seconds)
+        peak_minute, peak_sends = max(
+            self.sent_per_minute.items(),
+            key=lambda item: item[1],
+            default=(None, 0),
+        )
+        peak_text = (
+            f' at {peak_minute:%H:%M} UTC' if peak_minute is not None else ''
+        )
+        return '\n'.join(
+            (
+                f'Users: {self.users} in {len(self.zones)} time zone(s), '
+                f'simulated day {self.day}, seeded in '
+                f'{self.seed_seconds:.1f}s',
+                f'Ticks: {ticks}, latency p50 '
+                f'{_percentile(self.tick_seconds, 0.5) * 1000:.1f} ms, '
+                f'p95 {_percentile(self.tick_seconds, 0.95) * 1000:.1f} ms, '
+                f'max {max(self.tick_seconds, default=0.0) * 1000:.1f} ms',
+                f'DB queries per tick: mean '
+                f'{sum(self.tick_queries) / max(ticks, 1):.1f}, '
+                f'max {max(self.tick_queries, default=0)}',
+                f'Sends per minute: mean '
+                f'{self.delivered / MINUTES_PER_DAY:.1f}, '
+                f'peak {peak_sends}{peak_text}',
+                f'Reminders: {self.expected} expected, '
+                f'{self.delivered} delivered, {self.missed} missed, '
+                f'{self.unexpected} unexpected',
+            )
+        )
+
+
+def _percentile(values: list[float], share: float) -> float:
+    """Возвращает перцентиль выборки методом ближайшего ранга.
+
+    Args:
+        values: Значения выборки.
+        share: Доля от `0` до `1`.
+
+    Returns:
+        float: Значение перцентиля или `0`, если выборка пуста.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def _simulation_dispatcher(stub: StubSender) -> ReminderDispatcher:
+    """Создаёт диспетчер без потоков и лимитов, отправляющий в заглушку.
+
+    Args:
+        stub: Заглушка отправки.
+
+    Returns:
+        ReminderDispatcher: Диспетчер для синхронной доставки.
+    """
+    return ReminderDispatcher(
+        senders={
+            notification_type: stub.sender(notification_type)
+            for notification_type in (
+                'breakfast',
+                'lunch',
+                'dinner',
+                'toilet',
+                'sleep_quality',
+            )
+        },
+        workers=0,
+        global_rate=SIMULATION_SEND_RATE,
+        chat_rate=SIMULATION_SEND_RATE,
+        max_retries=0,
+        batch_size=OUTBOX_BATCH_SIZE,
+        lease_seconds=OUTBOX_LEASE_SECONDS,
+        poll_seconds=0,
+        retry_base_seconds=0,
+    )
+
+
+@with_db
+def _has_real_users(cursor: psycopg.Cursor) -> bool:
+    """Проверяет, есть ли в базе пользователи вне синтетического диапазона.
+
+    Проверка выполняется до миграций и не требует существования схемы.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+
+    Returns:
+        bool: `True`, если в `users` есть реальные пользователи.
+    """
+    cursor.execute(
+        "SELECT to_regclass('users') IS NOT NULL AS present",
+    )
+    if not cursor.fetchone()['present']:
+        return False
+    cursor.execute(
+        'SELECT EXISTS ('
+        'SELECT 1 FROM users WHERE user_id < %s'
+        ') AS has_real_users',
+        (SYNTHETIC_USER_ID_BASE,),
+    )
+    return cursor.fetchone()['has_real_users']
+
+
+@with_db
+def _insert_synthetic_users(
+    cursor: psycopg.Cursor,
+    users: list[UserScheduleRow],
+    created_at: datetime,
+) -> None:
+    """Загружает синтетических пользователей одной командой `COPY`.
+
+    Уведомления об изменении расписания не отправляются: пользователи
+    загружаются до запуска планировщика.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+        users: Расписания в минутах от полуночи и часовые пояса
+            пользователей.
+        created_at: Время регистрации пользователей в UTC без таймзоны.
+    """
+    with cursor.copy(
+        'COPY users(user_id, breakfast_time, lunch_time, dinner_time, '
+        'toilet_time, wakeup_time, bed_time, tz, created_at, updated_at) '
+        'FROM STDIN',
+    ) as copy:
+        for user in users:
+            copy.write_row((*user, created_at, created_at))
+
+
+@with_db
+def _delete_synthetic_users(cursor: psycopg.Cursor) -> None:
+    """Удаляет синтетических пользователей и все их записи.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+    """
+    cursor.execute(
+        'DELETE FROM users WHERE user_id >= %s',
+        (SYNTHETIC_USER_ID_BASE,),
+    )
+
+
+def _drain_outbox(dispatcher: ReminderDispatcher) -> None:
+    """Доставляет строки outbox, отложенные рассеиванием отправки.
+
+    Args:
+        dispatcher: Диспетчер симуляции.
+    """
+    while True:
+        dispatcher.deliver_available()
+        delay = get_next_outbox_delay()
+        if delay is None:
+            return
+        time.sleep(delay)
+
+
+def run_simulation(
+    users_count: int,
+    day: date,
+    zones: list[str],
+    seed: int = 0,
+    keep_users: bool = False,
+) -> SimulationReport:
+    """Прогоняет планировщик через сутки виртуального времени.
+
+    Виртуальные часы идут так же, как пробуждения настоящего цикла: до
+    ближайшего события колеса, но не дальше периода перебалансировки
+    шардов. Каждый шаг замеряется, после шага outbox синхронно
+    доставляется в заглушку.
+
+    Args:
+        users_count: Количество синтетических пользователей.
+        day: Дата симуляции в часовом поясе приложения.
+        zones: Часовые пояса пользователей.
+        seed: Зерно генератора расписаний.
+        keep_users: Не удалять синтетических пользователей после прогона.
+
+    Returns:
+        SimulationReport: Результаты симуляции.
+
+    Raises:
+        RuntimeError: Если в базе есть реальные пользователи.
+    """
+    if _has_real_users():
+        raise RuntimeError(
+            'В базе есть реальные пользователи: запустите симуляцию на '
+            'отдельной базе данных.'
+        )
+    init_db()
+    _delete_synthetic_users()
+
+    start_utc = APP_TZ.localize(
+        datetime.combine(day, datetime.min.time()),
+    ).astimezone(timezone.utc)
+    end_utc = start_utc + timedelta(days=1, minutes=-1)
+    idle_step = timedelta(
+        minutes=max(
+            1,
+            math.ceil(
+                min(SCHEDULER_REBALANCE_SECONDS, MAX_IDLE_WAIT_SECONDS) / 60,
+            ),
+        ),
+    )
+    users = generate_users(users_count, zones, seed)
+    report = SimulationReport(users=users_count, zones=zones, day=day)
+
+    started = time.perf_counter()
+    _insert_synthetic_users(
+        users,
+        (start_utc - timedelta(days=1)).replace(tzinfo=None),
+    )
+    report.seed_seconds = time.perf_counter() - started
+
+    stub = StubSender()
+    dispatcher = _simulation_dispatcher(stub)
+    scheduler = SimulatedScheduler(dispatcher, SCHEDULER_SHARDS)
+    counter = QueryCounter()
+    try:
+        with counter.installed():
+            scheduler.start(start_utc)
+            now_utc = start_utc
+            while True:
+                stub.now_utc = now_utc
+                queries_before = counter.count
+                started = time.perf_counter()
+                scheduler.tick(now_utc)
+                report.tick_seconds.append(time.perf_counter() - started)
+                report.tick_queries.append(counter.count - queries_before)
+                dispatcher.deliver_available()
+                if now_utc >= end_utc:
+                    break
+                now_utc = min(
+                    scheduler.next_event_utc(now_utc),
+                    now_utc + idle_step,
+                    end_utc,
+                )
+            _drain_outbox(dispatcher)
+    finally:
+        scheduler.stop()
+        if not keep_users:
+            _delete_synthetic_users()
+
+    expected = expected_reminders(users, start_utc, end_utc)
+    delivered = set(stub.sent)
+    report.sent_per_minute = stub.sent_per_minute
+    report.expected = len(expected)
+    report.delivered = len(stub.sent)
+    report.missed = len(expected - delivered)
+    report.unexpected = (
+        len(stub.sent) - len(delivered) + len(delivered - expected)
+    )
+    return report
+
+
+def _parse_args() -> argparse.Namespace:
+    """Разбирает аргументы командной строки симуляции.
+
+    Returns:
+        argparse.Namespace: Параметры прогона.
+    """
+    parser = argparse.ArgumentParser(
+        description='Симуляция суток работы планировщика напоминаний.',
+    )
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument(
+        '--date',
+        type=date.fromisoformat,
+        default=None,
+        help='Дата симуляции YYYY-MM-DD, по умолчанию сегодня.',
+    )
+    parser.add_argument(
+        '--zones',
+        nargs='+',
+        type=validate_timezone,
+        default=[TZ_NAME],
+        help='Часовые пояса пользователей.',
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--keep-users',
+        action='store_true',
+        help='Не удалять синтетических пользователей после прогона.',
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Запускает симуляцию из командной строки и печатает отчёт."""
+    logging.basicConfig(
+        level=logging.WARNING,
+        format='%(asctime)s %(levelname)s %(name)s: %(message)s',
+    )
+    args = _parse_args()
+    try:
+        report = run_simulation(
+            args.users,
+            args.date or datetime.now(APP_TZ).date(),
+            args.zones,
+            args.seed,
+            args.keep_users,
+        )
+    finally:
+        close_pool()
+    print(report.format())
+
+
+if __name__ == '__main__':
+    main()
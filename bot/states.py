@@ -3,14 +3,19 @@
 from dataclasses import dataclass, field
 from typing import Any
 
+from db.repositories import (clear_pending_question, get_pending_question,
+                             set_pending_question)
+
+PENDING_QUESTION = 'pending_question'
+
 
 @dataclass
 class UserState:
     """Описывает текущее состояние диалога конкретного пользователя.
 
     Attributes:
-        kind: Тип состояния (`awaiting_time`, `pending_question`, `manual`,
-            `edit`).
+        kind: Тип состояния (`awaiting_time`, `awaiting_tz`,
+            `pending_question`, `manual`, `edit`).
         step: Текущий шаг внутри сценария выбранного состояния.
         data: Дополнительный контекст сценария в формате словаря.
     """
@@ -21,7 +26,15 @@ class UserState:
 
 
 class StateStore:
-    """Предоставляет in-memory CRUD для состояний пользователей Telegram."""
+    """Предоставляет CRUD для состояний пользователей Telegram.
+
+    Состояния сценариев ввода живут в памяти процесса, а ожидающие ответа
+    вопросы (`pending_question`) хранятся в таблице `pending_questions`:
+    вопрос напоминания может задать процесс рассылки без polling, а ответ
+    придёт в процесс, который опрашивает Telegram. Любое другое состояние
+    удаляет вопрос из БД, поэтому найденный в БД вопрос задан позже
+    состояния в памяти и заменяет его, как при записи в одном процессе.
+    """
 
     def __init__(self) -> None:
         """Создаёт пустое хранилище состояний по `user_id`."""
@@ -37,6 +50,14 @@ class StateStore:
             UserState | None: Найденное состояние или `None`, если состояние
             отсутствует.
         """
+        question = get_pending_question(user_id)
+        if question is not None:
+            self._states.pop(user_id, None)
+            return UserState(
+                PENDING_QUESTION,
+                question['step'],
+                question['data'],
+            )
         return self._states.get(user_id)
 
     def set(self, user_id: int, state: UserState) -> None:
@@ -46,6 +67,11 @@ class StateStore:
             user_id: Идентификатор пользователя Telegram.
             state: Подготовленное состояние диалога.
         """
+        if state.kind == PENDING_QUESTION:
+            self._states.pop(user_id, None)
+            set_pending_question(user_id, state.step, state.data)
+            return
+        clear_pending_question(user_id)
         self._states[user_id] = state
 
     def clear(self, user_id: int) -> None:
@@ -55,3 +81,4 @@ class StateStore:
             user_id: Идентификатор пользователя Telegram.
         """
         self._states.pop(user_id, None)
+        clear_pending_question(user_id)
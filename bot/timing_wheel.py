@@ -0,0 +1,90 @@
+"""Суточное колесо времени с событиями напоминаний по минутам."""
+
+MINUTES_PER_DAY = 24 * 60
+
+ReminderEvent = tuple[int, str]
+
+
+class TimingWheel:
+    """Хранит события `(user_id, тип)` в 1440 минутных слотах суток.
+
+    Для каждого пользователя запоминается, какие слоты он занимает, поэтому
+    изменение расписания одного пользователя обновляет колесо за O(1) без
+    перестройки остальных слотов.
+    """
+
+    def __init__(self) -> None:
+        """Создаёт пустое колесо."""
+        self._slots: list[set[ReminderEvent]] = [
+            set() for _ in range(MINUTES_PER_DAY)
+        ]
+        self._user_minutes: dict[int, dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        """Возвращает количество событий в колесе.
+
+        Returns:
+            int: Суммарное число запланированных событий.
+        """
+        return sum(len(minutes) for minutes in self._user_minutes.values())
+
+    def set_user(self, user_id: int, minutes_by_type: dict[str, int]) -> None:
+        """Заменяет все события пользователя новым расписанием.
+
+        Args:
+            user_id: Идентификатор пользователя Telegram.
+            minutes_by_type: Минута суток для каждого типа напоминания.
+        """
+        self.remove_user(user_id)
+        for notification_type, minute in minutes_by_type.items():
+            self._slots[minute].add((user_id, notification_type))
+        self._user_minutes[user_id] = dict(minutes_by_type)
+
+    def remove_user(self, user_id: int) -> None:
+        """Удаляет все события пользователя из колеса.
+
+        Args:
+            user_id: Идентификатор пользователя Telegram.
+        """
+        for notification_type, minute in self._user_minutes.pop(
+            user_id,
+            {},
+        ).items():
+            self._slots[minute].discard((user_id, notification_type))
+
+    def clear(self) -> None:
+        """Удаляет все события из колеса."""
+        for slot in self._slots:
+            slot.clear()
+        self._user_minutes.clear()
+
+    def has_events_between(self, first_minute: int, last_minute: int) -> bool:
+        """Проверяет, есть ли события в отрезке минут включительно.
+
+        Args:
+            first_minute: Первая минута суток отрезка.
+            last_minute: Последняя минута суток отрезка, не меньше первой.
+
+        Returns:
+            bool: `True`, если хотя бы один слот отрезка не пуст.
+        """
+        return any(
+            self._slots[minute]
+            for minute in range(first_minute, last_minute + 1)
+        )
+
+    def minutes_until_next(self, minute: int) -> int | None:
+        """Возвращает, через сколько минут после указанной есть событие.
+
+        Args:
+            minute: Текущая минута суток.
+
+        Returns:
+            int | None: Смещение от 1 до 1440 минут до ближайшего непустого
+            слота с учётом перехода через полночь или `None`, если колесо
+            пусто.
+        """
+        for offset in range(1, MINUTES_PER_DAY + 1):
+            if self._slots[(minute + offset) % MINUTES_PER_DAY]:
+                return offset
+        return None
@@ -2,6 +2,8 @@
 
 from datetime import datetime
 
+import pytz
+
 from config import DATE_FORMAT_DISPLAY, DATE_FORMAT_STORAGE, MAX_TEXT_LENGTH
 
 
@@ -86,3 +88,46 @@ def validate_date_display(value: str) -> str:
         raise ValueError(
             'Введите дату в формате ДД.ММ.ГГГГ.'
         ) from error
+
+
+def validate_date_storage(value: str) -> str:
+    """Проверяет дату в формате хранения `ГГГГ-ММ-ДД`.
+
+    Args:
+        value: Дата из данных кнопки или команды.
+
+    Returns:
+        str: Та же дата в каноничном формате хранения.
+
+    Raises:
+        ValueError: Если дата не соответствует формату хранения.
+    """
+    normalized_value = (value or '').strip()
+    try:
+        return datetime.strptime(
+            normalized_value,
+            DATE_FORMAT_STORAGE,
+        ).strftime(DATE_FORMAT_STORAGE)
+    except ValueError as error:
+        raise ValueError('Неверная дата.') from error
+
+
+def validate_timezone(value: str) -> str:
+    """Проверяет имя часового пояса IANA и возвращает его каноничную форму.
+
+    Args:
+        value: Имя часового пояса, например `Europe/Berlin`.
+
+    Returns:
+        str: Имя часового пояса в написании базы `pytz`.
+
+    Raises:
+        ValueError: Если часовой пояс неизвестен.
+    """
+    normalized_value = (value or '').strip().replace(' ', '_').lower()
+    for tz_name in pytz.all_timezones:
+        if tz_name.lower() == normalized_value:
+            return tz_name
+    raise ValueError(
+        'Неизвестный часовой пояс. Введите имя вида Europe/Moscow.'
+    )
@@ -46,6 +46,10 @@ PG_DB: Final[str] = _read_env('PG_DB', 'poop_stats_bot')
 PG_USER: Final[str] = _read_env('PG_USER', 'postgres')
 PG_PASSWORD: Final[str] = _read_env('PG_PASSWORD')
 PG_CONNECT_TIMEOUT: Final[int] = _read_env_int('PG_CONNECT_TIMEOUT', 10)
+PG_POOL_MIN_SIZE: Final[int] = _read_env_int('PG_POOL_MIN_SIZE', 1)
+PG_POOL_MAX_SIZE: Final[int] = _read_env_int('PG_POOL_MAX_SIZE', 10)
+PG_POOL_MAX_IDLE: Final[int] = _read_env_int('PG_POOL_MAX_IDLE', 300)
+PG_POOL_TIMEOUT: Final[int] = _read_env_int('PG_POOL_TIMEOUT', 30)
 
 DATE_FORMAT_STORAGE: Final[str] = '%Y-%m-%d'
 DATE_FORMAT_DISPLAY: Final[str] = '%d.%m.%Y'
@@ -57,6 +61,70 @@ SCHEDULER_TICK_SECONDS: Final[int] = _read_env_int(
     'SCHEDULER_TICK_SECONDS',
     20,
 )
+SCHEDULER_CATCHUP_MINUTES: Final[int] = _read_env_int(
+    'SCHEDULER_CATCHUP_MINUTES',
+    60,
+)
+SLEEP_ROLLOVER_CATCHUP_DAYS: Final[int] = _read_env_int(
+    'SLEEP_ROLLOVER_CATCHUP_DAYS',
+    7,
+)
+SCHEDULER_SHARDS: Final[int] = _read_env_int('SCHEDULER_SHARDS', 1)
+SCHEDULER_WORKERS: Final[int] = _read_env_int('SCHEDULER_WORKERS', 1)
+SCHEDULER_REBALANCE_SECONDS: Final[int] = _read_env_int(
+    'SCHEDULER_REBALANCE_SECONDS',
+    30,
+)
+SCHEDULER_FULL_RELOAD_SECONDS: Final[int] = _read_env_int(
+    'SCHEDULER_FULL_RELOAD_SECONDS',
+    300,
+)
+REMINDER_WORKERS: Final[int] = _read_env_int('REMINDER_WORKERS', 4)
+REMINDER_MAX_RETRIES: Final[int] = _read_env_int('REMINDER_MAX_RETRIES', 3)
+OUTBOX_BATCH_SIZE: Final[int] = _read_env_int('OUTBOX_BATCH_SIZE', 50)
+OUTBOX_LEASE_SECONDS: Final[int] = _read_env_int('OUTBOX_LEASE_SECONDS', 300)
+OUTBOX_POLL_SECONDS: Final[int] = _read_env_int('OUTBOX_POLL_SECONDS', 5)
+OUTBOX_RETRY_BASE_SECONDS: Final[int] = _read_env_int(
+    'OUTBOX_RETRY_BASE_SECONDS',
+    30,
+)
+REMINDER_JITTER_SECONDS: Final[int] = _read_env_int(
+    'REMINDER_JITTER_SECONDS',
+    0,
+)
+REMINDER_REASK_MINUTES: Final[int] = _read_env_int(
+    'REMINDER_REASK_MINUTES',
+    0,
+)
+PARTITION_EVENT_TABLES: Final[bool] = bool(
+    _read_env_int('PARTITION_EVENT_TABLES', 0),
+)
+PARTITION_MONTHS_AHEAD: Final[int] = _read_env_int(
+    'PARTITION_MONTHS_AHEAD',
+    2,
+)
+NOTIFICATION_LOG_RETENTION_DAYS: Final[int] = _read_env_int(
+    'NOTIFICATION_LOG_RETENTION_DAYS',
+    7,
+)
+OUTBOX_RETENTION_DAYS: Final[int] = _read_env_int('OUTBOX_RETENTION_DAYS', 7)
+RETENTION_INTERVAL_SECONDS: Final[int] = _read_env_int(
+    'RETENTION_INTERVAL_SECONDS',
+    3600,
+)
+RETENTION_BATCH_SIZE: Final[int] = _read_env_int('RETENTION_BATCH_SIZE', 5000)
+RETENTION_BATCH_PAUSE_MS: Final[int] = _read_env_int(
+    'RETENTION_BATCH_PAUSE_MS',
+    200,
+)
+DAY_VIEW_CACHE_DAYS: Final[int] = _read_env_int('DAY_VIEW_CACHE_DAYS', 1000)
+DAY_RENDER_CACHE_MAX_BYTES: Final[int] = _read_env_int(
+    'DAY_RENDER_CACHE_MAX_BYTES',
+    8 * 1024 * 1024,
+)
+USER_TZ_CACHE_SIZE: Final[int] = _read_env_int('USER_TZ_CACHE_SIZE', 10000)
+TELEGRAM_GLOBAL_RATE: Final[int] = _read_env_int('TELEGRAM_GLOBAL_RATE', 30)
+TELEGRAM_CHAT_RATE: Final[int] = _read_env_int('TELEGRAM_CHAT_RATE', 1)
 MAX_TEXT_LENGTH: Final[int] = _read_env_int('MAX_TEXT_LENGTH', 1000)
 POLLING_TIMEOUT: Final[int] = _read_env_int('POLLING_TIMEOUT', 30)
 LONG_POLLING_TIMEOUT: Final[int] = _read_env_int(
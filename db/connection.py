@@ -1,40 +1,281 @@
 """Утилиты подключения к PostgreSQL и обёртки транзакций."""
 
-from collections.abc import Callable
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from functools import wraps
-from typing import Concatenate, ParamSpec, TypeVar
+from typing import Any, Concatenate, ParamSpec, TypeVar
 
 import psycopg
 from psycopg.rows import dict_row
+from psycopg_pool import ConnectionPool
 
 from config import (DATABASE_URL, PG_CONNECT_TIMEOUT, PG_DB, PG_HOST,
-                    PG_PASSWORD, PG_PORT, PG_USER)
+                    PG_PASSWORD, PG_POOL_MAX_IDLE, PG_POOL_MAX_SIZE,
+                    PG_POOL_MIN_SIZE, PG_POOL_TIMEOUT, PG_PORT, PG_USER)
 
 P = ParamSpec('P')
 R = TypeVar('R')
 
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def _connection_kwargs() -> dict[str, Any]:
+    """Возвращает параметры подключения к PostgreSQL из конфигурации.
+
+    Если задан `DATABASE_URL`, параметры хоста и учётных данных берутся из
+    строки подключения, а в словаре остаются только общие настройки.
+
+    Returns:
+        dict[str, Any]: Именованные аргументы для `psycopg.connect`.
+    """
+    kwargs: dict[str, Any] = {
+        'connect_timeout': PG_CONNECT_TIMEOUT,
+        'row_factory': dict_row,
+    }
+    if not DATABASE_URL:
+        kwargs.update(
+            host=PG_HOST,
+            port=PG_PORT,
+            dbname=PG_DB,
+            user=PG_USER,
+            password=PG_PASSWORD,
+        )
+    return kwargs
+
 
 def get_connection() -> psycopg.Connection:
     """Создаёт новое подключение к PostgreSQL с `dict_row` row factory.
 
+    Подключение открывается в обход пула, поэтому его нужно закрыть
+    самостоятельно.
+
     Returns:
         psycopg.Connection: Активное подключение к базе данных.
     """
-    if DATABASE_URL:
-        return psycopg.connect(
-            DATABASE_URL,
-            connect_timeout=PG_CONNECT_TIMEOUT,
-            row_factory=dict_row,
-        )
-    return psycopg.connect(
-        host=PG_HOST,
-        port=PG_PORT,
-        dbname=PG_DB,
-        user=PG_USER,
-        password=PG_PASSWORD,
-        connect_timeout=PG_CONNECT_TIMEOUT,
-        row_factory=dict_row,
+    return psycopg.connect(DATABASE_URL, **_connection_kwargs())
+
+
+def open_listener(channel: str) -> psycopg.Connection:
+    """Открывает отдельное подключение, подписанное на канал `LISTEN`.
+
+    Подключение работает в режиме autocommit и не берётся из пула, так как
+    должно жить всё время ожидания уведомлений.
+
+    Args:
+        channel: Имя канала `LISTEN/NOTIFY`.
+
+    Returns:
+        psycopg.Connection: Подключение с активной подпиской.
+    """
+    connection = psycopg.connect(
+        DATABASE_URL,
+        autocommit=True,
+        **_connection_kwargs(),
     )
+    connection.execute(f'LISTEN {channel}')
+    return connection
+
+
+def get_pool() -> ConnectionPool:
+    """Возвращает общий пул подключений, открывая его при первом вызове.
+
+    Пул держит от `PG_POOL_MIN_SIZE` до `PG_POOL_MAX_SIZE` соединений,
+    закрывает простаивающие дольше `PG_POOL_MAX_IDLE` секунд и проверяет
+    соединение перед выдачей.
+
+    Returns:
+        ConnectionPool: Открытый пул подключений.
+    """
+    global _pool
+    if _pool is not None:
+        return _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(
+                DATABASE_URL,
+                kwargs=_connection_kwargs(),
+                min_size=PG_POOL_MIN_SIZE,
+                max_size=PG_POOL_MAX_SIZE,
+                max_idle=PG_POOL_MAX_IDLE,
+                timeout=PG_POOL_TIMEOUT,
+                check=ConnectionPool.check_connection,
+                name='poop_stats_bot',
+                open=True,
+            )
+    return _pool
+
+
+def close_pool() -> None:
+    """Закрывает общий пул подключений, если он был открыт."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+class DbSession:
+    """Единица работы: одно соединение и одна транзакция на весь сценарий.
+
+    Соединение берётся из пула лениво, при первом обращении репозиторной
+    функции, поэтому сессия без запросов к БД ничего не стоит. Сценарий
+    может зафиксировать уже сделанные изменения через `commit` до конца
+    сессии, например перед обращением к Telegram: соединение возвращается
+    в пул, а следующий запрос займёт его снова в новой транзакции.
+    """
+
+    def __init__(self) -> None:
+        """Создаёт сессию без занятого соединения."""
+        self._connection: psycopg.Connection | None = None
+        self._cursor: psycopg.Cursor | None = None
+        self._after_commit: list[Callable[[], None]] = []
+
+    def cursor(self) -> psycopg.Cursor:
+        """Возвращает курсор сессии, занимая соединение из пула при нужде.
+
+        Returns:
+            psycopg.Cursor: Курсор общей транзакции сессии.
+        """
+        if self._cursor is None:
+            self._connection = get_pool().getconn()
+            self._cursor = self._connection.cursor()
+        return self._cursor
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """Откладывает действие до фиксации текущей транзакции.
+
+        При откате транзакции отложенные действия отбрасываются.
+
+        Args:
+            callback: Действие без аргументов, например обновление кэша.
+        """
+        self._after_commit.append(callback)
+
+    def commit(self) -> None:
+        """Фиксирует текущую транзакцию, не закрывая сессию."""
+        self.close(commit=True)
+
+    def close(self, commit: bool) -> None:
+        """Завершает транзакцию сессии и возвращает соединение в пул.
+
+        После фиксации выполняются действия, отложенные через
+        `after_commit`; после отката они отбрасываются.
+
+        Args:
+            commit: `True` для фиксации транзакции, `False` для отката.
+        """
+        connection = self._connection
+        callbacks = self._after_commit
+        self._after_commit = []
+        if connection is not None:
+            try:
+                self._cursor.close()
+                if commit:
+                    connection.commit()
+                else:
+                    connection.rollback()
+            finally:
+                self._connection = None
+                self._cursor = None
+                get_pool().putconn(connection)
+        if commit:
+            for callback in callbacks:
+                callback()
+
+
+_current_session: ContextVar[DbSession | None] = ContextVar(
+    'db_session',
+    default=None,
+)
+
+
+@contextmanager
+def db_session() -> Iterator[None]:
+    """Открывает единицу работы для всех репозиторных вызовов внутри блока.
+
+    Функции с `with_db`, вызванные внутри блока, используют одно соединение
+    и одну транзакцию; `commit` выполняется один раз при выходе из блока,
+    при ошибке выполняется `rollback`. Вложенный вызов присоединяется к уже
+    открытой сессии.
+
+    Yields:
+        None: Управление передаётся в тело блока.
+    """
+    if _current_session.get() is not None:
+        yield
+        return
+
+    session = DbSession()
+    token = _current_session.set(session)
+    try:
+        yield
+    except BaseException:
+        session.close(commit=False)
+        raise
+    else:
+        session.close(commit=True)
+    finally:
+        _current_session.reset(token)
+
+
+def commit_session() -> None:
+    """Фиксирует транзакцию открытой `db_session`, если она есть.
+
+    Вызывается перед сетевыми обращениями вне БД, чтобы их ошибка не
+    откатила уже сохранённые данные, а соединение не простаивало в
+    открытой транзакции с удерживаемыми блокировками.
+    """
+    session = _current_session.get()
+    if session is not None:
+        session.commit()
+
+
+def after_commit(callback: Callable[[], None]) -> None:
+    """Выполняет действие после фиксации изменений текущего сценария.
+
+    Внутри `db_session` действие откладывается до её фиксации и
+    отбрасывается при откате. Репозиторная функция всегда выполняется в
+    сессии, поэтому вне сессии изменений нет и действие выполняется сразу.
+
+    Args:
+        callback: Действие без аргументов.
+    """
+    session = _current_session.get()
+    if session is None:
+        callback()
+    else:
+        session.after_commit(callback)
+
+
+def with_db_session(function_to_wrap: Callable[P, R]) -> Callable[P, R]:
+    """Выполняет функцию целиком внутри `db_session`.
+
+    Args:
+        function_to_wrap: Обработчик или сценарий, делающий несколько
+            обращений к БД.
+
+    Returns:
+        Callable[P, R]: Обёрнутая функция с сохранённой сигнатурой.
+    """
+
+    @wraps(function_to_wrap)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        """Вызывает исходную функцию в общей сессии БД.
+
+        Args:
+            *args: Позиционные аргументы исходной функции.
+            **kwargs: Именованные аргументы исходной функции.
+
+        Returns:
+            R: Результат выполнения исходной функции.
+        """
+        with db_session():
+            return function_to_wrap(*args, **kwargs)
+
+    return wrapper
 
 
 def with_db(
@@ -43,8 +284,12 @@ def with_db(
     """Оборачивает репозиторную функцию в транзакцию PostgreSQL.
 
     Функция, помеченная декоратором, получает первым аргументом курсор и
-    автоматически выполняется в рамках одной транзакции: при успехе делается
-    `commit`, при любой ошибке выполняется `rollback`.
+    автоматически выполняется в рамках одной транзакции на соединении из
+    пула: при успехе делается `commit`, при любой ошибке выполняется
+    `rollback`. Если открыта `db_session`, функция присоединяется к её
+    транзакции, а фиксацию выполняет сама сессия. Иначе функция получает
+    собственную короткую сессию, поэтому действия `after_commit` из неё
+    тоже выполняются только после фиксации.
 
     Args:
         function_to_wrap: Репозиторная функция вида
@@ -56,7 +301,7 @@ def with_db(
 
     @wraps(function_to_wrap)
     def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
-        """Выполняет обёрнутую функцию в транзакции и закрывает подключение.
+        """Выполняет обёрнутую функцию в транзакции и возвращает соединение.
 
         Args:
             *args: Позиционные аргументы исходной функции без курсора.
@@ -65,16 +310,12 @@ def with_db(
         Returns:
             R: Результат выполнения обёрнутой функции.
         """
-        connection = get_connection()
-        try:
-            with connection.cursor() as cursor:
-                result = function_to_wrap(cursor, *args, **kwargs)
-            connection.commit()
-            return result
-        except Exception:
-            connection.rollback()
-            raise
-        finally:
-            connection.close()
+        session = _current_session.get()
+        if session is not None:
+            return function_to_wrap(session.cursor(), *args, **kwargs)
+
+        with db_session():
+            session = _current_session.get()
+            return function_to_wrap(session.cursor(), *args, **kwargs)
 
     return wrapper
@@ -0,0 +1,232 @@
+"""Исходная схема: таблицы и индексы до появления версионных миграций.
+
+Все команды идемпотентны, поэтому миграция безопасно применяется к базе,
+созданной прежним `init_db`.
+"""
+
+
+def _text_times_to_minutes_sql(
+    table_name: str,
+    defaults: dict[str, int | None],
+) -> str:
+    """Возвращает DDL перевода колонок `HH:MM` из TEXT в минуты SMALLINT.
+
+    Перевод выполняется, только если первая колонка ещё имеет тип TEXT,
+    поэтому команду можно выполнять при каждом запуске.
+
+    Args:
+        table_name: Имя таблицы.
+        defaults: Колонки и их значения по умолчанию в минутах от полуночи;
+            `None` — колонка без значения по умолчанию.
+
+    Returns:
+        str: Блок `DO` с `ALTER TABLE`.
+    """
+    alterations: list[str] = []
+    for column_name, default_minutes in defaults.items():
+        alterations.extend(
+            (
+                f'ALTER COLUMN {column_name} DROP DEFAULT',
+                f'ALTER COLUMN {column_name} TYPE SMALLINT USING ('
+                f"split_part({column_name}, ':', 1)::int * 60 "
+                f"+ split_part({column_name}, ':', 2)::int)",
+            )
+        )
+        if default_minutes is not None:
+            alterations.append(
+                f'ALTER COLUMN {column_name} SET DEFAULT {default_minutes}',
+            )
+    first_column = next(iter(defaults))
+    return (
+        'DO $$ BEGIN '
+        'IF EXISTS ('
+        'SELECT 1 FROM information_schema.columns '
+        'WHERE table_schema = current_schema() '
+        f"AND table_name = '{table_name}' "
+        f"AND column_name = '{first_column}' AND data_type = 'text'"
+        ') THEN '
+        f'ALTER TABLE {table_name} '
+        + ', '.join(alterations)
+        + '; END IF; END $$'
+    )
+
+
+STATEMENTS: tuple[str, ...] = (
+    '''
+    CREATE TABLE IF NOT EXISTS users (
+        user_id BIGINT PRIMARY KEY,
+        breakfast_time SMALLINT NOT NULL DEFAULT 480,
+        lunch_time     SMALLINT NOT NULL DEFAULT 780,
+        dinner_time    SMALLINT NOT NULL DEFAULT 1140,
+        toilet_time    SMALLINT NOT NULL DEFAULT 540,
+        wakeup_time    SMALLINT NOT NULL DEFAULT 420,
+        bed_time       SMALLINT NOT NULL DEFAULT 1380,
+        created_at     TIMESTAMP NOT NULL DEFAULT NOW(),
+        updated_at     TIMESTAMP NOT NULL DEFAULT NOW()
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS meals (
+        id BIGSERIAL PRIMARY KEY,
+        user_id BIGINT NOT NULL,
+        date DATE NOT NULL,
+        meal_type TEXT NOT NULL CHECK(
+            meal_type IN ('breakfast', 'lunch', 'dinner', 'snack')
+        ),
+        description TEXT NOT NULL,
+        created_at TIMESTAMP NOT NULL,
+        updated_at TIMESTAMP NOT NULL,
+        FOREIGN KEY(user_id) REFERENCES users(user_id) ON DELETE CASCADE
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS medicines (
+        id BIGSERIAL PRIMARY KEY,
+        user_id BIGINT NOT NULL,
+        date DATE NOT NULL,
+        name TEXT NOT NULL,
+        dosage TEXT,
+        created_at TIMESTAMP NOT NULL,
+        updated_at TIMESTAMP NOT NULL,
+        FOREIGN KEY(user_id) REFERENCES users(user_id) ON DELETE CASCADE
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS stools (
+        id BIGSERIAL PRIMARY KEY,
+        user_id BIGINT NOT NULL,
+        date DATE NOT NULL,
+        quality INTEGER NOT NULL CHECK(quality BETWEEN 0 AND 7),
+        created_at TIMESTAMP NOT NULL,
+        updated_at TIMESTAMP NOT NULL,
+        FOREIGN KEY(user_id) REFERENCES users(user_id) ON DELETE CASCADE
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS feelings (
+        id BIGSERIAL PRIMARY KEY,
+        user_id BIGINT NOT NULL,
+        date DATE NOT NULL,
+        description TEXT NOT NULL,
+        created_at TIMESTAMP NOT NULL,
+        updated_at TIMESTAMP NOT NULL,
+        FOREIGN KEY(user_id) REFERENCES users(user_id) ON DELETE CASCADE
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS water (
+        id BIGSERIAL PRIMARY KEY,
+        user_id BIGINT NOT NULL,
+        date DATE NOT NULL,
+        glasses_count INTEGER NOT NULL DEFAULT 0 CHECK(glasses_count >= 0),
+        created_at TIMESTAMP NOT NULL,
+        updated_at TIMESTAMP NOT NULL,
+        UNIQUE(user_id, date),
+        FOREIGN KEY(user_id) REFERENCES users(user_id) ON DELETE CASCADE
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS sleeps (
+        id BIGSERIAL PRIMARY KEY,
+        user_id BIGINT NOT NULL,
+        date DATE NOT NULL,
+        wakeup_time SMALLINT NOT NULL,
+        bed_time SMALLINT NOT NULL,
+        quality_description TEXT,
+        created_at TIMESTAMP NOT NULL,
+        updated_at TIMESTAMP NOT NULL,
+        UNIQUE(user_id, date),
+        FOREIGN KEY(user_id) REFERENCES users(user_id) ON DELETE CASCADE
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS notifications_log (
+        id BIGSERIAL PRIMARY KEY,
+        user_id BIGINT NOT NULL,
+        type TEXT NOT NULL CHECK(
+            type IN (
+                'breakfast',
+                'lunch',
+                'dinner',
+                'toilet',
+                'sleep_quality'
+            )
+        ),
+        date DATE NOT NULL,
+        sent_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        UNIQUE(user_id, type, date),
+        FOREIGN KEY(user_id) REFERENCES users(user_id) ON DELETE CASCADE
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS notification_outbox (
+        id BIGSERIAL PRIMARY KEY,
+        user_id BIGINT NOT NULL,
+        type TEXT NOT NULL,
+        date DATE NOT NULL,
+        payload JSONB NOT NULL DEFAULT '{}',
+        status TEXT NOT NULL DEFAULT 'pending' CHECK(
+            status IN ('pending', 'sent', 'dead')
+        ),
+        attempts INTEGER NOT NULL DEFAULT 0,
+        available_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        last_error TEXT,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        sent_at TIMESTAMPTZ,
+        FOREIGN KEY(user_id) REFERENCES users(user_id) ON DELETE CASCADE
+    )
+    ''',
+    'ALTER TABLE users '
+    'ADD COLUMN IF NOT EXISTS active BOOLEAN NOT NULL DEFAULT TRUE',
+    'ALTER TABLE users '
+    'ADD COLUMN IF NOT EXISTS delivery_failures INTEGER NOT NULL DEFAULT 0',
+    'ALTER TABLE users '
+    'ADD COLUMN IF NOT EXISTS last_delivery_error TEXT',
+    'ALTER TABLE users '
+    'ADD COLUMN IF NOT EXISTS deactivated_at TIMESTAMP',
+    'ALTER TABLE users ADD COLUMN IF NOT EXISTS tz TEXT',
+    _text_times_to_minutes_sql(
+        'users',
+        {
+            'breakfast_time': 480,
+            'lunch_time': 780,
+            'dinner_time': 1140,
+            'toilet_time': 540,
+            'wakeup_time': 420,
+            'bed_time': 1380,
+        },
+    ),
+    _text_times_to_minutes_sql(
+        'sleeps',
+        {'wakeup_time': None, 'bed_time': None},
+    ),
+    'CREATE INDEX IF NOT EXISTS idx_meals_user_date '
+    'ON meals(user_id, date)',
+    'CREATE INDEX IF NOT EXISTS idx_medicines_user_date '
+    'ON medicines(user_id, date)',
+    'CREATE INDEX IF NOT EXISTS idx_stools_user_date '
+    'ON stools(user_id, date)',
+    'CREATE INDEX IF NOT EXISTS idx_feelings_user_date '
+    'ON feelings(user_id, date)',
+    'CREATE INDEX IF NOT EXISTS idx_water_user_date '
+    'ON water(user_id, date)',
+    'CREATE INDEX IF NOT EXISTS idx_sleeps_user_date '
+    'ON sleeps(user_id, date)',
+    'CREATE INDEX IF NOT EXISTS idx_notif_user_date_type '
+    'ON notifications_log(user_id, date, type)',
+    'CREATE INDEX IF NOT EXISTS idx_outbox_pending '
+    "ON notification_outbox(available_at) WHERE status = 'pending'",
+    'CREATE INDEX IF NOT EXISTS idx_outbox_pending_user_type_date '
+    'ON notification_outbox(user_id, type, date) '
+    "WHERE status = 'pending'",
+    'CREATE INDEX IF NOT EXISTS idx_users_breakfast_time '
+    'ON users(breakfast_time)',
+    'CREATE INDEX IF NOT EXISTS idx_users_lunch_time '
+    'ON users(lunch_time)',
+    'CREATE INDEX IF NOT EXISTS idx_users_dinner_time '
+    'ON users(dinner_time)',
+    'CREATE INDEX IF NOT EXISTS idx_users_toilet_time '
+    'ON users(toilet_time)',
+    'CREATE INDEX IF NOT EXISTS idx_users_wakeup_time '
+    'ON users(wakeup_time)',
+)
@@ -0,0 +1,33 @@
+"""Индексы `(user_id, date, created_at)` для списков записей за день.
+
+Списки за день и выгрузка отчёта сортируют записи по `created_at`, поэтому
+порядок индекса убирает сортировку, а прежние индексы `(user_id, date)`
+становятся его префиксом и удаляются. В `INCLUDE` попадают только
+короткие колонки: текстовые описания до `MAX_TEXT_LENGTH` символов могут
+не поместиться в строку B-дерева.
+
+Индексы строятся конкурентно, без блокировки записи. Перед созданием
+индекс удаляется, чтобы повторный запуск после сбоя не оставил
+невалидный индекс от прерванной сборки.
+"""
+
+TRANSACTIONAL = False
+
+STATEMENTS: tuple[str, ...] = (
+    'DROP INDEX CONCURRENTLY IF EXISTS idx_meals_user_date_created',
+    'CREATE INDEX CONCURRENTLY idx_meals_user_date_created '
+    'ON meals(user_id, date, created_at) INCLUDE (id, meal_type)',
+    'DROP INDEX CONCURRENTLY IF EXISTS idx_meals_user_date',
+    'DROP INDEX CONCURRENTLY IF EXISTS idx_medicines_user_date_created',
+    'CREATE INDEX CONCURRENTLY idx_medicines_user_date_created '
+    'ON medicines(user_id, date, created_at) INCLUDE (id)',
+    'DROP INDEX CONCURRENTLY IF EXISTS idx_medicines_user_date',
+    'DROP INDEX CONCURRENTLY IF EXISTS idx_stools_user_date_created',
+    'CREATE INDEX CONCURRENTLY idx_stools_user_date_created '
+    'ON stools(user_id, date, created_at) INCLUDE (id, quality)',
+    'DROP INDEX CONCURRENTLY IF EXISTS idx_stools_user_date',
+    'DROP INDEX CONCURRENTLY IF EXISTS idx_feelings_user_date_created',
+    'CREATE INDEX CONCURRENTLY idx_feelings_user_date_created '
+    'ON feelings(user_id, date, created_at) INCLUDE (id)',
+    'DROP INDEX CONCURRENTLY IF EXISTS idx_feelings_user_date',
+)
@@ -0,0 +1,12 @@
+"""BRIN-индекс по дате журнала напоминаний для очистки старых записей.
+
+Журнал пополняется по возрастанию даты, поэтому BRIN-индекс занимает
+несколько страниц и быстро находит старые блоки, не замедляя вставки.
+Индекс строится в транзакции: `CONCURRENTLY` не поддерживается для уже
+секционированной таблицы, а сборка BRIN сводится к одному чтению таблицы.
+"""
+
+STATEMENTS: tuple[str, ...] = (
+    'CREATE INDEX IF NOT EXISTS idx_notif_date_brin '
+    'ON notifications_log USING brin(date)',
+)
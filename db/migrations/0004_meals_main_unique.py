@@ -0,0 +1,20 @@
+"""Уникальность основных приёмов пищи за день.
+
+Завтрак, обед и ужин хранятся одной записью на день, но раньше это
+обеспечивал только код, и одновременные сохранения могли создать дубли.
+Перед созданием частичного уникального индекса из дублей остаётся запись,
+изменённая последней. Индекс строится в транзакции вместе с удалением
+дублей, чтобы между ними не появились новые.
+"""
+
+STATEMENTS: tuple[str, ...] = (
+    'LOCK TABLE meals IN SHARE ROW EXCLUSIVE MODE',
+    'DELETE FROM meals m USING meals newer '
+    "WHERE m.meal_type <> 'snack' "
+    'AND newer.user_id = m.user_id AND newer.date = m.date '
+    'AND newer.meal_type = m.meal_type '
+    'AND (newer.updated_at, newer.id) > (m.updated_at, m.id)',
+    'CREATE UNIQUE INDEX IF NOT EXISTS idx_meals_user_date_main_type '
+    'ON meals(user_id, date, meal_type) '
+    "WHERE meal_type <> 'snack'",
+)
@@ -0,0 +1,23 @@
+"""Частичные индексы по доставленным и мёртвым строкам outbox.
+
+Индекс по `sent_at` доставленных строк отвечает на вопрос «сколько
+отправлено за последнюю минуту» и вместе с индексом по `created_at` строк
+в dead letter позволяет задаче очистки находить старые строки без полного
+чтения таблицы. Статистика очереди после этого читает только частичные
+индексы, и её стоимость не растёт вместе с историей отправок.
+
+Индексы строятся конкурентно, без блокировки записи. Перед созданием
+индекс удаляется, чтобы повторный запуск после сбоя не оставил
+невалидный индекс от прерванной сборки.
+"""
+
+TRANSACTIONAL = False
+
+STATEMENTS: tuple[str, ...] = (
+    'DROP INDEX CONCURRENTLY IF EXISTS idx_outbox_sent',
+    'CREATE INDEX CONCURRENTLY idx_outbox_sent '
+    "ON notification_outbox(sent_at) WHERE status = 'sent'",
+    'DROP INDEX CONCURRENTLY IF EXISTS idx_outbox_dead',
+    'CREATE INDEX CONCURRENTLY idx_outbox_dead '
+    "ON notification_outbox(created_at) WHERE status = 'dead'",
+)
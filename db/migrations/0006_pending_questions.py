@@ -0,0 +1,18 @@
+"""Ожидающие ответа вопросы пользователей.
+
+Вопрос напоминания может задать любой процесс рассылки, а ответ приходит
+в процесс, который опрашивает Telegram. Поэтому состояние
+`pending_question` хранится в БД, по одной строке на пользователя.
+"""
+
+STATEMENTS: tuple[str, ...] = (
+    '''
+    CREATE TABLE IF NOT EXISTS pending_questions (
+        user_id BIGINT PRIMARY KEY,
+        step TEXT NOT NULL,
+        data JSONB NOT NULL DEFAULT '{}',
+        asked_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        FOREIGN KEY(user_id) REFERENCES users(user_id) ON DELETE CASCADE
+    )
+    ''',
+)
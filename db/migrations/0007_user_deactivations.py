@@ -0,0 +1,15 @@
+"""Отдельный счётчик отключений пользователей.
+
+Раньше `users.delivery_failures` рос только при отключении пользователя
+после ответа 403 или `chat not found`. Теперь в нём считаются настоящие
+ошибки отправки, а отключения считаются в `deactivations`, поэтому уже
+накопленные значения переносятся в новый счётчик.
+"""
+
+STATEMENTS: tuple[str, ...] = (
+    'ALTER TABLE users '
+    'ADD COLUMN IF NOT EXISTS deactivations INTEGER NOT NULL DEFAULT 0',
+    'UPDATE users SET deactivations = delivery_failures, '
+    'delivery_failures = 0 '
+    'WHERE delivery_failures > 0',
+)
@@ -1,16 +1,22 @@
 """Репозиторный слой для чтения и записи данных пользователя."""
 
+from collections.abc import Callable, Collection
 from datetime import date, datetime, timezone
+from functools import partial
 from typing import Any, TypeAlias
 
 import psycopg
+from psycopg.types.json import Jsonb
 
-from db.connection import with_db
+from config import TZ_NAME
+from db.connection import after_commit, with_db
 
 RowData: TypeAlias = dict[str, Any]
 RowsData: TypeAlias = list[RowData]
 UserTimes: TypeAlias = tuple[str, str, str, str, str, str]
-UserScheduleRow: TypeAlias = tuple[int, str, str, str, str, str, str]
+UserMinutes: TypeAlias = tuple[int, int, int, int, int, int]
+UserScheduleRow: TypeAlias = tuple[int, int, int, int, int, int, int, str]
+DayChangeListener: TypeAlias = Callable[[int, str, RowData, bool], None]
 
 TIME_SLOT_COLUMNS: dict[str, str] = {
     'breakfast': 'breakfast_time',
@@ -21,6 +27,24 @@ TIME_SLOT_COLUMNS: dict[str, str] = {
     'bed': 'bed_time',
 }
 
+TIMETABLE_CHANNEL = 'user_timetable_changed'
+
+REMINDER_KIND_SNOOZE = 'snooze'
+REMINDER_KIND_REASK = 'reask'
+
+SCHEDULER_MEMBER_LOCK = 7301
+SCHEDULER_SHARD_LOCK = 7302
+
+NOTIFICATION_TIME_COLUMNS: dict[str, str] = {
+    'breakfast': 'breakfast_time',
+    'lunch': 'lunch_time',
+    'dinner': 'dinner_time',
+    'toilet': 'toilet_time',
+    'sleep_quality': 'wakeup_time',
+}
+
+_day_change_listeners: list[DayChangeListener] = []
+
 
 def _utc_now() -> datetime:
     """Возвращает текущее UTC-время без микросекунд для записей в БД.
@@ -43,6 +67,52 @@ def _parse_date(date_iso: str) -> date:
     return date.fromisoformat(date_iso)
 
 
+def _hhmm_to_minutes(time_str: str) -> int:
+    """Преобразует время `HH:MM` в минуты от полуночи для хранения.
+
+    Args:
+        time_str: Время в формате `HH:MM`.
+
+    Returns:
+        int: Минута суток от `0` до `1439`.
+    """
+    hours, minutes = time_str.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+def _minutes_to_hhmm(minutes: int) -> str:
+    """Преобразует хранимые минуты от полуночи во время `HH:MM`.
+
+    Args:
+        minutes: Минута суток от `0` до `1439`.
+
+    Returns:
+        str: Время в формате `HH:MM`.
+    """
+    return f'{minutes // 60:02d}:{minutes % 60:02d}'
+
+
+def _sleep_row_to_hhmm(row: RowData | None) -> RowData | None:
+    """Преобразует времена записи сна из минут в `HH:MM`.
+
+    Args:
+        row: Запись сна с колонками `wakeup_time` и `bed_time` в минутах
+            или `None`.
+
+    Returns:
+        RowData | None: Копия записи со временем `HH:MM` или `None`.
+    """
+    if row is None:
+        return None
+    converted_row = dict(row)
+    for column_name in ('wakeup_time', 'bed_time'):
+        if converted_row.get(column_name) is not None:
+            converted_row[column_name] = _minutes_to_hhmm(
+                converted_row[column_name],
+            )
+    return converted_row
+
+
 def _fetch_dict(cursor: psycopg.Cursor) -> RowData | None:
     """Возвращает одну строку курсора в формате словаря.
 
@@ -56,6 +126,25 @@ def _fetch_dict(cursor: psycopg.Cursor) -> RowData | None:
     return dict(row) if row else None
 
 
+def _fetch_changed_row(cursor: psycopg.Cursor) -> RowData | None:
+    """Возвращает строку `RETURNING` с датой в формате хранения.
+
+    Изменяющие функции возвращают затронутую запись вместе с её датой,
+    чтобы подписчики `add_day_change_listener` могли обновить вид дня без
+    повторного чтения.
+
+    Args:
+        cursor: Курсор PostgreSQL с `dict_row`.
+
+    Returns:
+        RowData | None: Словарь с полями записи или `None`.
+    """
+    row = _fetch_dict(cursor)
+    if row is not None:
+        row['date'] = row['date'].isoformat()
+    return row
+
+
 def _list_rows_for_day(
     cursor: psycopg.Cursor,
     query: str,
@@ -77,12 +166,117 @@ def _list_rows_for_day(
     return [dict(row) for row in cursor.fetchall()]
 
 
+def add_day_change_listener(listener: DayChangeListener) -> None:
+    """Подписывает обработчик на изменения данных дня пользователя.
+
+    Обработчик вызывается после фиксации транзакции каждой изменяющей
+    функцией разделов дня с аргументами `(user_id, section, row,
+    deleted)`: `section` — раздел `fetch_day_snapshot` (`meals`,
+    `medicines`, `stools`, `feelings`, `water`, `sleep`), `row` — запись
+    из `RETURNING` с ключом `date`, для воды — `date` и `glasses_count`.
+    При откате транзакции обработчик не вызывается.
+
+    Args:
+        listener: Обработчик изменения дня.
+    """
+    _day_change_listeners.append(listener)
+
+
+def _publish_day_change(
+    user_id: int,
+    section: str,
+    row: RowData | None,
+    deleted: bool = False,
+) -> None:
+    """Передаёт изменение данных дня подписчикам после фиксации.
+
+    Args:
+        user_id: Идентификатор пользователя.
+        section: Раздел снимка дня.
+        row: Изменённая запись с ключом `date` или `None`, если ничего не
+            изменилось.
+        deleted: Удалена ли запись.
+    """
+    if row is None:
+        return
+    for listener in _day_change_listeners:
+        after_commit(partial(listener, user_id, section, dict(row), deleted))
+
+
+def _notify_timetable_changed(cursor: psycopg.Cursor, user_id: int) -> None:
+    """Сообщает планировщику об изменении расписания пользователя.
+
+    Уведомление `NOTIFY` доставляется слушателям только после фиксации
+    транзакции.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+        user_id: Идентификатор пользователя.
+    """
+    cursor.execute(
+        'SELECT pg_notify(%s, %s)',
+        (TIMETABLE_CHANNEL, str(user_id)),
+    )
+
+
+def _scheduler_scope_sql(
+    alias: str,
+    shards: Collection[int] | None,
+    zones: Collection[str] | None,
+) -> str:
+    """Возвращает условия отбора пользователей шардов и часовых поясов.
+
+    Условия используют именованные параметры `shard_count`, `shards`,
+    `zones` и `default_tz`.
+
+    Args:
+        alias: Имя таблицы или подзапроса с колонками `user_id` и `tz`.
+        shards: Шарды пользователя или `None` — без ограничения.
+        zones: Часовые пояса или `None` — без ограничения.
+
+    Returns:
+        str: Условия вида ` AND ...` или пустая строка.
+    """
+    conditions = ''
+    if shards is not None:
+        conditions += (
+            f' AND {alias}.user_id %% %(shard_count)s = ANY(%(shards)s)'
+        )
+    if zones is not None:
+        conditions += (
+            f' AND COALESCE({alias}.tz, %(default_tz)s) = ANY(%(zones)s)'
+        )
+    return conditions
+
+
+def _schedule_row(row: RowData) -> UserScheduleRow:
+    """Преобразует строку `users` в кортеж расписания планировщика.
+
+    Args:
+        row: Строка с колонками расписания и `tz`.
+
+    Returns:
+        UserScheduleRow: Идентификатор, времена расписания в минутах от
+        полуночи и часовой пояс.
+    """
+    return (
+        row['user_id'],
+        row['breakfast_time'],
+        row['lunch_time'],
+        row['dinner_time'],
+        row['toilet_time'],
+        row['wakeup_time'],
+        row['bed_time'],
+        row['tz'],
+    )
+
+
 def _delete_by_id(
     cursor: psycopg.Cursor,
     table_name: str,
     user_id: int,
     entity_id: int,
-) -> bool:
+) -> RowData | None:
     """Удаляет запись пользователя по идентификатору.
 
     Args:
@@ -92,28 +286,37 @@ def _delete_by_id(
         entity_id: Идентификатор записи.
 
     Returns:
-        bool: `True`, если запись удалена; иначе `False`.
+        RowData | None: `id` и `date` удалённой записи или `None`, если
+        запись не найдена.
     """
     cursor.execute(
-        f'DELETE FROM {table_name} WHERE id=%s AND user_id=%s',
+        f'DELETE FROM {table_name} WHERE id=%s AND user_id=%s '
+        'RETURNING id, date',
         (entity_id, user_id),
     )
-    return cursor.rowcount > 0
+    return _fetch_changed_row(cursor)
 
 
 @with_db
 def register_user(cursor: psycopg.Cursor, user_id: int) -> None:
     """Создаёт пользователя при первом обращении к боту.
 
+    Пользователь, отключённый после блокировки бота, снова становится
+    активным; счётчик ошибок доставки сохраняется для истории.
+
     Args:
         cursor: Курсор PostgreSQL.
         user_id: Идентификатор пользователя Telegram.
     """
     cursor.execute(
         'INSERT INTO users(user_id) VALUES (%s) '
-        'ON CONFLICT(user_id) DO NOTHING',
-        (user_id,),
+        'ON CONFLICT(user_id) DO UPDATE '
+        'SET active = TRUE, deactivated_at = NULL, updated_at = %s '
+        'WHERE NOT users.active',
+        (user_id, _utc_now()),
     )
+    if cursor.rowcount > 0:
+        _notify_timetable_changed(cursor, user_id)
 
 
 @with_db
@@ -141,12 +344,12 @@ def get_user_times(
     if not row:
         return None
     return (
-        row['breakfast_time'],
-        row['lunch_time'],
-        row['dinner_time'],
-        row['toilet_time'],
-        row['wakeup_time'],
-        row['bed_time'],
+        _minutes_to_hhmm(row['breakfast_time']),
+        _minutes_to_hhmm(row['lunch_time']),
+        _minutes_to_hhmm(row['dinner_time']),
+        _minutes_to_hhmm(row['toilet_time']),
+        _minutes_to_hhmm(row['wakeup_time']),
+        _minutes_to_hhmm(row['bed_time']),
     )
 
 
@@ -175,87 +378,741 @@ def update_user_time(
     cursor.execute(
         f'UPDATE users SET {column_name}=%s, updated_at=%s '
         'WHERE user_id=%s',
-        (time_str, _utc_now(), user_id),
+        (_hhmm_to_minutes(time_str), _utc_now(), user_id),
     )
-    return cursor.rowcount > 0
+    is_updated = cursor.rowcount > 0
+    if is_updated:
+        _notify_timetable_changed(cursor, user_id)
+    return is_updated
+
+
+@with_db
+def get_user_tz(cursor: psycopg.Cursor, user_id: int) -> str:
+    """Возвращает часовой пояс пользователя.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+        user_id: Идентификатор пользователя Telegram.
+
+    Returns:
+        str: Имя часового пояса IANA; `TZ_NAME`, если пояс не выбран или
+        пользователь не найден.
+    """
+    cursor.execute('SELECT tz FROM users WHERE user_id = %s', (user_id,))
+    row = cursor.fetchone()
+    if not row or not row['tz']:
+        return TZ_NAME
+    return row['tz']
+
+
+@with_db
+def update_user_tz(
+    cursor: psycopg.Cursor,
+    user_id: int,
+    tz_name: str,
+) -> bool:
+    """Сохраняет часовой пояс пользователя.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+        user_id: Идентификатор пользователя Telegram.
+        tz_name: Проверенное имя часового пояса IANA.
+
+    Returns:
+        bool: `True`, если строка пользователя обновлена.
+    """
+    cursor.execute(
+        'UPDATE users SET tz=%s, updated_at=%s WHERE user_id=%s',
+        (tz_name, _utc_now(), user_id),
+    )
+    is_updated = cursor.rowcount > 0
+    if is_updated:
+        _notify_timetable_changed(cursor, user_id)
+    return is_updated
+
+
+@with_db
+def deactivate_user(
+    cursor: psycopg.Cursor,
+    user_id: int,
+    error: str,
+) -> int:
+    """Отключает напоминания пользователю, которому бот не может писать.
+
+    Тем же запросом все ожидающие строки outbox пользователя переводятся
+    в dead letter, поэтому они больше не выдаются пулу отправки. Счётчик
+    `deactivations` растёт только при первом отключении: повторный вызов
+    для уже отключённого пользователя лишь дочищает его строки outbox.
+    Ошибки отправки считаются отдельно в `delivery_failures`.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+        user_id: Идентификатор пользователя Telegram.
+        error: Текст ошибки доставки.
+
+    Returns:
+        int: Количество строк outbox, переведённых в dead letter.
+    """
+    now = _utc_now()
+    cursor.execute(
+        'WITH deactivated AS ('
+        'UPDATE users SET active = FALSE, '
+        'deactivations = deactivations + 1, '
+        'last_delivery_error = %(error)s, deactivated_at = %(now)s, '
+        'updated_at = %(now)s '
+        'WHERE user_id = %(user_id)s AND active '
+        'RETURNING user_id'
+        '), dead AS ('
+        'UPDATE notification_outbox '
+        "SET status = 'dead', last_error = %(error)s "
+        "WHERE user_id = %(user_id)s AND status = 'pending' "
+        'RETURNING id'
+        ') '
+        'SELECT (SELECT count(*) FROM deactivated) AS deactivated, '
+        '(SELECT count(*) FROM dead) AS dead_lettered',
+        {'user_id': user_id, 'error': error, 'now': now},
+    )
+    row = cursor.fetchone()
+    if row['deactivated']:
+        _notify_timetable_changed(cursor, user_id)
+    return row['dead_lettered']
 
 
 @with_db
 def get_all_users(cursor: psycopg.Cursor) -> list[UserScheduleRow]:
-    """Возвращает расписание всех пользователей для планировщика.
+    """Возвращает расписание всех активных пользователей для планировщика.
 
     Args:
         cursor: Курсор PostgreSQL.
 
     Returns:
-        list[UserScheduleRow]: Список кортежей с настройками расписания.
+        list[UserScheduleRow]: Список кортежей с временами расписания в
+        минутах от полуночи и часовым поясом пользователя.
     """
     cursor.execute(
         'SELECT user_id, breakfast_time, lunch_time, dinner_time, '
-        'toilet_time, wakeup_time, bed_time '
-        'FROM users',
+        'toilet_time, wakeup_time, bed_time, '
+        'COALESCE(tz, %s) AS tz '
+        'FROM users WHERE active',
+        (TZ_NAME,),
     )
-    return [
-        (
-            row['user_id'],
-            row['breakfast_time'],
-            row['lunch_time'],
-            row['dinner_time'],
-            row['toilet_time'],
-            row['wakeup_time'],
-            row['bed_time'],
+    return [_schedule_row(row) for row in cursor.fetchall()]
+
+
+@with_db
+def get_user_schedule(
+    cursor: psycopg.Cursor,
+    user_id: int,
+) -> UserScheduleRow | None:
+    """Возвращает расписание активного пользователя для планировщика.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+        user_id: Идентификатор пользователя Telegram.
+
+    Returns:
+        UserScheduleRow | None: Расписание и часовой пояс пользователя или
+        `None`, если пользователь не найден или отключён.
+    """
+    cursor.execute(
+        'SELECT user_id, breakfast_time, lunch_time, dinner_time, '
+        'toilet_time, wakeup_time, bed_time, '
+        'COALESCE(tz, %s) AS tz '
+        'FROM users WHERE user_id = %s AND active',
+        (TZ_NAME, user_id),
+    )
+    row = cursor.fetchone()
+    if not row:
+        return None
+    return _schedule_row(row)
+
+
+@with_db
+def enqueue_due_notifications(
+    cursor: psycopg.Cursor,
+    date_iso: str,
+    first_minute: int,
+    last_minute: int,
+    first_wakeup_minute: int,
+    last_wakeup_minute: int,
+    shard_count: int = 1,
+    shards: Collection[int] | None = None,
+    jitter_seconds: int = 0,
+    zones: Collection[str] | None = None,
+) -> int:
+    """Атомарно ставит в outbox напоминания, запланированные на отрезок.
+
+    Для каждого типа уведомления выполняется индексный поиск по диапазону
+    колонки расписания, и все найденные пары одним запросом записываются в
+    журнал `notifications_log`. Только строки, которые вставил именно этот
+    вызов, попадают в `notification_outbox`, поэтому несколько
+    планировщиков и повторная обработка того же отрезка не поставят
+    напоминание в очередь дважды.
+
+    С ненулевым `jitter_seconds` строка становится доступной для отправки
+    не в начале минуты, а со сдвигом `user_id % jitter_seconds` секунд:
+    одновременные напоминания распределяются по окну, а каждый
+    пользователь каждый день получает своё напоминание в одно и то же
+    время.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+        date_iso: Дата уведомлений в формате хранения.
+        first_minute: Начало отрезка в минутах от полуночи (включительно)
+            для завтрака, обеда, ужина и туалета.
+        last_minute: Конец отрезка в минутах от полуночи (включительно).
+        first_wakeup_minute: Начало отрезка времени подъёма, для которого
+            пора спросить о качестве сна, в минутах от полуночи.
+        last_wakeup_minute: Конец отрезка времени подъёма.
+        shard_count: Общее число шардов планировщика.
+        shards: Шарды `user_id % shard_count`, которыми владеет вызывающий
+            планировщик; `None` — все пользователи.
+        jitter_seconds: Ширина окна рассеивания отправки в секундах;
+            `0` — без рассеивания.
+        zones: Часовые пояса с одинаковым текущим смещением UTC, для
+            которых отрезок задан в местном времени; `None` — все
+            пользователи.
+
+    Returns:
+        int: Количество напоминаний, поставленных в outbox.
+    """
+    due_selects: list[str] = []
+    for notification_type, column_name in NOTIFICATION_TIME_COLUMNS.items():
+        range_params = (
+            ('first_wakeup_minute', 'last_wakeup_minute')
+            if notification_type == 'sleep_quality'
+            else ('first_minute', 'last_minute')
         )
-        for row in cursor.fetchall()
-    ]
+        due_selects.append(
+            f"SELECT user_id, '{notification_type}' AS type FROM users "
+            f'WHERE {column_name} '
+            f'BETWEEN %({range_params[0]})s AND %({range_params[1]})s '
+            'AND active'
+            + _scheduler_scope_sql('users', shards, zones)
+        )
+    cursor.execute(
+        'WITH claimed AS ('
+        'INSERT INTO notifications_log(user_id, type, date) '
+        'SELECT due.user_id, due.type, %(date)s FROM ('
+        + ' UNION ALL '.join(due_selects)
+        + ') AS due '
+        'ON CONFLICT(user_id, type, date) DO NOTHING '
+        'RETURNING user_id, type, date'
+        ') '
+        'INSERT INTO notification_outbox(user_id, type, date, available_at) '
+        'SELECT user_id, type, date, '
+        "date_trunc('minute', NOW()) "
+        '+ make_interval(secs => mod(user_id, %(jitter_seconds)s)) '
+        'FROM claimed',
+        {
+            'date': _parse_date(date_iso),
+            'first_minute': first_minute,
+            'last_minute': last_minute,
+            'first_wakeup_minute': first_wakeup_minute,
+            'last_wakeup_minute': last_wakeup_minute,
+            'shard_count': shard_count,
+            'shards': sorted(shards or ()),
+            'jitter_seconds': max(1, jitter_seconds),
+            'zones': sorted(zones or ()),
+            'default_tz': TZ_NAME,
+        },
+    )
+    return cursor.rowcount
 
 
 @with_db
-def is_notification_sent(
+def lease_outbox_batch(
+    cursor: psycopg.Cursor,
+    limit: int,
+    lease_seconds: int,
+) -> RowsData:
+    """Забирает пачку готовых к отправке строк outbox.
+
+    Строки выбираются через `FOR UPDATE SKIP LOCKED`, поэтому параллельные
+    обработчики получают разные пачки, и сдвигаются на время аренды: если
+    обработчик упадёт, не завершив отправку, строки снова станут доступны
+    после окончания аренды.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+        limit: Максимальный размер пачки.
+        lease_seconds: Длительность аренды в секундах.
+
+    Returns:
+        RowsData: Строки outbox с полями `id`, `user_id`, `type`, `date`,
+        `payload` и `attempts`.
+    """
+    cursor.execute(
+        'UPDATE notification_outbox '
+        "SET available_at = NOW() + make_interval(secs => %s) "
+        'WHERE id IN ('
+        'SELECT id FROM notification_outbox '
+        "WHERE status = 'pending' AND available_at <= NOW() "
+        'ORDER BY available_at '
+        'LIMIT %s '
+        'FOR UPDATE SKIP LOCKED'
+        ') '
+        'RETURNING id, user_id, type, date, payload, attempts',
+        (lease_seconds, limit),
+    )
+    return [dict(row) for row in cursor.fetchall()]
+
+
+@with_db
+def get_next_outbox_delay(cursor: psycopg.Cursor) -> float | None:
+    """Возвращает, через сколько секунд станет доступна следующая строка.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+
+    Returns:
+        float | None: Пауза в секундах (`0`, если строки уже доступны) или
+        `None`, если ожидающих строк нет.
+    """
+    cursor.execute(
+        'SELECT EXTRACT(EPOCH FROM min(available_at) - NOW())::float '
+        'AS delay '
+        'FROM notification_outbox '
+        "WHERE status = 'pending'",
+    )
+    delay = cursor.fetchone()['delay']
+    if delay is None:
+        return None
+    return max(delay, 0.0)
+
+
+@with_db
+def mark_outbox_sent(
+    cursor: psycopg.Cursor,
+    outbox_id: int,
+    reask_minutes: int = 0,
+) -> None:
+    """Отмечает строку outbox как доставленную сразу после отправки.
+
+    С ненулевым `reask_minutes` тем же запросом ставится повторный вопрос
+    на случай, если пользователь не ответит. Повтор не ставится для
+    повторных вопросов и для вопросов, ответ на которые уже сохранён:
+    приёма пищи этого типа, стула или качества сна за дату напоминания.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+        outbox_id: Идентификатор доставленной строки.
+        reask_minutes: Через сколько минут повторить вопрос без ответа;
+            `0` — не повторять.
+    """
+    cursor.execute(
+        'WITH sent AS ('
+        'UPDATE notification_outbox '
+        "SET status = 'sent', sent_at = NOW() "
+        'WHERE id = %(id)s '
+        'RETURNING user_id, type, date, payload'
+        ') '
+        'INSERT INTO notification_outbox('
+        'user_id, type, date, payload, available_at'
+        ') '
+        'SELECT user_id, type, date, '
+        "jsonb_build_object('kind', %(reask_kind)s), "
+        'NOW() + make_interval(mins => %(reask_minutes)s) '
+        'FROM sent '
+        'WHERE %(reask_minutes)s > 0 '
+        "AND payload->>'kind' IS DISTINCT FROM %(reask_kind)s "
+        'AND NOT EXISTS ('
+        'SELECT 1 FROM meals WHERE meals.user_id = sent.user_id '
+        'AND meals.date = sent.date AND meals.meal_type = sent.type'
+        ') '
+        'AND NOT EXISTS ('
+        "SELECT 1 FROM stools WHERE sent.type = 'toilet' "
+        'AND stools.user_id = sent.user_id AND stools.date = sent.date'
+        ') '
+        'AND NOT EXISTS ('
+        "SELECT 1 FROM sleeps WHERE sent.type = 'sleep_quality' "
+        'AND sleeps.user_id = sent.user_id AND sleeps.date = sent.date '
+        'AND sleeps.quality_description IS NOT NULL'
+        ')',
+        {
+            'id': outbox_id,
+            'reask_minutes': reask_minutes,
+            'reask_kind': REMINDER_KIND_REASK,
+        },
+    )
+
+
+@with_db
+def snooze_notification(
     cursor: psycopg.Cursor,
     user_id: int,
     notification_type: str,
     date_iso: str,
-) -> bool:
-    """Проверяет, было ли отправлено уведомление за указанную дату.
+    delay_minutes: int,
+) -> None:
+    """Откладывает напоминание, заменяя ожидающие повторы.
+
+    Отложенное напоминание — обычная строка outbox со сроком в будущем,
+    поэтому оно переживает перезапуск и доставляется пулом отправки без
+    участия планировщика.
 
     Args:
         cursor: Курсор PostgreSQL.
         user_id: Идентификатор пользователя Telegram.
-        notification_type: Тип уведомления.
-        date_iso: Дата в формате хранения.
+        notification_type: Тип напоминания.
+        date_iso: Дата напоминания в формате хранения.
+        delay_minutes: Через сколько минут напомнить.
+    """
+    cursor.execute(
+        'WITH cancelled AS ('
+        'DELETE FROM notification_outbox '
+        'WHERE user_id = %(user_id)s AND type = %(type)s '
+        "AND date = %(date)s AND status = 'pending'"
+        ') '
+        'INSERT INTO notification_outbox('
+        'user_id, type, date, payload, available_at'
+        ') '
+        'VALUES (%(user_id)s, %(type)s, %(date)s, '
+        "jsonb_build_object('kind', %(kind)s), "
+        'NOW() + make_interval(mins => %(delay_minutes)s))',
+        {
+            'user_id': user_id,
+            'type': notification_type,
+            'date': _parse_date(date_iso),
+            'kind': REMINDER_KIND_SNOOZE,
+            'delay_minutes': delay_minutes,
+        },
+    )
+
+
+@with_db
+def cancel_pending_notifications(
+    cursor: psycopg.Cursor,
+    user_id: int,
+    notification_type: str,
+    date_iso: str,
+) -> int:
+    """Отменяет ожидающие повторы и отложенные напоминания на вопрос.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+        user_id: Идентификатор пользователя Telegram.
+        notification_type: Тип напоминания.
+        date_iso: Дата напоминания в формате хранения.
 
     Returns:
-        bool: `True`, если уведомление уже отправлено.
+        int: Количество отменённых строк outbox.
     """
     cursor.execute(
-        'SELECT 1 FROM notifications_log '
-        'WHERE user_id=%s AND type=%s AND date=%s',
+        'DELETE FROM notification_outbox '
+        'WHERE user_id = %s AND type = %s AND date = %s '
+        "AND status = 'pending'",
         (user_id, notification_type, _parse_date(date_iso)),
     )
-    return cursor.fetchone() is not None
+    return cursor.rowcount
 
 
 @with_db
-def mark_notification_sent(
+def get_pending_question(
     cursor: psycopg.Cursor,
     user_id: int,
-    notification_type: str,
-    date_iso: str,
+) -> RowData | None:
+    """Возвращает вопрос, ожидающий ответа пользователя.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+        user_id: Идентификатор пользователя Telegram.
+
+    Returns:
+        RowData | None: Строка с полями `step` и `data` или `None`, если
+        вопроса нет.
+    """
+    cursor.execute(
+        'SELECT step, data FROM pending_questions WHERE user_id = %s',
+        (user_id,),
+    )
+    return _fetch_dict(cursor)
+
+
+@with_db
+def set_pending_question(
+    cursor: psycopg.Cursor,
+    user_id: int,
+    step: str,
+    data: dict[str, Any],
 ) -> None:
-    """Помечает уведомление как отправленное в журнале.
+    """Запоминает вопрос, ожидающий ответа, вместо предыдущего.
 
     Args:
         cursor: Курсор PostgreSQL.
         user_id: Идентификатор пользователя Telegram.
-        notification_type: Тип уведомления.
-        date_iso: Дата в формате хранения.
+        step: Шаг сценария ответа.
+        data: Контекст вопроса, например дата напоминания.
     """
     cursor.execute(
-        'INSERT INTO notifications_log(user_id, type, date) '
-        'VALUES (%s, %s, %s) '
-        'ON CONFLICT(user_id, type, date) DO NOTHING',
-        (user_id, notification_type, _parse_date(date_iso)),
+        'INSERT INTO pending_questions(user_id, step, data, asked_at) '
+        'VALUES (%s, %s, %s, NOW()) '
+        'ON CONFLICT (user_id) DO UPDATE SET '
+        'step = EXCLUDED.step, data = EXCLUDED.data, '
+        'asked_at = EXCLUDED.asked_at',
+        (user_id, step, Jsonb(data)),
+    )
+
+
+@with_db
+def clear_pending_question(cursor: psycopg.Cursor, user_id: int) -> None:
+    """Удаляет вопрос, ожидающий ответа пользователя.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+        user_id: Идентификатор пользователя Telegram.
+    """
+    cursor.execute(
+        'DELETE FROM pending_questions WHERE user_id = %s',
+        (user_id,),
+    )
+
+
+@with_db
+def retry_outbox_row(
+    cursor: psycopg.Cursor,
+    outbox_id: int,
+    delay_seconds: float,
+    error: str,
+    count_attempt: bool = True,
+) -> None:
+    """Откладывает повторную отправку строки outbox.
+
+    Учтённая попытка тем же запросом увеличивает `delivery_failures`
+    пользователя и сохраняет `last_delivery_error`.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+        outbox_id: Идентификатор строки.
+        delay_seconds: Пауза до следующей попытки в секундах.
+        error: Текст последней ошибки.
+        count_attempt: Учитывать ли попытку в счётчике `attempts` и в
+            ошибках доставки пользователя; `False` для ответа 429.
+    """
+    cursor.execute(
+        'WITH retried AS ('
+        'UPDATE notification_outbox '
+        'SET available_at = NOW() + make_interval(secs => %(delay)s), '
+        'attempts = attempts + %(attempt)s, last_error = %(error)s '
+        'WHERE id = %(id)s '
+        'RETURNING user_id'
+        ') '
+        'UPDATE users SET delivery_failures = delivery_failures + 1, '
+        'last_delivery_error = %(error)s '
+        'FROM retried '
+        'WHERE users.user_id = retried.user_id AND %(attempt)s > 0',
+        {
+            'id': outbox_id,
+            'delay': delay_seconds,
+            'attempt': 1 if count_attempt else 0,
+            'error': error,
+        },
+    )
+
+
+@with_db
+def dead_letter_outbox_row(
+    cursor: psycopg.Cursor,
+    outbox_id: int,
+    error: str,
+) -> None:
+    """Переводит строку outbox в dead letter после исчерпания попыток.
+
+    Тем же запросом увеличивает `delivery_failures` пользователя и
+    сохраняет `last_delivery_error`.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+        outbox_id: Идентификатор строки.
+        error: Текст последней ошибки.
+    """
+    cursor.execute(
+        'WITH dead AS ('
+        'UPDATE notification_outbox '
+        "SET status = 'dead', attempts = attempts + 1, last_error = %(error)s "
+        'WHERE id = %(id)s '
+        'RETURNING user_id'
+        ') '
+        'UPDATE users SET delivery_failures = delivery_failures + 1, '
+        'last_delivery_error = %(error)s '
+        'FROM dead WHERE users.user_id = dead.user_id',
+        {'id': outbox_id, 'error': error},
+    )
+
+
+@with_db
+def get_outbox_stats(cursor: psycopg.Cursor) -> RowData:
+    """Возвращает размер очереди и пропускную способность outbox.
+
+    Каждый счётчик считается отдельным подзапросом по своему частичному
+    индексу, поэтому запрос не читает историю доставленных строк.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+
+    Returns:
+        RowData: `pending` — ожидают отправки, `due` — готовы к отправке,
+        `oldest_due_seconds` — сколько ждёт самая давно готовая строка,
+        считая от `available_at`, а не от создания: отложенная строка не
+        опаздывает, пока не настал её срок,
+        `sent_last_minute` — доставлено за последнюю минуту, `dead` —
+        число строк в dead letter.
+    """
+    cursor.execute(
+        'SELECT '
+        '(SELECT count(*) FROM notification_outbox '
+        "WHERE status = 'pending') AS pending, "
+        '(SELECT count(*) FROM notification_outbox '
+        "WHERE status = 'pending' AND available_at <= NOW()) AS due, "
+        '(SELECT COALESCE(EXTRACT(EPOCH FROM NOW() - min(available_at)), 0) '
+        'FROM notification_outbox '
+        "WHERE status = 'pending' AND available_at <= NOW())"
+        '::float AS oldest_due_seconds, '
+        '(SELECT count(*) FROM notification_outbox '
+        "WHERE status = 'sent' "
+        "AND sent_at > NOW() - interval '1 minute') AS sent_last_minute, "
+        '(SELECT count(*) FROM notification_outbox '
+        "WHERE status = 'dead') AS dead",
+    )
+    return dict(cursor.fetchone())
+
+
+@with_db
+def delete_finished_outbox_batch(
+    cursor: psycopg.Cursor,
+    retention_days: int,
+    limit: int,
+) -> int:
+    """Удаляет пачку доставленных и мёртвых строк outbox старше горизонта.
+
+    Доставленные строки отсчитываются от `sent_at`, строки в dead letter —
+    от `created_at`; обе выборки идут по частичным индексам. Строки,
+    заблокированные другим удаляющим процессом, пропускаются.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+        retention_days: Сколько дней хранить завершённые строки.
+        limit: Наибольшее число строк каждого статуса в пачке.
+
+    Returns:
+        int: Количество удалённых строк.
+    """
+    cursor.execute(
+        'WITH sent AS ('
+        'SELECT id FROM notification_outbox '
+        "WHERE status = 'sent' "
+        'AND sent_at < NOW() - make_interval(days => %(days)s) '
+        'LIMIT %(limit)s FOR UPDATE SKIP LOCKED'
+        '), dead AS ('
+        'SELECT id FROM notification_outbox '
+        "WHERE status = 'dead' "
+        'AND created_at < NOW() - make_interval(days => %(days)s) '
+        'LIMIT %(limit)s FOR UPDATE SKIP LOCKED'
+        ') '
+        'DELETE FROM notification_outbox '
+        'WHERE id IN (SELECT id FROM sent UNION ALL SELECT id FROM dead)',
+        {'days': retention_days, 'limit': limit},
+    )
+    return cursor.rowcount
+
+
+def register_scheduler_member(cursor: psycopg.Cursor) -> None:
+    """Отмечает подключение планировщика как участника шардирования.
+
+    Берётся сессионная advisory-блокировка с ключом `pg_backend_pid()`,
+    поэтому участник исчезает вместе с подключением, в том числе при
+    аварийном завершении процесса. Функция не использует `with_db`:
+    блокировка должна жить на долгоживущем подключении планировщика.
+
+    Args:
+        cursor: Курсор долгоживущего подключения планировщика.
+    """
+    cursor.execute(
+        'SELECT pg_advisory_lock(%s, pg_backend_pid())',
+        (SCHEDULER_MEMBER_LOCK,),
+    )
+
+
+def list_scheduler_members(cursor: psycopg.Cursor) -> list[int]:
+    """Возвращает идентификаторы живых участников шардирования.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+
+    Returns:
+        list[int]: Отсортированные `pid` подключений участников.
+    """
+    cursor.execute(
+        'SELECT objid AS pid FROM pg_locks '
+        "WHERE locktype = 'advisory' AND granted "
+        'AND classid = %s AND objsubid = 2 '
+        'AND database = ('
+        'SELECT oid FROM pg_database WHERE datname = current_database()'
+        ') '
+        'ORDER BY objid',
+        (SCHEDULER_MEMBER_LOCK,),
+    )
+    return [int(row['pid']) for row in cursor.fetchall()]
+
+
+def try_lock_shard(cursor: psycopg.Cursor, shard: int) -> bool:
+    """Пытается стать владельцем шарда планировщика без ожидания.
+
+    Args:
+        cursor: Курсор долгоживущего подключения планировщика.
+        shard: Номер шарда.
+
+    Returns:
+        bool: `True`, если шард теперь принадлежит этому подключению.
+    """
+    cursor.execute(
+        'SELECT pg_try_advisory_lock(%s, %s) AS locked',
+        (SCHEDULER_SHARD_LOCK, shard),
+    )
+    return cursor.fetchone()['locked']
+
+
+def unlock_shard(cursor: psycopg.Cursor, shard: int) -> None:
+    """Освобождает шард планировщика для других участников.
+
+    Args:
+        cursor: Курсор долгоживущего подключения планировщика.
+        shard: Номер шарда.
+    """
+    cursor.execute(
+        'SELECT pg_advisory_unlock(%s, %s)',
+        (SCHEDULER_SHARD_LOCK, shard),
+    )
+
+
+@with_db
+def delete_notification_log_batch(
+    cursor: psycopg.Cursor,
+    before_date: date,
+    limit: int,
+) -> int:
+    """Удаляет из журнала напоминаний пачку записей за старые даты.
+
+    Строки, заблокированные другим удаляющим процессом, пропускаются,
+    поэтому задачи очистки разных процессов не ждут друг друга.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+        before_date: Записи с датой раньше этой удаляются.
+        limit: Наибольшее число удаляемых строк.
+
+    Returns:
+        int: Количество удалённых строк.
+    """
+    cursor.execute(
+        'DELETE FROM notifications_log '
+        'WHERE date < %(before)s AND id IN ('
+        'SELECT id FROM notifications_log WHERE date < %(before)s '
+        'LIMIT %(limit)s FOR UPDATE SKIP LOCKED'
+        ')',
+        {'before': before_date, 'limit': limit},
     )
+    return cursor.rowcount
 
 
 def _ensure_sleep_row(
@@ -305,31 +1162,61 @@ def ensure_sleep_for_day(
         'FROM sleeps WHERE user_id=%s AND date=%s',
         (user_id, date_value),
     )
-    return _fetch_dict(cursor)
+    return _sleep_row_to_hhmm(_fetch_dict(cursor))
 
 
 @with_db
-def get_sleep_for_day(
+def ensure_sleep_rows_for_dates(
     cursor: psycopg.Cursor,
-    user_id: int,
-    date_iso: str,
-) -> RowData | None:
-    """Возвращает запись сна пользователя за конкретный день.
+    first_date_iso: str,
+    last_date_iso: str,
+    shard_count: int = 1,
+    shards: Collection[int] | None = None,
+    zones: Collection[str] | None = None,
+) -> int:
+    """Создаёт записи сна активных пользователей за диапазон дат.
+
+    Запись создаётся из дефолтных времён пользователя только для дат, не
+    раньше дня его регистрации; существующие записи не изменяются, поэтому
+    повторный вызов безопасен.
 
     Args:
         cursor: Курсор PostgreSQL.
-        user_id: Идентификатор пользователя.
-        date_iso: Дата в формате хранения.
+        first_date_iso: Первая дата диапазона в формате хранения.
+        last_date_iso: Последняя дата диапазона в формате хранения.
+        shard_count: Общее число шардов планировщика.
+        shards: Шарды пользователей или `None` — все пользователи.
+        zones: Часовые пояса, в которых даты диапазона являются местными,
+            или `None` — все пользователи.
 
     Returns:
-        RowData | None: Словарь с данными сна или `None`.
+        int: Количество созданных записей сна.
     """
+    now = _utc_now()
     cursor.execute(
-        'SELECT id, wakeup_time, bed_time, quality_description '
-        'FROM sleeps WHERE user_id=%s AND date=%s',
-        (user_id, _parse_date(date_iso)),
+        'INSERT INTO sleeps('
+        'user_id, date, wakeup_time, bed_time, created_at, updated_at'
+        ') '
+        'SELECT users.user_id, day::date, users.wakeup_time, '
+        'users.bed_time, %(now)s, %(now)s '
+        'FROM users '
+        'CROSS JOIN generate_series('
+        "%(first_date)s::date, %(last_date)s::date, interval '1 day'"
+        ') AS day '
+        "WHERE users.active AND users.created_at < day + interval '1 day'"
+        + _scheduler_scope_sql('users', shards, zones)
+        + ' ON CONFLICT(user_id, date) DO NOTHING',
+        {
+            'now': now,
+            'first_date': _parse_date(first_date_iso),
+            'last_date': _parse_date(last_date_iso),
+            'shard_count': shard_count,
+            'shards': sorted(shards or ()),
+            'zones': sorted(zones or ()),
+            'default_tz': TZ_NAME,
+        },
     )
-    return _fetch_dict(cursor)
+    return cursor.rowcount
 
 
 @with_db
@@ -339,48 +1226,56 @@ def upsert_sleep_times(
     date_iso: str,
     wakeup_time: str | None = None,
     bed_time: str | None = None,
-) -> bool:
+) -> RowData | None:
     """Обновляет время подъёма и/или отхода ко сну за конкретный день.
 
+    Отсутствующая запись сна создаётся в том же запросе из дефолтных
+    времён пользователя.
+
     Args:
         cursor: Курсор PostgreSQL.
         user_id: Идентификатор пользователя.
         date_iso: Дата в формате хранения.
-        wakeup_time: Новое время подъёма или `None`.
-        bed_time: Новое время отхода ко сну или `None`.
+        wakeup_time: Новое время подъёма `HH:MM` или `None`.
+        bed_time: Новое время отхода ко сну `HH:MM` или `None`.
 
     Returns:
-        bool: `True`, если данные были обновлены.
+        RowData | None: Запись сна со временем `HH:MM` и датой или `None`,
+        если менять нечего или пользователь не найден.
     """
-    _ensure_sleep_row(cursor, user_id, date_iso)
-    date_value = _parse_date(date_iso)
+    if wakeup_time is None and bed_time is None:
+        return None
     now = _utc_now()
-
-    if wakeup_time is not None and bed_time is not None:
-        cursor.execute(
-            'UPDATE sleeps SET wakeup_time=%s, bed_time=%s, updated_at=%s '
-            'WHERE user_id=%s AND date=%s',
-            (wakeup_time, bed_time, now, user_id, date_value),
-        )
-        return cursor.rowcount > 0
-
-    if wakeup_time is not None:
-        cursor.execute(
-            'UPDATE sleeps SET wakeup_time=%s, updated_at=%s '
-            'WHERE user_id=%s AND date=%s',
-            (wakeup_time, now, user_id, date_value),
-        )
-        return cursor.rowcount > 0
-
-    if bed_time is not None:
-        cursor.execute(
-            'UPDATE sleeps SET bed_time=%s, updated_at=%s '
-            'WHERE user_id=%s AND date=%s',
-            (bed_time, now, user_id, date_value),
-        )
-        return cursor.rowcount > 0
-
-    return False
+    cursor.execute(
+        'INSERT INTO sleeps('
+        'user_id, date, wakeup_time, bed_time, created_at, updated_at'
+        ') '
+        'SELECT user_id, %(date)s, '
+        'COALESCE(%(wakeup)s::smallint, wakeup_time), '
+        'COALESCE(%(bed)s::smallint, bed_time), %(now)s, %(now)s '
+        'FROM users WHERE user_id=%(user_id)s '
+        'ON CONFLICT(user_id, date) DO UPDATE SET '
+        'wakeup_time=COALESCE(%(wakeup)s::smallint, sleeps.wakeup_time), '
+        'bed_time=COALESCE(%(bed)s::smallint, sleeps.bed_time), '
+        'updated_at=EXCLUDED.updated_at '
+        'RETURNING id, date, wakeup_time, bed_time, quality_description',
+        {
+            'user_id': user_id,
+            'date': _parse_date(date_iso),
+            'wakeup': (
+                _hhmm_to_minutes(wakeup_time)
+                if wakeup_time is not None
+                else None
+            ),
+            'bed': (
+                _hhmm_to_minutes(bed_time) if bed_time is not None else None
+            ),
+            'now': now,
+        },
+    )
+    row = _sleep_row_to_hhmm(_fetch_changed_row(cursor))
+    _publish_day_change(user_id, 'sleep', row)
+    return row
 
 
 @with_db
@@ -389,7 +1284,7 @@ def upsert_sleep_quality(
     user_id: int,
     date_iso: str,
     quality_description: str,
-) -> bool:
+) -> RowData | None:
     """Создаёт или обновляет описание качества сна за день.
 
     Args:
@@ -399,7 +1294,8 @@ def upsert_sleep_quality(
         quality_description: Текстовое описание качества сна.
 
     Returns:
-        bool: `True`, если запись создана или обновлена.
+        RowData | None: Запись сна со временем `HH:MM` и датой или `None`,
+        если пользователь не найден.
     """
     now = _utc_now()
     cursor.execute(
@@ -411,10 +1307,13 @@ def upsert_sleep_quality(
         'FROM users WHERE user_id=%s '
         'ON CONFLICT(user_id, date) DO UPDATE SET '
         'quality_description=EXCLUDED.quality_description, '
-        'updated_at=EXCLUDED.updated_at',
+        'updated_at=EXCLUDED.updated_at '
+        'RETURNING id, date, wakeup_time, bed_time, quality_description',
         (_parse_date(date_iso), quality_description, now, now, user_id),
     )
-    return cursor.rowcount > 0
+    row = _sleep_row_to_hhmm(_fetch_changed_row(cursor))
+    _publish_day_change(user_id, 'sleep', row)
+    return row
 
 
 @with_db
@@ -424,11 +1323,13 @@ def upsert_meal(
     date_iso: str,
     meal_type: str,
     description: str,
-) -> None:
-    """Создаёт или обновляет приём пищи.
+) -> RowData:
+    """Создаёт или обновляет приём пищи одним запросом.
 
     Для основных приёмов (`breakfast`, `lunch`, `dinner`) запись за день
-    обновляется, для `snack` всегда добавляется новая строка.
+    обновляется через конфликт частичного уникального индекса, поэтому
+    одновременные сохранения не создают дублей. `snack` под индекс не
+    попадает и всегда добавляется новой строкой.
 
     Args:
         cursor: Курсор PostgreSQL.
@@ -436,31 +1337,24 @@ def upsert_meal(
         date_iso: Дата приёма пищи в формате хранения.
         meal_type: Тип приёма пищи.
         description: Описание приёма пищи.
+
+    Returns:
+        RowData: Созданная или обновлённая запись с датой.
     """
-    date_value = _parse_date(date_iso)
     now = _utc_now()
-
-    if meal_type in ('breakfast', 'lunch', 'dinner'):
-        cursor.execute(
-            'SELECT id FROM meals '
-            'WHERE user_id=%s AND date=%s AND meal_type=%s',
-            (user_id, date_value, meal_type),
-        )
-        row = cursor.fetchone()
-        if row:
-            cursor.execute(
-                'UPDATE meals SET description=%s, updated_at=%s '
-                'WHERE id=%s AND user_id=%s',
-                (description, now, row['id'], user_id),
-            )
-            return
-
     cursor.execute(
         'INSERT INTO meals('
         'user_id, date, meal_type, description, created_at, updated_at'
-        ') VALUES (%s, %s, %s, %s, %s, %s)',
-        (user_id, date_value, meal_type, description, now, now),
+        ') VALUES (%s, %s, %s, %s, %s, %s) '
+        'ON CONFLICT(user_id, date, meal_type) '
+        "WHERE meal_type <> 'snack' DO UPDATE SET "
+        'description=EXCLUDED.description, updated_at=EXCLUDED.updated_at '
+        'RETURNING id, date, meal_type, description',
+        (user_id, _parse_date(date_iso), meal_type, description, now, now),
     )
+    row = _fetch_changed_row(cursor)
+    _publish_day_change(user_id, 'meals', row)
+    return row
 
 
 @with_db
@@ -518,7 +1412,7 @@ def update_meal(
     user_id: int,
     meal_id: int,
     description: str,
-) -> bool:
+) -> RowData | None:
     """Обновляет описание приёма пищи по идентификатору.
 
     Args:
@@ -528,14 +1422,18 @@ def update_meal(
         description: Новое текстовое описание.
 
     Returns:
-        bool: `True`, если запись обновлена.
+        RowData | None: Обновлённая запись с датой или `None`, если
+        запись не найдена.
     """
     cursor.execute(
         'UPDATE meals SET description=%s, updated_at=%s '
-        'WHERE id=%s AND user_id=%s',
+        'WHERE id=%s AND user_id=%s '
+        'RETURNING id, date, meal_type, description',
         (description, _utc_now(), meal_id, user_id),
     )
-    return cursor.rowcount > 0
+    row = _fetch_changed_row(cursor)
+    _publish_day_change(user_id, 'meals', row)
+    return row
 
 
 @with_db
@@ -543,7 +1441,7 @@ def delete_meal(
     cursor: psycopg.Cursor,
     user_id: int,
     meal_id: int,
-) -> bool:
+) -> RowData | None:
     """Удаляет запись о приёме пищи.
 
     Args:
@@ -552,9 +1450,11 @@ def delete_meal(
         meal_id: Идентификатор записи.
 
     Returns:
-        bool: `True`, если запись была удалена.
+        RowData | None: `id` и `date` удалённой записи или `None`.
     """
-    return _delete_by_id(cursor, 'meals', user_id, meal_id)
+    row = _delete_by_id(cursor, 'meals', user_id, meal_id)
+    _publish_day_change(user_id, 'meals', row, deleted=True)
+    return row
 
 
 @with_db
@@ -564,7 +1464,7 @@ def add_medicine(
     date_iso: str,
     name: str,
     dosage: str | None,
-) -> None:
+) -> RowData:
     """Добавляет запись о приёме лекарства.
 
     Args:
@@ -573,14 +1473,21 @@ def add_medicine(
         date_iso: Дата приёма в формате хранения.
         name: Название лекарства.
         dosage: Дозировка, если указана пользователем.
+
+    Returns:
+        RowData: Добавленная запись с датой.
     """
     now = _utc_now()
     cursor.execute(
         'INSERT INTO medicines('
         'user_id, date, name, dosage, created_at, updated_at'
-        ') VALUES (%s, %s, %s, %s, %s, %s)',
+        ') VALUES (%s, %s, %s, %s, %s, %s) '
+        'RETURNING id, date, name, dosage',
         (user_id, _parse_date(date_iso), name, dosage, now, now),
     )
+    row = _fetch_changed_row(cursor)
+    _publish_day_change(user_id, 'medicines', row)
+    return row
 
 
 @with_db
@@ -639,7 +1546,7 @@ def update_medicine(
     med_id: int,
     name: str,
     dosage: str | None,
-) -> bool:
+) -> RowData | None:
     """Обновляет название и дозировку лекарства.
 
     Args:
@@ -650,14 +1557,18 @@ def update_medicine(
         dosage: Новая дозировка.
 
     Returns:
-        bool: `True`, если запись обновлена.
+        RowData | None: Обновлённая запись с датой или `None`, если
+        запись не найдена.
     """
     cursor.execute(
         'UPDATE medicines SET name=%s, dosage=%s, updated_at=%s '
-        'WHERE id=%s AND user_id=%s',
+        'WHERE id=%s AND user_id=%s '
+        'RETURNING id, date, name, dosage',
         (name, dosage, _utc_now(), med_id, user_id),
     )
-    return cursor.rowcount > 0
+    row = _fetch_changed_row(cursor)
+    _publish_day_change(user_id, 'medicines', row)
+    return row
 
 
 @with_db
@@ -665,7 +1576,7 @@ def delete_medicine(
     cursor: psycopg.Cursor,
     user_id: int,
     med_id: int,
-) -> bool:
+) -> RowData | None:
     """Удаляет запись о приёме лекарства.
 
     Args:
@@ -674,9 +1585,11 @@ def delete_medicine(
         med_id: Идентификатор записи.
 
     Returns:
-        bool: `True`, если запись была удалена.
+        RowData | None: `id` и `date` удалённой записи или `None`.
     """
-    return _delete_by_id(cursor, 'medicines', user_id, med_id)
+    row = _delete_by_id(cursor, 'medicines', user_id, med_id)
+    _publish_day_change(user_id, 'medicines', row, deleted=True)
+    return row
 
 
 @with_db
@@ -685,7 +1598,7 @@ def add_stool(
     user_id: int,
     date_iso: str,
     quality: int,
-) -> None:
+) -> RowData:
     """Добавляет оценку стула по Бристольской шкале.
 
     Args:
@@ -693,14 +1606,21 @@ def add_stool(
         user_id: Идентификатор пользователя.
         date_iso: Дата записи в формате хранения.
         quality: Оценка от 0 до 7.
+
+    Returns:
+        RowData: Добавленная запись с датой.
     """
     now = _utc_now()
     cursor.execute(
         'INSERT INTO stools('
         'user_id, date, quality, created_at, updated_at'
-        ') VALUES (%s, %s, %s, %s, %s)',
+        ') VALUES (%s, %s, %s, %s, %s) '
+        'RETURNING id, date, quality',
         (user_id, _parse_date(date_iso), quality, now, now),
     )
+    row = _fetch_changed_row(cursor)
+    _publish_day_change(user_id, 'stools', row)
+    return row
 
 
 @with_db
@@ -757,7 +1677,7 @@ def update_stool(
     user_id: int,
     stool_id: int,
     quality: int,
-) -> bool:
+) -> RowData | None:
     """Обновляет оценку стула по идентификатору записи.
 
     Args:
@@ -767,14 +1687,18 @@ def update_stool(
         quality: Новая оценка от 0 до 7.
 
     Returns:
-        bool: `True`, если запись обновлена.
+        RowData | None: Обновлённая запись с датой или `None`, если
+        запись не найдена.
     """
     cursor.execute(
         'UPDATE stools SET quality=%s, updated_at=%s '
-        'WHERE id=%s AND user_id=%s',
+        'WHERE id=%s AND user_id=%s '
+        'RETURNING id, date, quality',
         (quality, _utc_now(), stool_id, user_id),
     )
-    return cursor.rowcount > 0
+    row = _fetch_changed_row(cursor)
+    _publish_day_change(user_id, 'stools', row)
+    return row
 
 
 @with_db
@@ -782,7 +1706,7 @@ def delete_stool(
     cursor: psycopg.Cursor,
     user_id: int,
     stool_id: int,
-) -> bool:
+) -> RowData | None:
     """Удаляет запись туалета по идентификатору.
 
     Args:
@@ -791,9 +1715,11 @@ def delete_stool(
         stool_id: Идентификатор записи.
 
     Returns:
-        bool: `True`, если запись была удалена.
+        RowData | None: `id` и `date` удалённой записи или `None`.
     """
-    return _delete_by_id(cursor, 'stools', user_id, stool_id)
+    row = _delete_by_id(cursor, 'stools', user_id, stool_id)
+    _publish_day_change(user_id, 'stools', row, deleted=True)
+    return row
 
 
 @with_db
@@ -802,7 +1728,7 @@ def add_feeling(
     user_id: int,
     date_iso: str,
     description: str,
-) -> None:
+) -> RowData:
     """Добавляет запись о самочувствии пользователя.
 
     Args:
@@ -810,14 +1736,21 @@ def add_feeling(
         user_id: Идентификатор пользователя.
         date_iso: Дата записи в формате хранения.
         description: Текст самочувствия.
+
+    Returns:
+        RowData: Добавленная запись с датой.
     """
     now = _utc_now()
     cursor.execute(
         'INSERT INTO feelings('
         'user_id, date, description, created_at, updated_at'
-        ') VALUES (%s, %s, %s, %s, %s)',
+        ') VALUES (%s, %s, %s, %s, %s) '
+        'RETURNING id, date, description',
         (user_id, _parse_date(date_iso), description, now, now),
     )
+    row = _fetch_changed_row(cursor)
+    _publish_day_change(user_id, 'feelings', row)
+    return row
 
 
 @with_db
@@ -850,7 +1783,13 @@ def increment_water(
         (user_id, _parse_date(date_iso), glasses_count, now, now),
     )
     row = cursor.fetchone()
-    return int(row['glasses_count']) if row else glasses_count
+    saved_count = int(row['glasses_count']) if row else glasses_count
+    _publish_day_change(
+        user_id,
+        'water',
+        {'date': date_iso, 'glasses_count': saved_count},
+    )
+    return saved_count
 
 
 @with_db
@@ -907,7 +1846,13 @@ def set_water_for_day(
         (user_id, _parse_date(date_iso), glasses_count, now, now),
     )
     row = cursor.fetchone()
-    return int(row['glasses_count']) if row else glasses_count
+    saved_count = int(row['glasses_count']) if row else glasses_count
+    _publish_day_change(
+        user_id,
+        'water',
+        {'date': date_iso, 'glasses_count': saved_count},
+    )
+    return saved_count
 
 
 @with_db
@@ -965,7 +1910,7 @@ def update_feeling(
     user_id: int,
     feeling_id: int,
     description: str,
-) -> bool:
+) -> RowData | None:
     """Обновляет описание самочувствия по идентификатору записи.
 
     Args:
@@ -975,14 +1920,18 @@ def update_feeling(
         description: Новое описание самочувствия.
 
     Returns:
-        bool: `True`, если запись обновлена.
+        RowData | None: Обновлённая запись с датой или `None`, если
+        запись не найдена.
     """
     cursor.execute(
         'UPDATE feelings SET description=%s, updated_at=%s '
-        'WHERE id=%s AND user_id=%s',
+        'WHERE id=%s AND user_id=%s '
+        'RETURNING id, date, description',
         (description, _utc_now(), feeling_id, user_id),
     )
-    return cursor.rowcount > 0
+    row = _fetch_changed_row(cursor)
+    _publish_day_change(user_id, 'feelings', row)
+    return row
 
 
 @with_db
@@ -990,7 +1939,7 @@ def delete_feeling(
     cursor: psycopg.Cursor,
     user_id: int,
     feeling_id: int,
-) -> bool:
+) -> RowData | None:
     """Удаляет запись самочувствия.
 
     Args:
@@ -999,9 +1948,92 @@ def delete_feeling(
         feeling_id: Идентификатор записи.
 
     Returns:
-        bool: `True`, если запись была удалена.
+        RowData | None: `id` и `date` удалённой записи или `None`.
     """
-    return _delete_by_id(cursor, 'feelings', user_id, feeling_id)
+    row = _delete_by_id(cursor, 'feelings', user_id, feeling_id)
+    _publish_day_change(user_id, 'feelings', row, deleted=True)
+    return row
+
+
+@with_db
+def fetch_day_snapshot(
+    cursor: psycopg.Cursor,
+    user_id: int,
+    date_iso: str,
+) -> RowData:
+    """Возвращает все данные дня пользователя одним запросом.
+
+    Разделы дня агрегируются на стороне PostgreSQL в JSON, а недостающая
+    запись сна создаётся в том же запросе из дефолтных времён пользователя.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+        user_id: Идентификатор пользователя.
+        date_iso: Дата выборки в формате хранения.
+
+    Returns:
+        RowData: Словарь с ключами `meals`, `medicines`, `stools`,
+        `feelings` (списки записей), `water` (количество стаканов) и
+        `sleep` (запись сна или `None`).
+    """
+    now = _utc_now()
+    cursor.execute(
+        'WITH ensured_sleep AS ('
+        'INSERT INTO sleeps('
+        'user_id, date, wakeup_time, bed_time, created_at, updated_at'
+        ') '
+        'SELECT user_id, %(date)s, wakeup_time, bed_time, %(now)s, %(now)s '
+        'FROM users WHERE user_id=%(user_id)s '
+        'ON CONFLICT(user_id, date) DO NOTHING '
+        'RETURNING id, wakeup_time, bed_time, quality_description'
+        ') '
+        'SELECT '
+        'COALESCE(('
+        'SELECT json_agg(json_build_object('
+        "'id', id, 'meal_type', meal_type, 'description', description"
+        ') ORDER BY created_at) '
+        'FROM meals WHERE user_id=%(user_id)s AND date=%(date)s'
+        "), '[]'::json) AS meals, "
+        'COALESCE(('
+        'SELECT json_agg(json_build_object('
+        "'id', id, 'name', name, 'dosage', dosage"
+        ') ORDER BY created_at) '
+        'FROM medicines WHERE user_id=%(user_id)s AND date=%(date)s'
+        "), '[]'::json) AS medicines, "
+        'COALESCE(('
+        'SELECT json_agg(json_build_object('
+        "'id', id, 'quality', quality"
+        ') ORDER BY created_at) '
+        'FROM stools WHERE user_id=%(user_id)s AND date=%(date)s'
+        "), '[]'::json) AS stools, "
+        'COALESCE(('
+        'SELECT json_agg(json_build_object('
+        "'id', id, 'description', description"
+        ') ORDER BY created_at) '
+        'FROM feelings WHERE user_id=%(user_id)s AND date=%(date)s'
+        "), '[]'::json) AS feelings, "
+        'COALESCE(('
+        'SELECT glasses_count FROM water '
+        'WHERE user_id=%(user_id)s AND date=%(date)s'
+        '), 0) AS water, '
+        'COALESCE('
+        '(SELECT row_to_json(ensured_sleep) FROM ensured_sleep), '
+        '(SELECT row_to_json(existing_sleep) FROM ('
+        'SELECT id, wakeup_time, bed_time, quality_description '
+        'FROM sleeps WHERE user_id=%(user_id)s AND date=%(date)s'
+        ') AS existing_sleep)'
+        ') AS sleep',
+        {'user_id': user_id, 'date': _parse_date(date_iso), 'now': now},
+    )
+    row = cursor.fetchone()
+    return {
+        'meals': row['meals'],
+        'medicines': row['medicines'],
+        'stools': row['stools'],
+        'feelings': row['feelings'],
+        'water': int(row['water']),
+        'sleep': _sleep_row_to_hhmm(row['sleep']),
+    }
 
 
 @with_db
@@ -1056,4 +2088,7 @@ def fetch_all_for_report(
     for dataset_name, (query, params) in datasets.items():
         cursor.execute(query, params)
         report_data[dataset_name] = [dict(row) for row in cursor.fetchall()]
+    report_data['sleeps'] = [
+        _sleep_row_to_hhmm(row) for row in report_data['sleeps']
+    ]
     return report_data
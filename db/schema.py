@@ -1,137 +1,669 @@
-"""Инициализация схемы PostgreSQL для всех доменных таблиц бота."""
-
-from db.connection import with_db
-
-SCHEMA_STATEMENTS: tuple[str, ...] = (
-    '''
-    CREATE TABLE IF NOT EXISTS users (
-        user_id BIGINT PRIMARY KEY,
-        breakfast_time TEXT NOT NULL DEFAULT '08:00',
-        lunch_time     TEXT NOT NULL DEFAULT '13:00',
-        dinner_time    TEXT NOT NULL DEFAULT '19:00',
-        toilet_time    TEXT NOT NULL DEFAULT '09:00',
-        wakeup_time    TEXT NOT NULL DEFAULT '07:00',
-        bed_time       TEXT NOT NULL DEFAULT '23:00',
-        created_at     TIMESTAMP NOT NULL DEFAULT NOW(),
-        updated_at     TIMESTAMP NOT NULL DEFAULT NOW()
-    )
-    ''',
-    '''
-    CREATE TABLE IF NOT EXISTS meals (
-        id BIGSERIAL PRIMARY KEY,
-        user_id BIGINT NOT NULL,
-        date DATE NOT NULL,
-        meal_type TEXT NOT NULL CHECK(
-            meal_type IN ('breakfast', 'lunch', 'dinner', 'snack')
-        ),
-        description TEXT NOT NULL,
-        created_at TIMESTAMP NOT NULL,
-        updated_at TIMESTAMP NOT NULL,
-        FOREIGN KEY(user_id) REFERENCES users(user_id) ON DELETE CASCADE
-    )
-    ''',
-    '''
-    CREATE TABLE IF NOT EXISTS medicines (
-        id BIGSERIAL PRIMARY KEY,
-        user_id BIGINT NOT NULL,
-        date DATE NOT NULL,
+"""Версионные миграции схемы PostgreSQL.
+
+Миграции лежат в пакете `db.migrations` в модулях `NNNN_описание.py`
+и применяются по возрастанию номера. Модуль миграции объявляет
+`STATEMENTS` — кортеж SQL-команд — и может выставить
+`TRANSACTIONAL = False`, если команды нельзя выполнять в транзакции
+(например, `CREATE INDEX CONCURRENTLY`). Такие команды выполняются по одной
+в режиме autocommit и должны быть идемпотентными, потому что при сбое
+миграция повторяется целиком.
+
+С `PARTITION_EVENT_TABLES` таблицы событий после миграций переводятся на
+помесячное секционирование по `date`, а секции на
+`PARTITION_MONTHS_AHEAD` месяцев вперёд создаются заранее.
+"""
+
+import importlib
+import logging
+import pkgutil
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+
+import psycopg
+
+from config import APP_TZ, PARTITION_EVENT_TABLES, PARTITION_MONTHS_AHEAD
+from db.connection import get_connection, with_db
+
+log = logging.getLogger(__name__)
+
+MIGRATIONS_PACKAGE = 'db.migrations'
+SCHEMA_MIGRATIONS_LOCK = 7300
+
+_MIGRATION_MODULE_RE = re.compile(r'^(\d{4})_(\w+)$')
+
+_CREATE_MIGRATIONS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
         name TEXT NOT NULL,
-        dosage TEXT,
-        created_at TIMESTAMP NOT NULL,
-        updated_at TIMESTAMP NOT NULL,
-        FOREIGN KEY(user_id) REFERENCES users(user_id) ON DELETE CASCADE
-    )
-    ''',
-    '''
-    CREATE TABLE IF NOT EXISTS stools (
-        id BIGSERIAL PRIMARY KEY,
-        user_id BIGINT NOT NULL,
-        date DATE NOT NULL,
-        quality INTEGER NOT NULL CHECK(quality BETWEEN 0 AND 7),
-        created_at TIMESTAMP NOT NULL,
-        updated_at TIMESTAMP NOT NULL,
-        FOREIGN KEY(user_id) REFERENCES users(user_id) ON DELETE CASCADE
-    )
-    ''',
-    '''
-    CREATE TABLE IF NOT EXISTS feelings (
-        id BIGSERIAL PRIMARY KEY,
-        user_id BIGINT NOT NULL,
-        date DATE NOT NULL,
-        description TEXT NOT NULL,
-        created_at TIMESTAMP NOT NULL,
-        updated_at TIMESTAMP NOT NULL,
-        FOREIGN KEY(user_id) REFERENCES users(user_id) ON DELETE CASCADE
-    )
-    ''',
-    '''
-    CREATE TABLE IF NOT EXISTS water (
-        id BIGSERIAL PRIMARY KEY,
-        user_id BIGINT NOT NULL,
-        date DATE NOT NULL,
-        glasses_count INTEGER NOT NULL DEFAULT 0 CHECK(glasses_count >= 0),
-        created_at TIMESTAMP NOT NULL,
-        updated_at TIMESTAMP NOT NULL,
-        UNIQUE(user_id, date),
-        FOREIGN KEY(user_id) REFERENCES users(user_id) ON DELETE CASCADE
-    )
-    ''',
-    '''
-    CREATE TABLE IF NOT EXISTS sleeps (
-        id BIGSERIAL PRIMARY KEY,
-        user_id BIGINT NOT NULL,
-        date DATE NOT NULL,
-        wakeup_time TEXT NOT NULL,
-        bed_time TEXT NOT NULL,
-        quality_description TEXT,
-        created_at TIMESTAMP NOT NULL,
-        updated_at TIMESTAMP NOT NULL,
-        UNIQUE(user_id, date),
-        FOREIGN KEY(user_id) REFERENCES users(user_id) ON DELETE CASCADE
-    )
-    ''',
-    '''
-    CREATE TABLE IF NOT EXISTS notifications_log (
-        id BIGSERIAL PRIMARY KEY,
-        user_id BIGINT NOT NULL,
-        type TEXT NOT NULL CHECK(
-            type IN (
-                'breakfast',
-                'lunch',
-                'dinner',
-                'toilet',
-                'sleep_quality'
-            )
-        ),
-        date DATE NOT NULL,
-        sent_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-        UNIQUE(user_id, type, date),
-        FOREIGN KEY(user_id) REFERENCES users(user_id) ON DELETE CASCADE
-    )
-    ''',
-    'CREATE INDEX IF NOT EXISTS idx_meals_user_date '
-    'ON meals(user_id, date)',
-    'CREATE INDEX IF NOT EXISTS idx_medicines_user_date '
-    'ON medicines(user_id, date)',
-    'CREATE INDEX IF NOT EXISTS idx_stools_user_date '
-    'ON stools(user_id, date)',
-    'CREATE INDEX IF NOT EXISTS idx_feelings_user_date '
-    'ON feelings(user_id, date)',
-    'CREATE INDEX IF NOT EXISTS idx_water_user_date '
-    'ON water(user_id, date)',
-    'CREATE INDEX IF NOT EXISTS idx_sleeps_user_date '
-    'ON sleeps(user_id, date)',
-    'CREATE INDEX IF NOT EXISTS idx_notif_user_date_type '
-    'ON notifications_log(user_id, date, type)',
+        applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    )
+'''
+
+# Таблицы событий, которые с `PARTITION_EVENT_TABLES` секционируются по
+# `date`. Индексы и внешние ключи секционированная таблица получает от
+# прежней таблицы, а первичный ключ дополняется колонкой `date`, так как
+# уникальные ключи секционированной таблицы обязаны её включать.
+PARTITIONED_TABLES: tuple[str, ...] = (
+    'meals',
+    'medicines',
+    'stools',
+    'feelings',
+    'water',
+    'sleeps',
+    'notifications_log',
 )
 
+_PARTITION_MONTH_RE = re.compile(r'^(\w+)_p(\d{4})(\d{2})$')
+
+
+@dataclass(frozen=True)
+class Migration:
+    """Одна миграция схемы.
+
+    Attributes:
+        version: Номер миграции из имени модуля.
+        name: Описание миграции из имени модуля.
+        statements: SQL-команды миграции в порядке выполнения.
+        transactional: Выполнять ли команды в одной транзакции с записью
+            в `schema_migrations`.
+    """
+
+    version: int
+    name: str
+    statements: tuple[str, ...]
+    transactional: bool
+
+
+def load_migrations() -> list[Migration]:
+    """Загружает миграции из пакета `db.migrations`.
+
+    Returns:
+        list[Migration]: Миграции по возрастанию номера.
+
+    Raises:
+        RuntimeError: Если два модуля объявляют один номер миграции.
+    """
+    package = importlib.import_module(MIGRATIONS_PACKAGE)
+    migrations: dict[int, Migration] = {}
+    for module_info in pkgutil.iter_modules(package.__path__):
+        match = _MIGRATION_MODULE_RE.match(module_info.name)
+        if match is None:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise RuntimeError(f'Повторный номер миграции: {version:04d}')
+        module = importlib.import_module(
+            f'{MIGRATIONS_PACKAGE}.{module_info.name}',
+        )
+        migrations[version] = Migration(
+            version=version,
+            name=match.group(2),
+            statements=tuple(module.STATEMENTS),
+            transactional=getattr(module, 'TRANSACTIONAL', True),
+        )
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def _applied_versions(connection: psycopg.Connection) -> set[int]:
+    """Возвращает номера применённых миграций.
+
+    Args:
+        connection: Подключение в режиме autocommit.
+
+    Returns:
+        set[int]: Номера миграций; пустое множество, если таблицы
+        `schema_migrations` ещё нет.
+    """
+    row = connection.execute(
+        "SELECT to_regclass('schema_migrations') IS NOT NULL AS present",
+    ).fetchone()
+    if not row['present']:
+        return set()
+    rows = connection.execute(
+        'SELECT version FROM schema_migrations',
+    ).fetchall()
+    return {row['version'] for row in rows}
+
+
+def _apply_migration(
+    connection: psycopg.Connection,
+    migration: Migration,
+) -> None:
+    """Выполняет миграцию и отмечает её в `schema_migrations`.
+
+    Args:
+        connection: Подключение в режиме autocommit.
+        migration: Применяемая миграция.
+    """
+    record = (
+        'INSERT INTO schema_migrations(version, name) VALUES (%s, %s) '
+        'ON CONFLICT (version) DO NOTHING'
+    )
+    if migration.transactional:
+        with connection.transaction():
+            for statement in migration.statements:
+                connection.execute(statement)
+            connection.execute(record, (migration.version, migration.name))
+    else:
+        for statement in migration.statements:
+            connection.execute(statement)
+        connection.execute(record, (migration.version, migration.name))
+    log.info(
+        'Применена миграция схемы %04d_%s',
+        migration.version,
+        migration.name,
+    )
+
+
+def _month_start(value: date, months: int = 0) -> date:
+    """Возвращает первое число месяца, сдвинутого на `months` от `value`.
+
+    Args:
+        value: Любая дата месяца.
+        months: Сдвиг в месяцах.
+
+    Returns:
+        date: Первое число месяца.
+    """
+    month_index = value.year * 12 + value.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(table_name: str, month: date) -> str:
+    """Возвращает имя помесячной секции таблицы.
+
+    Args:
+        table_name: Имя секционированной таблицы.
+        month: Первое число месяца секции.
+
+    Returns:
+        str: Имя вида `meals_p202610`.
+    """
+    return f'{table_name}_p{month:%Y%m}'
+
+
+def _partition_month(table_name: str, name: str) -> date | None:
+    """Возвращает месяц помесячной секции по её имени.
+
+    Args:
+        table_name: Имя секционированной таблицы.
+        name: Имя секции.
+
+    Returns:
+        date | None: Первое число месяца или `None`, если это не
+        помесячная секция таблицы.
+    """
+    match = _PARTITION_MONTH_RE.match(name)
+    if match is None or match.group(1) != table_name:
+        return None
+    return date(int(match.group(2)), int(match.group(3)), 1)
+
+
+def _create_month_partition(cursor, table_name: str, month: date) -> None:
+    """Создаёт помесячную секцию таблицы.
+
+    Args:
+        cursor: Курсор PostgreSQL в рамках транзакции.
+        table_name: Имя секционированной таблицы.
+        month: Первое число месяца секции.
+    """
+    cursor.execute(
+        f'CREATE TABLE {partition_name(table_name, month)} '
+        f'PARTITION OF {table_name} '
+        f"FOR VALUES FROM ('{month.isoformat()}') "
+        f"TO ('{_month_start(month, 1).isoformat()}')"
+    )
+
+
+def _extend_partitions(
+    cursor,
+    table_name: str,
+    first_month: date,
+    last_month: date,
+) -> int:
+    """Выделяет помесячные секции из секции будущих дат.
+
+    Секция `<таблица>_future` хранит даты после последнего созданного
+    месяца. На время транзакции она отсоединяется, создаются секции с
+    `first_month` по `last_month`, её строки за эти месяцы переносятся в
+    них, и она подключается обратно с новой нижней границей.
+
+    Args:
+        cursor: Курсор PostgreSQL в рамках транзакции.
+        table_name: Имя секционированной таблицы.
+        first_month: Нижняя граница секции будущих дат.
+        last_month: Последний создаваемый месяц.
+
+    Returns:
+        int: Количество созданных секций.
+    """
+    future_name = f'{table_name}_future'
+    next_month = _month_start(last_month, 1)
+    cursor.execute(f'ALTER TABLE {table_name} DETACH PARTITION {future_name}')
+    created = 0
+    month = first_month
+    while month <= last_month:
+        _create_month_partition(cursor, table_name, month)
+        created += 1
+        month = _month_start(month, 1)
+    cursor.execute(
+        f'WITH moved AS (DELETE FROM {future_name} '
+        'WHERE date < %s RETURNING *) '
+        f'INSERT INTO {table_name} SELECT * FROM moved',
+        (next_month,),
+    )
+    if cursor.rowcount:
+        log.info(
+            'Строки %s перенесены из секции будущих дат: %s',
+            table_name,
+            cursor.rowcount,
+        )
+    cursor.execute(
+        f'ALTER TABLE {table_name} ATTACH PARTITION {future_name} '
+        f"FOR VALUES FROM ('{next_month.isoformat()}') TO (MAXVALUE)"
+    )
+    return created
+
+
+def partitioned_tables(cursor) -> list[str]:
+    """Возвращает таблицы событий, уже переведённые на секционирование.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+
+    Returns:
+        list[str]: Имена таблиц из `PARTITIONED_TABLES`.
+    """
+    cursor.execute(
+        'SELECT c.relname FROM pg_partitioned_table p '
+        'JOIN pg_class c ON c.oid = p.partrelid '
+        'WHERE c.relnamespace = current_schema()::regnamespace '
+        'AND c.relname = ANY(%s)',
+        (list(PARTITIONED_TABLES),),
+    )
+    return [row['relname'] for row in cursor.fetchall()]
+
+
+def _partition_names(cursor, tables: list[str]) -> set[str]:
+    """Возвращает имена существующих секций таблиц.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+        tables: Имена секционированных таблиц.
+
+    Returns:
+        set[str]: Имена секций всех перечисленных таблиц.
+    """
+    cursor.execute(
+        'SELECT c.relname FROM pg_inherits i '
+        'JOIN pg_class c ON c.oid = i.inhrelid '
+        'JOIN pg_class p ON p.oid = i.inhparent '
+        'WHERE p.relnamespace = current_schema()::regnamespace '
+        'AND p.relname = ANY(%s)',
+        (tables,),
+    )
+    return {row['relname'] for row in cursor.fetchall()}
+
+
+def _partitions_to_create(
+    cursor,
+    tables: list[str],
+    today: date,
+) -> dict[str, date]:
+    """Находит таблицы, которым не хватает секций на месяцы вперёд.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+        tables: Имена секционированных таблиц.
+        today: Текущая дата.
+
+    Returns:
+        dict[str, date]: Первый недостающий месяц каждой такой таблицы.
+    """
+    names = _partition_names(cursor, tables)
+    last_month = _month_start(today, PARTITION_MONTHS_AHEAD)
+    missing: dict[str, date] = {}
+    for table_name in tables:
+        latest = max(
+            (
+                month
+                for name in names
+                if (month := _partition_month(table_name, name)) is not None
+            ),
+            default=None,
+        )
+        if latest is not None and latest < last_month:
+            missing[table_name] = _month_start(latest, 1)
+    return missing
+
+
+def _create_missing_partitions(cursor, today: date) -> int:
+    """Создаёт недостающие секции на месяцы вперёд.
+
+    Недостающие месяцы перепроверяются под advisory-блокировкой, поэтому
+    одновременно запущенные экземпляры не создают одну секцию дважды.
+
+    Args:
+        cursor: Курсор PostgreSQL в рамках транзакции.
+        today: Текущая дата.
+
+    Returns:
+        int: Количество созданных секций.
+    """
+    tables = partitioned_tables(cursor)
+    if not tables or not _partitions_to_create(cursor, tables, today):
+        return 0
+    cursor.execute(
+        'SELECT pg_advisory_xact_lock(%s)',
+        (SCHEMA_MIGRATIONS_LOCK,),
+    )
+    last_month = _month_start(today, PARTITION_MONTHS_AHEAD)
+    return sum(
+        _extend_partitions(cursor, table_name, first_month, last_month)
+        for table_name, first_month in _partitions_to_create(
+            cursor,
+            tables,
+            today,
+        ).items()
+    )
+
 
 @with_db
-def init_db(cursor) -> None:
-    """Создаёт таблицы и индексы приложения при первом запуске.
+def ensure_event_partitions(cursor, today: date) -> int:
+    """Заранее создаёт секции таблиц событий на ближайшие месяцы.
+
+    Для несекционированной схемы функция ограничивается одним запросом
+    к каталогу.
 
     Args:
         cursor: Курсор PostgreSQL в рамках активной транзакции.
+        today: Текущая дата.
+
+    Returns:
+        int: Количество созданных секций.
+    """
+    return _create_missing_partitions(cursor, today)
+
+
+def _expired_partitions(
+    cursor,
+    table_name: str,
+    before_date: date,
+) -> list[dict]:
+    """Возвращает помесячные секции, все даты которых раньше `before_date`.
+
+    В список попадают и таблицы секций, отсоединённые прерванным проходом,
+    но ещё не удалённые.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+        table_name: Имя секционированной таблицы.
+        before_date: Первая сохраняемая дата.
+
+    Returns:
+        list[dict]: Строки с полями `relname`, `attached` и
+        `detach_pending` по возрастанию месяца.
+    """
+    cursor.execute(
+        'SELECT c.relname, i.inhrelid IS NOT NULL AS attached, '
+        'COALESCE(i.inhdetachpending, false) AS detach_pending '
+        'FROM pg_class c '
+        'LEFT JOIN pg_inherits i ON i.inhrelid = c.oid '
+        'WHERE c.relnamespace = current_schema()::regnamespace '
+        "AND c.relkind = 'r' AND c.relname LIKE %s "
+        'ORDER BY c.relname',
+        (f'{table_name}_p%',),
+    )
+    return [
+        row
+        for row in cursor.fetchall()
+        if (month := _partition_month(table_name, row['relname'])) is not None
+        and _month_start(month, 1) <= before_date
+    ]
+
+
+def drop_partitions_before(table_name: str, before_date: date) -> list[str]:
+    """Удаляет помесячные секции, все даты которых раньше `before_date`.
+
+    Удаление секции не оставляет мёртвых строк, поэтому старые месяцы
+    уходят без долгого `DELETE` и последующей очистки. Секция сначала
+    отсоединяется через `DETACH PARTITION ... CONCURRENTLY`, которое не
+    блокирует чтение и запись таблицы, а затем удаляется уже отдельная
+    таблица. Такое отсоединение нельзя выполнять в транзакции, поэтому
+    функция работает на своём подключении в режиме autocommit. Прерванное
+    отсоединение завершается через `FINALIZE`, а отсоединённые, но не
+    удалённые секции удаляются при следующем вызове. Для
+    несекционированной таблицы функция ничего не делает.
+
+    Даты удалённых месяцев таблица больше не принимает, поэтому функция
+    подходит для таблиц, в которые пишутся только текущие даты, например
+    `notifications_log`.
+
+    Args:
+        table_name: Имя таблицы из `PARTITIONED_TABLES`.
+        before_date: Первая сохраняемая дата.
+
+    Returns:
+        list[str]: Имена удалённых секций.
+    """
+    with get_connection() as connection:
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            if table_name not in partitioned_tables(cursor):
+                return []
+            if not _expired_partitions(cursor, table_name, before_date):
+                return []
+            cursor.execute(
+                'SELECT pg_advisory_lock(%s)',
+                (SCHEMA_MIGRATIONS_LOCK,),
+            )
+            try:
+                dropped: list[str] = []
+                for row in _expired_partitions(
+                    cursor,
+                    table_name,
+                    before_date,
+                ):
+                    name = row['relname']
+                    if row['detach_pending']:
+                        cursor.execute(
+                            f'ALTER TABLE {table_name} '
+                            f'DETACH PARTITION {name} FINALIZE'
+                        )
+                    elif row['attached']:
+                        cursor.execute(
+                            f'ALTER TABLE {table_name} '
+                            f'DETACH PARTITION {name} CONCURRENTLY'
+                        )
+                    cursor.execute(f'DROP TABLE IF EXISTS {name}')
+                    dropped.append(name)
+            finally:
+                cursor.execute(
+                    'SELECT pg_advisory_unlock(%s)',
+                    (SCHEMA_MIGRATIONS_LOCK,),
+                )
+    return dropped
+
+
+def _rebind_index_ddl(ddl: str, old_table: str, table_name: str) -> str:
+    """Переносит определение индекса с прежней таблицы на новую.
+
+    Args:
+        ddl: Результат `pg_get_indexdef` для индекса прежней таблицы.
+        old_table: Имя прежней таблицы.
+        table_name: Имя новой таблицы.
+
+    Returns:
+        str: Команда `CREATE INDEX` для новой таблицы.
+    """
+    return re.sub(
+        rf' ON (?:\w+\.)?{old_table} USING ',
+        f' ON {table_name} USING ',
+        ddl,
+        count=1,
+    )
+
+
+def _inherited_ddl(cursor, old_table: str, table_name: str) -> list[str]:
+    """Возвращает индексы и внешние ключи прежней таблицы для новой.
+
+    Индексы и ограничения читаются из каталога, поэтому секционированная
+    таблица получает ровно то, что создали миграции, без второй копии
+    определений. Первичный ключ не переносится: у секционированной
+    таблицы он включает `date`.
+
+    Args:
+        cursor: Курсор PostgreSQL.
+        old_table: Имя прежней таблицы.
+        table_name: Имя секционированной таблицы.
+
+    Returns:
+        list[str]: Команды создания индексов и внешних ключей.
     """
-    for statement in SCHEMA_STATEMENTS:
+    cursor.execute(
+        'SELECT pg_get_indexdef(indexrelid) AS ddl FROM pg_index '
+        'WHERE indrelid = %s::regclass AND NOT indisprimary '
+        'ORDER BY indexrelid',
+        (old_table,),
+    )
+    statements = [
+        _rebind_index_ddl(row['ddl'], old_table, table_name)
+        for row in cursor.fetchall()
+    ]
+    cursor.execute(
+        'SELECT pg_get_constraintdef(oid) AS ddl FROM pg_constraint '
+        "WHERE conrelid = %s::regclass AND contype = 'f' "
+        'ORDER BY oid',
+        (old_table,),
+    )
+    statements.extend(
+        f'ALTER TABLE {table_name} ADD {row["ddl"]}'
+        for row in cursor.fetchall()
+    )
+    return statements
+
+
+def _partition_table(cursor, table_name: str, today: date) -> None:
+    """Переводит таблицу событий на помесячное секционирование по `date`.
+
+    Таблица переименовывается, её строки копируются в секционированную
+    таблицу той же структуры, после чего старая таблица удаляется, а её
+    индексы и внешние ключи создаются на новой. Всё время копирования
+    таблица заблокирована, поэтому перевод больших таблиц стоит запускать
+    в окно обслуживания. Даты до первого месяца попадают в секцию
+    `<таблица>_history`, даты после созданных месяцев — в
+    `<таблица>_future`. Секции `DEFAULT` нет, так как она запрещает
+    отсоединение секций без блокировки таблицы.
+
+    Args:
+        cursor: Курсор PostgreSQL в рамках транзакции.
+        table_name: Имя переводимой таблицы.
+        today: Текущая дата.
+    """
+    old_table = f'{table_name}_unpartitioned'
+    cursor.execute(f'LOCK TABLE {table_name} IN ACCESS EXCLUSIVE MODE')
+    cursor.execute(f'SELECT MIN(date) AS first_date FROM {table_name}')
+    first_date = cursor.fetchone()['first_date'] or today
+    cursor.execute(f'ALTER TABLE {table_name} RENAME TO {old_table}')
+    cursor.execute(
+        f'CREATE TABLE {table_name} '
+        f'(LIKE {old_table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+        'PARTITION BY RANGE (date)'
+    )
+    cursor.execute(
+        f'ALTER SEQUENCE {table_name}_id_seq OWNED BY {table_name}.id',
+    )
+    month = _month_start(min(first_date, today))
+    last_month = _month_start(today, PARTITION_MONTHS_AHEAD)
+    cursor.execute(
+        f'CREATE TABLE {table_name}_history PARTITION OF {table_name} '
+        f"FOR VALUES FROM (MINVALUE) TO ('{month.isoformat()}')"
+    )
+    while month <= last_month:
+        _create_month_partition(cursor, table_name, month)
+        month = _month_start(month, 1)
+    cursor.execute(
+        f'CREATE TABLE {table_name}_future PARTITION OF {table_name} '
+        f"FOR VALUES FROM ('{month.isoformat()}') TO (MAXVALUE)"
+    )
+    cursor.execute(f'INSERT INTO {table_name} SELECT * FROM {old_table}')
+    inherited = _inherited_ddl(cursor, old_table, table_name)
+    cursor.execute(f'DROP TABLE {old_table}')
+    cursor.execute(f'ALTER TABLE {table_name} ADD PRIMARY KEY (id, date)')
+    for statement in inherited:
         cursor.execute(statement)
+
+
+def _partitioning_pending(connection: psycopg.Connection) -> bool:
+    """Проверяет, остались ли таблицы событий без секционирования.
+
+    Args:
+        connection: Подключение в режиме autocommit.
+
+    Returns:
+        bool: `True`, если секционирование включено и не завершено.
+    """
+    if not PARTITION_EVENT_TABLES:
+        return False
+    with connection.cursor() as cursor:
+        return len(partitioned_tables(cursor)) < len(PARTITIONED_TABLES)
+
+
+def _partition_event_tables(connection: psycopg.Connection) -> None:
+    """Переводит на секционирование все ещё не переведённые таблицы событий.
+
+    Каждая таблица переводится в своей транзакции.
+
+    Args:
+        connection: Подключение в режиме autocommit.
+    """
+    today = datetime.now(APP_TZ).date()
+    with connection.cursor() as cursor:
+        done = set(partitioned_tables(cursor))
+        for table_name in PARTITIONED_TABLES:
+            if table_name in done:
+                continue
+            with connection.transaction():
+                _partition_table(cursor, table_name, today)
+            log.info('Таблица %s переведена на секционирование', table_name)
+        with connection.transaction():
+            _create_missing_partitions(cursor, today)
+
+
+def init_db() -> None:
+    """Применяет к базе недостающие миграции схемы.
+
+    Если все миграции уже применены, функция ограничивается двумя
+    короткими запросами и не выполняет DDL. Иначе берётся сессионная
+    advisory-блокировка, чтобы одновременно запущенные экземпляры бота
+    применяли миграции по очереди, и список применённых миграций
+    перечитывается уже под ней. Затем, если включён
+    `PARTITION_EVENT_TABLES`, таблицы событий переводятся на
+    секционирование.
+    """
+    migrations = load_migrations()
+    with get_connection() as connection:
+        connection.autocommit = True
+        applied = _applied_versions(connection)
+        if all(
+            migration.version in applied for migration in migrations
+        ) and not _partitioning_pending(connection):
+            return
+        connection.execute(
+            'SELECT pg_advisory_lock(%s)',
+            (SCHEMA_MIGRATIONS_LOCK,),
+        )
+        try:
+            connection.execute(_CREATE_MIGRATIONS_TABLE)
+            applied = _applied_versions(connection)
+            for migration in migrations:
+                if migration.version not in applied:
+                    _apply_migration(connection, migration)
+            if PARTITION_EVENT_TABLES:
+                _partition_event_tables(connection)
+        finally:
+            connection.execute(
+                'SELECT pg_advisory_unlock(%s)',
+                (SCHEMA_MIGRATIONS_LOCK,),
+            )
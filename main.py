@@ -1,9 +1,29 @@
 """Точка входа в приложение Telegram-бота."""
 
+import argparse
 import logging
 
-from bot.app import build_app, create_bot
+from bot.app import build_app, create_bot, run_reminders
 from config import LONG_POLLING_TIMEOUT, POLLING_TIMEOUT
+from db.connection import close_pool
+
+
+def _parse_args() -> argparse.Namespace:
+    """Разбирает аргументы командной строки.
+
+    Returns:
+        argparse.Namespace: Параметры запуска.
+    """
+    parser = argparse.ArgumentParser(description='Telegram-бот дневника.')
+    parser.add_argument(
+        '--reminders-only',
+        action='store_true',
+        help=(
+            'Запустить только планировщик и рассылку напоминаний без '
+            'polling, например как дополнительный процесс рассылки.'
+        ),
+    )
+    return parser.parse_args()
 
 
 def main() -> None:
@@ -11,20 +31,30 @@ def main() -> None:
 
     Функция настраивает общий формат логирования, создаёт экземпляр бота,
     подключает обработчики команд/сообщений и запускает бесконечный цикл
-    опроса Telegram API.
+    опроса Telegram API. С `--reminders-only` процесс не опрашивает
+    Telegram, а только планирует и рассылает напоминания вместе с
+    остальными процессами.
     """
+    args = _parse_args()
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s %(levelname)s %(name)s: %(message)s',
     )
     bot = create_bot()
-    build_app(bot)
-    logging.getLogger(__name__).info('Бот запущен')
-    bot.infinity_polling(
-        timeout=POLLING_TIMEOUT,
-        long_polling_timeout=LONG_POLLING_TIMEOUT,
-        logger_level=logging.INFO,
-    )
+    try:
+        if args.reminders_only:
+            logging.getLogger(__name__).info('Рассылка напоминаний запущена')
+            run_reminders(bot)
+            return
+        build_app(bot)
+        logging.getLogger(__name__).info('Бот запущен')
+        bot.infinity_polling(
+            timeout=POLLING_TIMEOUT,
+            long_polling_timeout=LONG_POLLING_TIMEOUT,
+            logger_level=logging.INFO,
+        )
+    finally:
+        close_pool()
 
 
 if __name__ == '__main__':
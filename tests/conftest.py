@@ -0,0 +1,9 @@
+"""Общие настройки тестов.
+
+`config` требует `TELEGRAM_TOKEN` при импорте, поэтому модули бота в
+тестах импортируются с фиктивным токеном.
+"""
+
+import os
+
+os.environ.setdefault('TELEGRAM_TOKEN', 'test-token')
@@ -0,0 +1,224 @@
+"""Проверка планов выборок за день по индексам `(user_id, date, created_at)`.
+
+Тесты выполняют `EXPLAIN` настоящих запросов репозитория и требуют
+отдельной тестовой базы PostgreSQL: строка подключения задаётся в
+`TEST_DATABASE_URL`, и перед проверкой к этой базе применяются миграции.
+Без `TEST_DATABASE_URL` тесты пропускаются.
+"""
+
+import os
+from collections.abc import Callable, Iterator
+from typing import Any
+
+import pytest
+
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL', '').strip()
+
+pytestmark = pytest.mark.skipif(
+    not TEST_DATABASE_URL,
+    reason='TEST_DATABASE_URL не задан',
+)
+
+if TEST_DATABASE_URL:
+    os.environ['DATABASE_URL'] = TEST_DATABASE_URL
+    psycopg = pytest.importorskip('psycopg')
+    from psycopg.rows import dict_row
+
+    from db import repositories
+    from db.schema import init_db
+
+USER_ID = 1
+DATE_ISO = '2026-01-15'
+SCAN_NODE_TYPES = ('Index Scan', 'Index Only Scan')
+
+
+class _CapturedQuery(Exception):
+    """Останавливает репозиторную функцию после первого запроса."""
+
+
+class _CapturingCursor:
+    """Курсор, который запоминает первый запрос вместо его выполнения."""
+
+    def __init__(self) -> None:
+        """Создаёт курсор без запомненного запроса."""
+        self.query: str | None = None
+        self.params: Any = None
+
+    def execute(self, query: str, params: Any = None) -> None:
+        """Запоминает запрос и прерывает вызывающую функцию.
+
+        Args:
+            query: SQL-запрос.
+            params: Параметры запроса.
+
+        Raises:
+            _CapturedQuery: Всегда.
+        """
+        self.query = query
+        self.params = params
+        raise _CapturedQuery
+
+
+def _capture(
+    function: Callable[..., Any],
+    *args: Any,
+) -> tuple[str, Any]:
+    """Возвращает SQL и параметры, которые выполнила бы функция репозитория.
+
+    Args:
+        function: Функция с декоратором `with_db`.
+        *args: Аргументы функции без курсора.
+
+    Returns:
+        tuple[str, Any]: Запрос и его параметры.
+    """
+    cursor = _CapturingCursor()
+    with pytest.raises(_CapturedQuery):
+        function.__wrapped__(cursor, *args)
+    return cursor.query, cursor.params
+
+
+def _plan_nodes(plan: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """Обходит все узлы плана `EXPLAIN (FORMAT JSON)`.
+
+    Args:
+        plan: Корневой узел плана.
+
+    Yields:
+        dict[str, Any]: Узлы плана в порядке обхода в глубину.
+    """
+    yield plan
+    for child in plan.get('Plans', ()):
+        yield from _plan_nodes(child)
+
+
+@pytest.fixture(scope='module')
+def connection() -> Iterator['psycopg.Connection']:
+    """Подключение к тестовой базе с применёнными миграциями.
+
+    Yields:
+        psycopg.Connection: Подключение, все изменения которого
+        откатываются.
+    """
+    init_db()
+    with psycopg.connect(TEST_DATABASE_URL, row_factory=dict_row) as conn:
+        yield conn
+        conn.rollback()
+
+
+def _explain(
+    connection: 'psycopg.Connection',
+    query: str,
+    params: Any,
+) -> dict[str, Any]:
+    """Возвращает план запроса без его выполнения.
+
+    Последовательное и bitmap-сканирование отключаются, чтобы на пустых
+    таблицах планировщик выбирал между индексами, а не между индексом и
+    чтением таблицы.
+
+    Args:
+        connection: Подключение к тестовой базе.
+        query: SQL-запрос.
+        params: Параметры запроса.
+
+    Returns:
+        dict[str, Any]: Корневой узел плана.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        cursor.execute('SET LOCAL enable_bitmapscan = off')
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {query}', params)
+        plan = cursor.fetchone()['QUERY PLAN'][0]['Plan']
+    connection.rollback()
+    return plan
+
+
+def _index_names(
+    connection: 'psycopg.Connection',
+    index_name: str,
+) -> set[str]:
+    """Возвращает имя индекса и имена его индексов на секциях.
+
+    Args:
+        connection: Подключение к тестовой базе.
+        index_name: Имя индекса на таблице.
+
+    Returns:
+        set[str]: Имена, под которыми индекс может встретиться в плане.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT relid::text AS name FROM pg_partition_tree(%s::regclass)',
+            (index_name,),
+        )
+        names = {row['name'] for row in cursor.fetchall()}
+    connection.rollback()
+    return names | {index_name}
+
+
+def _index_scans(
+    plan: dict[str, Any],
+    index_names: set[str],
+) -> list[dict[str, Any]]:
+    """Возвращает узлы индексного сканирования по заданному индексу.
+
+    Args:
+        plan: Корневой узел плана.
+        index_names: Допустимые имена индекса.
+
+    Returns:
+        list[dict[str, Any]]: Подходящие узлы плана.
+    """
+    return [
+        node
+        for node in _plan_nodes(plan)
+        if node['Node Type'] in SCAN_NODE_TYPES
+        and node.get('Index Name') in index_names
+    ]
+
+
+@pytest.mark.parametrize(
+    ('function_name', 'index_name'),
+    [
+        ('list_meals_for_day', 'idx_meals_user_date_created'),
+        ('list_medicines_for_day', 'idx_medicines_user_date_created'),
+        ('list_stools_for_day', 'idx_stools_user_date_created'),
+        ('list_feelings_for_day', 'idx_feelings_user_date_created'),
+    ],
+)
+def test_day_listing_reads_index_in_order(
+    connection: 'psycopg.Connection',
+    function_name: str,
+    index_name: str,
+) -> None:
+    """Список за день читается по индексу и не сортируется отдельно."""
+    query, params = _capture(
+        getattr(repositories, function_name),
+        USER_ID,
+        DATE_ISO,
+    )
+    plan = _explain(connection, query, params)
+    assert _index_scans(plan, _index_names(connection, index_name)), plan
+    assert not any(
+        node['Node Type'] in ('Sort', 'Incremental Sort')
+        for node in _plan_nodes(plan)
+    ), plan
+
+
+def test_day_snapshot_reads_listing_indexes(
+    connection: 'psycopg.Connection',
+) -> None:
+    """Снимок дня читает каждый раздел по своему индексу."""
+    query, params = _capture(
+        repositories.fetch_day_snapshot,
+        USER_ID,
+        DATE_ISO,
+    )
+    plan = _explain(connection, query, params)
+    for table_name in ('meals', 'medicines', 'stools', 'feelings'):
+        index_name = f'idx_{table_name}_user_date_created'
+        assert _index_scans(
+            plan,
+            _index_names(connection, index_name),
+        ), (index_name, plan)
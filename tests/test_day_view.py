@@ -0,0 +1,179 @@
+"""Тесты вида дня и кэша его отрисовки."""
+
+import sys
+from typing import Any
+
+import pytest
+
+pytest.importorskip('psycopg')
+
+from bot import day_view as day_view_module  # noqa: E402
+from bot.day_view import DayRenderCache, DayViewStore  # noqa: E402
+from db import repositories  # noqa: E402
+
+USER_ID = 1
+DATE_ISO = '2026-01-15'
+OTHER_DATE_ISO = '2026-01-16'
+TEXT = 'Статистика за день'
+
+
+def _snapshot() -> dict[str, Any]:
+    """Возвращает пустой снимок дня.
+
+    Returns:
+        dict[str, Any]: Снимок в формате `fetch_day_snapshot`.
+    """
+    return {
+        'meals': [],
+        'medicines': [],
+        'stools': [],
+        'feelings': [],
+        'water': 0,
+        'sleep': None,
+    }
+
+
+@pytest.fixture
+def empty_days(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Заменяет загрузку дня из БД пустым снимком."""
+    monkeypatch.setattr(
+        day_view_module,
+        'fetch_day_snapshot',
+        lambda user_id, date_iso: _snapshot(),
+    )
+
+
+@pytest.fixture
+def store(
+    monkeypatch: pytest.MonkeyPatch,
+    empty_days: None,
+) -> DayViewStore:
+    """Создаёт вид дня, подписанный на изменения репозитория.
+
+    Returns:
+        DayViewStore: Хранилище с загрузкой пустых снимков.
+    """
+    monkeypatch.setattr(repositories, '_day_change_listeners', [])
+    day_views = DayViewStore(max_days=10)
+    repositories.add_day_change_listener(day_views.apply_change)
+    return day_views
+
+
+def test_repository_write_changes_day_version(store: DayViewStore) -> None:
+    """Запись вне обработчиков меняет версию и содержимое дня."""
+    _, version = store.get(USER_ID, DATE_ISO)
+    repositories._publish_day_change(
+        USER_ID,
+        'stools',
+        {'id': 7, 'date': DATE_ISO, 'quality': 4},
+    )
+    snapshot, new_version = store.get(USER_ID, DATE_ISO)
+    assert new_version != version
+    assert snapshot['stools'] == [{'id': 7, 'quality': 4}]
+
+
+def test_deleted_row_is_removed_from_day(store: DayViewStore) -> None:
+    """Удалённая запись исчезает из закэшированного дня."""
+    store.get(USER_ID, DATE_ISO)
+    row = {'id': 7, 'date': DATE_ISO, 'quality': 4}
+    repositories._publish_day_change(USER_ID, 'stools', row)
+    repositories._publish_day_change(USER_ID, 'stools', row, deleted=True)
+    snapshot, _ = store.get(USER_ID, DATE_ISO)
+    assert snapshot['stools'] == []
+
+
+def test_water_and_sleep_replace_day_values(store: DayViewStore) -> None:
+    """Вода и сон заменяют значения дня целиком."""
+    store.get(USER_ID, DATE_ISO)
+    repositories._publish_day_change(
+        USER_ID,
+        'water',
+        {'date': DATE_ISO, 'glasses_count': 3},
+    )
+    repositories._publish_day_change(
+        USER_ID,
+        'sleep',
+        {'id': 2, 'date': DATE_ISO, 'wakeup_time': '07:30'},
+    )
+    snapshot, _ = store.get(USER_ID, DATE_ISO)
+    assert snapshot['water'] == 3
+    assert snapshot['sleep'] == {'id': 2, 'wakeup_time': '07:30'}
+
+
+@pytest.mark.usefixtures('empty_days')
+def test_day_store_evicts_least_recently_used_day() -> None:
+    """При переполнении вытесняется давно не запрошенный день."""
+    small_store = DayViewStore(max_days=2)
+    small_store.get(USER_ID, DATE_ISO)
+    small_store.get(USER_ID, OTHER_DATE_ISO)
+    small_store.get(USER_ID, DATE_ISO)
+    small_store.get(USER_ID, '2026-01-17')
+    assert set(small_store._days) == {
+        (USER_ID, DATE_ISO),
+        (USER_ID, '2026-01-17'),
+    }
+
+
+@pytest.mark.usefixtures('empty_days')
+def test_disabled_day_store_returns_no_version() -> None:
+    """Без кэша снимок отдаётся без версии и не сохраняется."""
+    disabled_store = DayViewStore(max_days=0)
+    _, version = disabled_store.get(USER_ID, DATE_ISO)
+    assert version is None
+    assert not disabled_store._days
+
+
+def test_render_cache_hits_only_same_version() -> None:
+    """Текст отдаётся только для той же версии и признака «сегодня»."""
+    cache = DayRenderCache(max_bytes=1024 * 1024)
+    key = (USER_ID, DATE_ISO)
+    cache.put(key, 1, True, TEXT)
+    assert cache.get(key, 1, True) == TEXT
+    assert cache.get(key, 2, True) is None
+    assert cache.get(key, 1, False) is None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (1, 2)
+
+
+def test_render_cache_skips_unversioned_text() -> None:
+    """Текст дня без версии не кэшируется."""
+    cache = DayRenderCache(max_bytes=1024 * 1024)
+    key = (USER_ID, DATE_ISO)
+    cache.put(key, None, True, TEXT)
+    assert cache.get(key, None, True) is None
+    assert cache.stats().entries == 0
+
+
+def test_render_cache_evicts_least_recently_used_text() -> None:
+    """При превышении лимита вытесняется давно не использованный текст."""
+    cache = DayRenderCache(max_bytes=2 * sys.getsizeof(TEXT))
+    first_key = (USER_ID, DATE_ISO)
+    second_key = (USER_ID, OTHER_DATE_ISO)
+    third_key = (USER_ID, '2026-01-17')
+    cache.put(first_key, 1, False, TEXT)
+    cache.put(second_key, 2, False, TEXT)
+    assert cache.get(first_key, 1, False) == TEXT
+    cache.put(third_key, 3, False, TEXT)
+    assert cache.get(second_key, 2, False) is None
+    assert cache.get(first_key, 1, False) == TEXT
+    stats = cache.stats()
+    assert stats.evictions == 1
+    assert stats.size_bytes == 2 * sys.getsizeof(TEXT)
+
+
+def test_render_cache_replaces_text_of_same_day() -> None:
+    """Новая версия дня заменяет старый текст, а не добавляется."""
+    cache = DayRenderCache(max_bytes=1024 * 1024)
+    key = (USER_ID, DATE_ISO)
+    cache.put(key, 1, True, TEXT)
+    cache.put(key, 2, True, TEXT)
+    stats = cache.stats()
+    assert stats.entries == 1
+    assert stats.size_bytes == sys.getsizeof(TEXT)
+
+
+def test_render_cache_skips_text_over_limit() -> None:
+    """Текст больше всего лимита не сохраняется."""
+    cache = DayRenderCache(max_bytes=sys.getsizeof(TEXT) - 1)
+    cache.put((USER_ID, DATE_ISO), 1, True, TEXT)
+    assert cache.stats().entries == 0
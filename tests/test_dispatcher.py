@@ -0,0 +1,262 @@
+"""Тесты диспетчера напоминаний и его запросов к outbox."""
+
+from typing import Any
+
+import pytest
+
+pytest.importorskip('psycopg')
+pytest.importorskip('telebot')
+
+from bot import dispatcher as dispatcher_module  # noqa: E402
+from bot.dispatcher import (CHAT_LIMITER_PRUNE_THRESHOLD,  # noqa: E402
+                            MIN_IDLE_WAIT_SECONDS, ChatRateLimiter,
+                            ReminderDispatcher, TokenBucket)
+from db.repositories import (dead_letter_outbox_row,  # noqa: E402
+                             deactivate_user, get_next_outbox_delay,
+                             retry_outbox_row)
+
+POLL_SECONDS = 5
+
+
+class _RowCursor:
+    """Курсор, запоминающий запросы и возвращающий заданную строку."""
+
+    def __init__(self, row: dict[str, Any] | None = None) -> None:
+        """Создаёт курсор с одной строкой результата.
+
+        Args:
+            row: Строка, которую вернёт `fetchone`.
+        """
+        self._row = row
+        self.queries: list[str] = []
+
+    def execute(self, query: str, params: Any = None) -> None:
+        """Запоминает запрос, ничего не выполняя.
+
+        Args:
+            query: SQL-запрос.
+            params: Параметры запроса.
+        """
+        self.queries.append(query)
+
+    def fetchone(self) -> dict[str, Any] | None:
+        """Возвращает заданную строку.
+
+        Returns:
+            dict[str, Any] | None: Строка результата.
+        """
+        return self._row
+
+
+class _RecordingEvent:
+    """Событие, запоминающее длительность ожидания вместо сна."""
+
+    def __init__(self) -> None:
+        """Создаёт событие без ожиданий."""
+        self.waits: list[float] = []
+
+    def wait(self, timeout: float) -> bool:
+        """Запоминает длительность ожидания.
+
+        Args:
+            timeout: Длительность ожидания в секундах.
+
+        Returns:
+            bool: Всегда `False`, как при истечении таймаута.
+        """
+        self.waits.append(timeout)
+        return False
+
+    def clear(self) -> None:
+        """Ничего не делает: событие никогда не взводится."""
+
+
+class _FakeClock:
+    """Монотонные часы, которые сдвигаются только при `sleep`."""
+
+    def __init__(self) -> None:
+        """Создаёт часы на нулевом моменте без пауз."""
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        """Возвращает текущее время часов.
+
+        Returns:
+            float: Секунды с начала теста.
+        """
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        """Запоминает паузу и сдвигает часы.
+
+        Args:
+            seconds: Длительность паузы в секундах.
+        """
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> _FakeClock:
+    """Подменяет часы модуля диспетчера.
+
+    Returns:
+        _FakeClock: Часы, которые видят ограничители скорости.
+    """
+    fake_clock = _FakeClock()
+    monkeypatch.setattr(dispatcher_module, 'time', fake_clock)
+    return fake_clock
+
+
+def _make_dispatcher() -> ReminderDispatcher:
+    """Создаёт диспетчер с записывающим событием пробуждения.
+
+    Returns:
+        ReminderDispatcher: Диспетчер без запущенных потоков.
+    """
+    dispatcher = ReminderDispatcher(
+        senders={},
+        workers=1,
+        global_rate=30,
+        chat_rate=1,
+        max_retries=3,
+        batch_size=10,
+        lease_seconds=60,
+        poll_seconds=POLL_SECONDS,
+        retry_base_seconds=5,
+    )
+    dispatcher._wake_event = _RecordingEvent()
+    return dispatcher
+
+
+def test_next_outbox_delay_is_none_for_empty_outbox() -> None:
+    """Без ожидающих строк пауза не определена."""
+    cursor = _RowCursor({'delay': None})
+    assert get_next_outbox_delay.__wrapped__(cursor) is None
+
+
+def test_next_outbox_delay_clamps_overdue_rows_to_zero() -> None:
+    """Просроченная строка доступна сразу."""
+    cursor = _RowCursor({'delay': -12.5})
+    assert get_next_outbox_delay.__wrapped__(cursor) == 0.0
+
+
+def test_next_outbox_delay_keeps_future_delay() -> None:
+    """Отложенная строка станет доступна через свою паузу."""
+    cursor = _RowCursor({'delay': 2.5})
+    assert get_next_outbox_delay.__wrapped__(cursor) == 2.5
+
+
+def test_empty_outbox_waits_poll_seconds(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """На пустом outbox поток ждёт полный период опроса."""
+    monkeypatch.setattr(
+        dispatcher_module,
+        'get_next_outbox_delay',
+        lambda: None,
+    )
+    dispatcher = _make_dispatcher()
+    dispatcher._wait_for_rows()
+    assert dispatcher._wake_event.waits == [POLL_SECONDS]
+
+
+def test_rows_locked_by_other_workers_do_not_spin(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Нулевая пауза после пустой аренды заменяется минимальной."""
+    monkeypatch.setattr(
+        dispatcher_module,
+        'get_next_outbox_delay',
+        lambda: 0.0,
+    )
+    dispatcher = _make_dispatcher()
+    dispatcher._wait_for_rows()
+    assert dispatcher._wake_event.waits == [MIN_IDLE_WAIT_SECONDS]
+
+
+def test_wait_shrinks_to_next_deferred_row(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Ожидание сокращается до ближайшей отложенной строки."""
+    monkeypatch.setattr(
+        dispatcher_module,
+        'get_next_outbox_delay',
+        lambda: 1.5,
+    )
+    dispatcher = _make_dispatcher()
+    dispatcher._wait_for_rows()
+    assert dispatcher._wake_event.waits == [1.5]
+
+
+def test_deactivation_is_not_counted_as_delivery_failure() -> None:
+    """Отключение пользователя растит только счётчик отключений."""
+    cursor = _RowCursor({'deactivated': 1, 'dead_lettered': 2})
+    deactivate_user.__wrapped__(cursor, 1, 'Forbidden')
+    assert 'deactivations = deactivations + 1' in cursor.queries[0]
+    assert 'delivery_failures' not in cursor.queries[0]
+
+
+def test_send_failures_are_counted_as_delivery_failures() -> None:
+    """Повтор после ошибки и dead letter растят счётчик ошибок."""
+    cursor = _RowCursor()
+    retry_outbox_row.__wrapped__(cursor, 1, 30, 'timeout')
+    dead_letter_outbox_row.__wrapped__(cursor, 1, 'timeout')
+    for query in cursor.queries:
+        assert 'delivery_failures = delivery_failures + 1' in query
+
+
+def test_token_bucket_spends_burst_then_waits(clock: _FakeClock) -> None:
+    """Полный запас тратится сразу, затем токены ждут пополнения."""
+    bucket = TokenBucket(rate=2)
+    bucket.acquire()
+    bucket.acquire()
+    assert clock.sleeps == []
+    bucket.acquire()
+    assert clock.sleeps == [0.5]
+
+
+def test_token_bucket_pause_blocks_until_retry_after(
+    clock: _FakeClock,
+) -> None:
+    """После ответа 429 токены не выдаются до конца паузы."""
+    bucket = TokenBucket(rate=30)
+    bucket.pause(3)
+    bucket.acquire()
+    assert clock.sleeps == [3]
+
+
+def test_token_bucket_refill_is_capped(clock: _FakeClock) -> None:
+    """Простой не накапливает запас сверх ёмкости."""
+    bucket = TokenBucket(rate=1, capacity=2)
+    clock.now = 100.0
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.sleeps == [1.0]
+
+
+def test_chat_limiter_spaces_messages_to_one_chat(clock: _FakeClock) -> None:
+    """Второе сообщение в тот же чат ждёт интервал."""
+    limiter = ChatRateLimiter(rate=1)
+    limiter.acquire(1)
+    limiter.acquire(1)
+    assert clock.sleeps == [1.0]
+
+
+def test_chat_limiter_does_not_delay_other_chats(clock: _FakeClock) -> None:
+    """Лимит одного чата не задерживает другие чаты."""
+    limiter = ChatRateLimiter(rate=1)
+    limiter.acquire(1)
+    limiter.acquire(2)
+    assert clock.sleeps == []
+
+
+def test_chat_limiter_prunes_expired_chats(clock: _FakeClock) -> None:
+    """Истёкшие записи чатов удаляются при росте словаря."""
+    limiter = ChatRateLimiter(rate=1)
+    for chat_id in range(CHAT_LIMITER_PRUNE_THRESHOLD + 1):
+        limiter.acquire(chat_id)
+    clock.now = 10.0
+    limiter.acquire(-1)
+    assert list(limiter._next_allowed_at) == [-1]
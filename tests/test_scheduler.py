@@ -0,0 +1,148 @@
+"""Тесты чистой логики планировщика напоминаний."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip('psycopg')
+pytest.importorskip('telebot')
+
+import pytz  # noqa: E402
+
+from bot.scheduler import (DueWindow, ReminderScheduler,  # noqa: E402
+                           _due_windows, _fair_share)
+from config import SCHEDULER_CATCHUP_MINUTES  # noqa: E402
+
+
+def _utc(
+    hour: int,
+    minute: int,
+    second: float = 0.0,
+    day: int = 15,
+) -> datetime:
+    """Возвращает момент января 2026 года в UTC.
+
+    Args:
+        hour: Час.
+        minute: Минута.
+        second: Секунды с дробной частью.
+        day: День месяца.
+
+    Returns:
+        datetime: Момент в UTC.
+    """
+    return datetime(2026, 1, day, hour, minute, tzinfo=timezone.utc) + (
+        timedelta(seconds=second)
+    )
+
+
+def _spans(windows: list[DueWindow]) -> list[tuple[str, int, int]]:
+    """Возвращает дату и границы минут каждого отрезка.
+
+    Args:
+        windows: Отрезки `_due_windows`.
+
+    Returns:
+        list[tuple[str, int, int]]: Дата, первая и последняя минута.
+    """
+    return [
+        (window.date_iso, window.first_minute, window.last_minute)
+        for window in windows
+    ]
+
+
+def test_idle_wait_is_not_reported_as_lag() -> None:
+    """Сон до следующего события не считается отставанием."""
+    scheduler = ReminderScheduler(dispatcher=None)
+    scheduler._tick(_utc(8, 0))
+    scheduler._wake_at_utc = _utc(8, 10, 0.05)
+    scheduler._tick(_utc(8, 10, 0.3))
+    assert scheduler.last_lag_seconds == pytest.approx(0.25)
+    assert scheduler.max_lag_seconds == pytest.approx(0.25)
+
+
+def test_late_wake_up_is_reported_as_lag() -> None:
+    """Шаг после срока пробуждения фиксирует задержку."""
+    scheduler = ReminderScheduler(dispatcher=None)
+    scheduler._wake_at_utc = _utc(8, 10)
+    scheduler._tick(_utc(8, 10, 7))
+    assert scheduler.last_lag_seconds == pytest.approx(7)
+
+
+def test_early_wake_up_is_not_negative_lag() -> None:
+    """Пробуждение раньше срока не даёт отрицательной задержки."""
+    scheduler = ReminderScheduler(dispatcher=None)
+    scheduler._wake_at_utc = _utc(8, 10)
+    scheduler._tick(_utc(8, 9, 59))
+    assert scheduler.last_lag_seconds == 0.0
+
+
+def test_step_without_planned_wake_up_records_no_lag() -> None:
+    """Шаг без выбранного срока пробуждения задержку не меняет."""
+    scheduler = ReminderScheduler(dispatcher=None)
+    scheduler._tick(_utc(8, 0))
+    scheduler._tick(_utc(8, 10))
+    assert scheduler.last_lag_seconds == 0.0
+
+
+def test_due_windows_merge_consecutive_minutes() -> None:
+    """Подряд идущие минуты одной даты сливаются в один отрезок."""
+    windows = _due_windows(_utc(8, 0), _utc(8, 5), pytz.utc)
+    assert _spans(windows) == [('2026-01-15', 481, 485)]
+    assert windows[0].end_utc == _utc(8, 5)
+
+
+def test_due_windows_split_at_local_midnight() -> None:
+    """Отрезок режется на границе местной даты."""
+    windows = _due_windows(_utc(23, 58), _utc(0, 1, day=16), pytz.utc)
+    assert _spans(windows) == [
+        ('2026-01-15', 1439, 1439),
+        ('2026-01-16', 0, 1),
+    ]
+
+
+def test_due_windows_split_where_wakeup_wraps() -> None:
+    """Отрезок режется, где время подъёма переходит через полночь."""
+    windows = _due_windows(_utc(0, 28), _utc(0, 31), pytz.utc)
+    assert _spans(windows) == [
+        ('2026-01-15', 29, 29),
+        ('2026-01-15', 30, 31),
+    ]
+    assert windows[0].last_wakeup_minute == 1439
+    assert windows[1].first_wakeup_minute == 0
+
+
+def test_due_windows_use_local_time() -> None:
+    """Минуты и дата отрезка считаются в часовом поясе."""
+    windows = _due_windows(
+        _utc(20, 0),
+        _utc(20, 1),
+        pytz.timezone('Asia/Omsk'),
+    )
+    assert _spans(windows) == [('2026-01-16', 121, 121)]
+
+
+def test_due_windows_are_limited_by_catchup() -> None:
+    """После долгого простоя догоняются только последние минуты."""
+    windows = _due_windows(_utc(1, 0), _utc(12, 0), pytz.utc)
+    assert sum(
+        window.last_minute - window.first_minute + 1 for window in windows
+    ) == SCHEDULER_CATCHUP_MINUTES
+    assert windows[-1].last_minute == 720
+
+
+def test_due_windows_are_empty_when_nothing_is_new() -> None:
+    """Уже обработанная минута не даёт отрезков."""
+    assert _due_windows(_utc(8, 0), _utc(8, 0), pytz.utc) == []
+
+
+def test_fair_share_splits_shards_evenly() -> None:
+    """Остаток шардов достаётся первым участникам."""
+    members = [3, 7, 9]
+    shares = [_fair_share(10, members, member) for member in members]
+    assert shares == [4, 3, 3]
+
+
+def test_fair_share_of_unregistered_member_is_all_shards() -> None:
+    """Участник вне списка, например до регистрации, берёт все шарды."""
+    assert _fair_share(10, [3, 7], 5) == 10
@@ -0,0 +1,59 @@
+"""Тесты вспомогательных функций секционирования таблиц событий."""
+
+from datetime import date
+
+import pytest
+
+pytest.importorskip('psycopg')
+
+from db.schema import (_partition_month, _rebind_index_ddl,  # noqa: E402
+                       partition_name)
+
+
+def test_partition_month_round_trips_partition_name() -> None:
+    """Месяц секции восстанавливается из её имени."""
+    name = partition_name('notifications_log', date(2026, 3, 1))
+    assert name == 'notifications_log_p202603'
+    assert _partition_month('notifications_log', name) == date(2026, 3, 1)
+
+
+@pytest.mark.parametrize(
+    'name',
+    [
+        'notifications_log_history',
+        'notifications_log_future',
+        'meals_p202603',
+        'notifications_log_p2026',
+    ],
+)
+def test_partition_month_ignores_other_relations(name: str) -> None:
+    """Служебные секции и секции других таблиц не считаются месяцами."""
+    assert _partition_month('notifications_log', name) is None
+
+
+def test_rebind_index_ddl_moves_index_to_new_table() -> None:
+    """Индекс прежней таблицы создаётся на секционированной."""
+    ddl = (
+        'CREATE INDEX idx_meals_user_date_created '
+        'ON public.meals_unpartitioned USING btree '
+        '(user_id, date, created_at) INCLUDE (id, meal_type)'
+    )
+    assert _rebind_index_ddl(ddl, 'meals_unpartitioned', 'meals') == (
+        'CREATE INDEX idx_meals_user_date_created '
+        'ON meals USING btree '
+        '(user_id, date, created_at) INCLUDE (id, meal_type)'
+    )
+
+
+def test_rebind_index_ddl_keeps_partial_unique_index() -> None:
+    """Условие и уникальность частичного индекса сохраняются."""
+    ddl = (
+        'CREATE UNIQUE INDEX idx_meals_user_date_main_type '
+        'ON meals_unpartitioned USING btree (user_id, date, meal_type) '
+        "WHERE (meal_type <> 'snack'::text)"
+    )
+    assert _rebind_index_ddl(ddl, 'meals_unpartitioned', 'meals') == (
+        'CREATE UNIQUE INDEX idx_meals_user_date_main_type '
+        'ON meals USING btree (user_id, date, meal_type) '
+        "WHERE (meal_type <> 'snack'::text)"
+    )
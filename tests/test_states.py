@@ -0,0 +1,101 @@
+"""Тесты хранилища состояний с вопросами, сохранёнными в БД."""
+
+from typing import Any
+
+import pytest
+
+pytest.importorskip('psycopg')
+
+from bot import states as states_module  # noqa: E402
+from bot.states import StateStore, UserState  # noqa: E402
+
+USER_ID = 1
+
+
+@pytest.fixture
+def questions(monkeypatch: pytest.MonkeyPatch) -> dict[int, dict[str, Any]]:
+    """Заменяет таблицу `pending_questions` словарём.
+
+    Returns:
+        dict[int, dict[str, Any]]: Сохранённые вопросы по `user_id`.
+    """
+    saved: dict[int, dict[str, Any]] = {}
+
+    def set_question(user_id: int, step: str, data: dict[str, Any]) -> None:
+        saved[user_id] = {'step': step, 'data': data}
+
+    monkeypatch.setattr(
+        states_module,
+        'get_pending_question',
+        saved.get,
+    )
+    monkeypatch.setattr(
+        states_module,
+        'set_pending_question',
+        set_question,
+    )
+    monkeypatch.setattr(
+        states_module,
+        'clear_pending_question',
+        lambda user_id: saved.pop(user_id, None),
+    )
+    return saved
+
+
+def test_pending_question_is_stored_in_db(
+    questions: dict[int, dict[str, Any]],
+) -> None:
+    """Вопрос напоминания сохраняется в БД, а не в памяти процесса."""
+    StateStore().set(
+        USER_ID,
+        UserState('pending_question', 'stool', {'date': '2026-01-15'}),
+    )
+    assert questions[USER_ID] == {
+        'step': 'stool',
+        'data': {'date': '2026-01-15'},
+    }
+
+
+def test_question_asked_by_other_process_is_answerable(
+    questions: dict[int, dict[str, Any]],
+) -> None:
+    """Вопрос, заданный другим процессом, виден хранилищу."""
+    store = StateStore()
+    StateStore().set(
+        USER_ID,
+        UserState('pending_question', 'sleep_quality', {'date': '2026-01-15'}),
+    )
+    assert store.get(USER_ID) == UserState(
+        'pending_question',
+        'sleep_quality',
+        {'date': '2026-01-15'},
+    )
+
+
+def test_question_replaces_older_scenario_state(
+    questions: dict[int, dict[str, Any]],
+) -> None:
+    """Вопрос, заданный после начала сценария, заменяет его."""
+    store = StateStore()
+    store.set(USER_ID, UserState('manual', 'feeling_desc'))
+    StateStore().set(
+        USER_ID,
+        UserState('pending_question', 'stool', {'date': '2026-01-15'}),
+    )
+    assert store.get(USER_ID).kind == 'pending_question'
+    store.clear(USER_ID)
+    assert store.get(USER_ID) is None
+
+
+def test_scenario_state_removes_question(
+    questions: dict[int, dict[str, Any]],
+) -> None:
+    """Новый сценарий ввода отменяет ожидающий вопрос."""
+    store = StateStore()
+    store.set(
+        USER_ID,
+        UserState('pending_question', 'stool', {'date': '2026-01-15'}),
+    )
+    store.set(USER_ID, UserState('manual', 'feeling_desc'))
+    assert USER_ID not in questions
+    assert store.get(USER_ID) == UserState('manual', 'feeling_desc')
@@ -0,0 +1,55 @@
+"""Тесты суточного колеса времени."""
+
+from bot.timing_wheel import MINUTES_PER_DAY, TimingWheel
+
+USER_ID = 1
+OTHER_USER_ID = 2
+
+
+def test_events_are_placed_in_their_minutes() -> None:
+    """События пользователя попадают в слоты своих минут."""
+    wheel = TimingWheel()
+    wheel.set_user(USER_ID, {'breakfast': 480, 'lunch': 780})
+    assert len(wheel) == 2
+    assert wheel.has_events_between(480, 480)
+    assert wheel.has_events_between(700, 800)
+    assert not wheel.has_events_between(481, 779)
+
+
+def test_new_schedule_replaces_old_events() -> None:
+    """Новое расписание убирает события старого."""
+    wheel = TimingWheel()
+    wheel.set_user(USER_ID, {'breakfast': 480})
+    wheel.set_user(USER_ID, {'breakfast': 540})
+    assert len(wheel) == 1
+    assert not wheel.has_events_between(480, 480)
+    assert wheel.has_events_between(540, 540)
+
+
+def test_removing_user_keeps_other_users() -> None:
+    """Удаление пользователя не трогает события в тех же слотах."""
+    wheel = TimingWheel()
+    wheel.set_user(USER_ID, {'breakfast': 480})
+    wheel.set_user(OTHER_USER_ID, {'breakfast': 480})
+    wheel.remove_user(USER_ID)
+    wheel.remove_user(USER_ID)
+    assert len(wheel) == 1
+    assert wheel.has_events_between(480, 480)
+
+
+def test_next_event_wraps_past_midnight() -> None:
+    """Ближайшее событие ищется с переходом через полночь."""
+    wheel = TimingWheel()
+    wheel.set_user(USER_ID, {'breakfast': 10})
+    assert wheel.minutes_until_next(5) == 5
+    assert wheel.minutes_until_next(MINUTES_PER_DAY - 1) == 11
+    assert wheel.minutes_until_next(10) == MINUTES_PER_DAY
+
+
+def test_empty_wheel_has_no_next_event() -> None:
+    """В пустом колесе ближайшего события нет."""
+    wheel = TimingWheel()
+    wheel.set_user(USER_ID, {'breakfast': 480})
+    wheel.clear()
+    assert len(wheel) == 0
+    assert wheel.minutes_until_next(0) is None
@@ -0,0 +1,20 @@
+"""Тесты валидаторов пользовательского ввода."""
+
+import pytest
+
+from bot.validators import validate_date_storage
+
+
+def test_storage_date_is_accepted() -> None:
+    """Дата в формате хранения возвращается без изменений."""
+    assert validate_date_storage('2026-01-15') == '2026-01-15'
+
+
+@pytest.mark.parametrize(
+    'value',
+    ['', '15.01.2026', '2026-02-30', '2026-01-15:extra', "'; DROP"],
+)
+def test_invalid_storage_date_is_rejected(value: str) -> None:
+    """Дата не в формате хранения отклоняется."""
+    with pytest.raises(ValueError):
+        validate_date_storage(value)